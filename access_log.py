@@ -0,0 +1,153 @@
+"""Per-route request statistics parsed from the server's access log lines.
+
+ServerManager feeds every captured output line to AccessLogStats, which picks
+out uvicorn access lines such as::
+
+    INFO:     127.0.0.1:51234 - "GET /api/v1/chats/3f2a...?page=1 HTTP/1.1" 200 OK
+
+Paths are reduced to route templates (ids become ``{id}``, static bundles
+collapse to a prefix). Each route has a request count, counts per status class
+and a fixed-bucket response-time histogram. Uvicorn's default access format has
+no duration, so response times are recorded only when the line carries one,
+e.g. ``200 OK 12.5ms``. The number of routes is capped and the rest are pooled,
+so memory stays bounded whatever clients request.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from probe_metrics import bucket_percentile
+
+# Response-time bucket bounds in seconds; streamed chat completions can run for minutes
+LATENCY_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+STATUS_CLASSES = ('1xx', '2xx', '3xx', '4xx', '5xx')
+OTHER_ROUTE = '(other)'
+STATIC_ROUTE_PREFIXES = ('/_app/', '/static/', '/assets/', '/cache/')
+
+ANSI_ESCAPE = re.compile(rb'\x1b\[[0-9;]*m')
+ACCESS_LINE = re.compile(
+    rb'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+" (?P<status>\d{3})'
+    rb'(?:.*?(?P<duration>\d+(?:\.\d+)?) ?(?P<unit>ms|s)\b)?'
+)
+# Path segments that identify a resource rather than a route
+ID_SEGMENT = re.compile(r'^(?:\d+|[0-9a-fA-F-]{16,}|(?=.*\d)[A-Za-z0-9_-]{24,})$')
+
+
+def route_template(path: str) -> str:
+    path = path.split('?', 1)[0].split('#', 1)[0] or '/'
+    for prefix in STATIC_ROUTE_PREFIXES:
+        if path.startswith(prefix):
+            return prefix + '*'
+    return '/'.join('{id}' if ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+class RouteStats:
+    # Column layout of the per-route counters array
+    _COUNT = 0
+    _STATUS = 1
+    _BUCKETS = 1 + len(STATUS_CLASSES)
+
+    def __init__(self) -> None:
+        self.counters = array('Q', bytes(8 * (self._BUCKETS + len(LATENCY_BOUNDS) + 1)))
+        self.duration_sum = 0.0
+
+    def record(self, status: int, duration: Optional[float]) -> None:
+        self.counters[self._COUNT] += 1
+        if 1 <= status // 100 <= 5:
+            self.counters[self._STATUS + status // 100 - 1] += 1
+        if duration is not None:
+            bucket = next((i for i, bound in enumerate(LATENCY_BOUNDS) if duration <= bound), len(LATENCY_BOUNDS))
+            self.counters[self._BUCKETS + bucket] += 1
+            self.duration_sum += duration
+
+    def to_dict(self) -> Dict:
+        buckets = self.counters[self._BUCKETS:]
+        timed = sum(buckets)
+        return {
+            'count': self.counters[self._COUNT],
+            'status': {name: self.counters[self._STATUS + i] for i, name in enumerate(STATUS_CLASSES)},
+            'timed': timed,
+            'mean': self.duration_sum / timed if timed else None,
+            'p50': bucket_percentile(LATENCY_BOUNDS, buckets, 0.50),
+            'p95': bucket_percentile(LATENCY_BOUNDS, buckets, 0.95),
+            'p99': bucket_percentile(LATENCY_BOUNDS, buckets, 0.99),
+        }
+
+
+class AccessLogStats:
+    def __init__(self, max_routes: int = 200) -> None:
+        self.max_routes = max_routes
+        self._routes: Dict[Tuple[str, str], RouteStats] = {}
+        self.lines_parsed = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def feed(self, line: bytes) -> bool:
+        """Record line if it is an access log line; returns whether it was one."""
+        match = ACCESS_LINE.search(ANSI_ESCAPE.sub(b'', line))
+        if not match:
+            return False
+        duration = None
+        if match['duration']:
+            duration = float(match['duration']) / (1000 if match['unit'] == b'ms' else 1)
+        method = match['method'].decode()
+        route = route_template(match['path'].decode(errors='replace'))
+        with self._lock:
+            key = (method, route)
+            stats = self._routes.get(key)
+            if stats is None:
+                if len(self._routes) >= self.max_routes:
+                    key = (method, OTHER_ROUTE)
+                stats = self._routes.setdefault(key, RouteStats())
+            stats.record(int(match['status']), duration)
+            self.lines_parsed += 1
+        return True
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            routes: List[Dict] = [{'method': method, 'route': route, **stats.to_dict()}
+                                  for (method, route), stats in self._routes.items()]
+            lines_parsed = self.lines_parsed
+        routes.sort(key=lambda r: r['count'], reverse=True)
+        return {'since': self.started_at, 'requests': lines_parsed, 'routes': routes}
+
+
+class SnapshotWriter:
+    """Periodically write a JSON snapshot to a file, atomically."""
+
+    def __init__(self, snapshot: Callable[[], Dict], path: Path, interval: float = 60.0) -> None:
+        self.snapshot = snapshot
+        self.path = path
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def write(self) -> None:
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(self.snapshot(), indent=1), encoding='utf-8')
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write snapshot {self.path}: {e}")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            await loop.run_in_executor(None, self.write)
+
+    async def start(self) -> None:
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await asyncio.get_running_loop().run_in_executor(None, self.write)
@@ -0,0 +1,213 @@
+"""Memory + disk cache for open-webui's static front-end assets.
+
+Hashed, immutable assets (SvelteKit's ``/_app/immutable/`` bundle, fingerprinted
+JS/CSS/fonts/images) are served straight from the cache without contacting the
+server. Other static files are revalidated with If-None-Match and served from the
+cache on 304. Everything else (API calls, websockets) bypasses the cache.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+CACHE_DIR = Path.home() / '.webui' / 'asset_cache'
+
+STATIC_EXTENSIONS = ('.js', '.mjs', '.css', '.woff', '.woff2', '.ttf', '.otf', '.png', '.jpg', '.jpeg',
+                     '.gif', '.svg', '.webp', '.ico', '.wasm', '.json')
+# Fingerprinted file names: a hex hash of 8+ characters (index.3f2a9c1b.js) or Vite's 8-character
+# base64url hash with digits and both cases (chunk-BpQ1x_8Z.css). Plain words such as
+# custom-background.png must not match, or a replaced file would be served from cache forever
+HASHED_NAME = re.compile(
+    r'[.-](?:(?=[0-9a-f]*[a-f])(?=[0-9a-f]*[0-9])[0-9a-f]{8,}'
+    r'|(?=[\w-]*[0-9])(?=[\w-]*[a-z])(?=[\w-]*[A-Z])[A-Za-z0-9_-]{8})\.[a-z0-9]+$'
+)
+IMMUTABLE_PREFIXES = ('/_app/immutable/',)
+STATIC_PREFIXES = ('/_app/', '/static/', '/assets/', '/favicon', '/manifest')
+STORED_HEADERS = ('Content-Type', 'Content-Encoding', 'ETag', 'Last-Modified', 'Cache-Control')
+# A full disk cache is trimmed to this fraction of its limit, so it is not rescanned on every write
+DISK_TRIM_TARGET = 0.9
+
+
+@dataclass
+class CacheEntry:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    immutable: bool
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get('ETag')
+
+
+def is_static_path(path: str) -> bool:
+    return path.startswith(STATIC_PREFIXES) or path.lower().endswith(STATIC_EXTENSIONS)
+
+
+def is_immutable(path: str, cache_control: str = '') -> bool:
+    if 'immutable' in cache_control.lower():
+        return True
+    if path.startswith(IMMUTABLE_PREFIXES):
+        return True
+    return path.lower().endswith(STATIC_EXTENSIONS) and bool(HASHED_NAME.search(path))
+
+
+class AssetCache:
+    """Two-level LRU cache: a byte-bounded in-memory dict in front of a byte-bounded directory."""
+
+    def __init__(self, memory_bytes: int = 64 * 1024 * 1024, disk_bytes: int = 256 * 1024 * 1024,
+                 cache_dir: Optional[Path] = CACHE_DIR, max_entry_bytes: int = 16 * 1024 * 1024) -> None:
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.cache_dir = cache_dir
+        self.max_entry_bytes = max_entry_bytes
+        self._memory: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._memory_used = 0
+        # Bytes of bodies on disk: scanned on the first write, then kept up to date by writes and trims
+        self._disk_used: Optional[int] = None
+        self._disk_lock = threading.Lock()
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'revalidated': 0, 'misses': 0, 'bypassed': 0,
+                         'stored': 0, 'evicted': 0}
+        if cache_dir:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(request: 'web.Request') -> str:
+        # The cache fetches with a normalised Accept-Encoding, so that choice is part of the key
+        encoding = 'gzip' if 'gzip' in request.headers.get('Accept-Encoding', '') else 'identity'
+        return f'{request.rel_url.path_qs}|{encoding}'
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, 'memory_entries': len(self._memory), 'memory_bytes': self._memory_used}
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / hashlib.sha256(key.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.counters['memory_hits'] += 1
+            return entry
+        if not self.cache_dir:
+            return None
+        entry = await asyncio.get_running_loop().run_in_executor(None, self._read_disk, key)
+        if entry is not None:
+            self._remember(key, entry)
+            self.counters['disk_hits'] += 1
+        return entry
+
+    def _read_disk(self, key: str) -> Optional[CacheEntry]:
+        path = self._disk_path(key)
+        try:
+            meta = json.loads(path.with_suffix('.json').read_text())
+            body = path.with_suffix('.body').read_bytes()
+            os.utime(path.with_suffix('.body'))  # LRU order on disk follows mtime
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(body=body, **meta)
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= len(old.body)
+        self._memory[key] = entry
+        self._memory_used += len(entry.body)
+        while self._memory_used > self.memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted.body)
+            self.counters['evicted'] += 1
+
+    async def put(self, key: str, entry: CacheEntry) -> None:
+        if len(entry.body) > self.max_entry_bytes:
+            return
+        self._remember(key, entry)
+        self.counters['stored'] += 1
+        if self.cache_dir:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_disk, key, entry)
+
+    def _write_disk(self, key: str, entry: CacheEntry) -> None:
+        path = self._disk_path(key)
+        meta = asdict(entry)
+        del meta['body']
+        with self._disk_lock:
+            try:
+                if self._disk_used is None:
+                    self._disk_used = sum(stat.st_size for _, stat in self._scan_disk())
+                try:
+                    replaced = path.with_suffix('.body').stat().st_size
+                except FileNotFoundError:
+                    replaced = 0
+                tmp = path.with_suffix('.tmp')
+                tmp.write_bytes(entry.body)
+                os.replace(tmp, path.with_suffix('.body'))
+                path.with_suffix('.json').write_text(json.dumps(meta))
+                self._disk_used += len(entry.body) - replaced
+                if self._disk_used > self.disk_bytes:
+                    self._trim_disk()
+            except OSError as e:
+                logging.warning(f"Asset cache write failed: {e}")
+
+    def _scan_disk(self) -> List[Tuple[Path, os.stat_result]]:
+        return [(p, p.stat()) for p in self.cache_dir.glob('*.body')]
+
+    def _trim_disk(self) -> None:
+        """Delete the least recently used bodies until the cache is back under its trim target."""
+        bodies = self._scan_disk()
+        used = sum(stat.st_size for _, stat in bodies)
+        target = self.disk_bytes * DISK_TRIM_TARGET
+        for path, stat in sorted(bodies, key=lambda item: item[1].st_mtime):
+            if used <= target:
+                break
+            for suffix in ('.body', '.json'):
+                path.with_suffix(suffix).unlink(missing_ok=True)
+            used -= stat.st_size
+        self._disk_used = used
+
+
+class StaticBackend:
+    """The single backend behind the caching front end."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url.rstrip('/')
+        self.active = 0
+
+
+class CachingFrontend:
+    """A local caching proxy in front of start_url that the window loads instead."""
+
+    def __init__(self, upstream_url: str, port: int, cache: AssetCache, host: str = '127.0.0.1') -> None:
+        from urllib.parse import urlsplit
+        parts = urlsplit(upstream_url)
+        self.backend = StaticBackend(f'{parts.scheme}://{parts.netloc}')
+        self.cache = cache
+        self.host = host
+        self.port = port
+        self._proxy = None
+
+    def url_for(self, upstream_url: str) -> str:
+        """Map a URL on the upstream server to the same path on the front end."""
+        from urllib.parse import urlsplit, urlunsplit
+        parts = urlsplit(upstream_url)
+        return urlunsplit(('http', f'{self.host}:{self.port}', parts.path, parts.query, parts.fragment))
+
+    async def start(self) -> None:
+        from proxy import ReverseProxy
+        self._proxy = ReverseProxy(lambda request: self.backend, host=self.host, port=self.port, cache=self.cache)
+        await self._proxy.start()
+
+    async def stop(self) -> None:
+        if self._proxy:
+            await self._proxy.stop()
+            self._proxy = None
+        logging.info(f"Asset cache: {self.cache.stats()}")
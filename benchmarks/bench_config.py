@@ -0,0 +1,51 @@
+"""Micro-benchmark for load_config()/save_config().
+
+Runs against a throwaway HOME so the real config and key file are untouched:
+
+    python benchmarks/bench_config.py [--iterations N]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _time(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ['HOME'] = os.environ['USERPROFILE'] = home
+        sys.path.insert(0, str(ROOT))
+        import config
+
+        config.CONFIG_PATH = Path(home) / '.webui_config.json'
+        config.save_config(config.AppConfig(username='bench', password='secret'))
+
+        loaded = config.load_config()
+        results = {
+            'load_config_us': _time(config.load_config, args.iterations),
+            'load_config_and_read_password_us': _time(
+                lambda: config.load_config().password.get_secret_value(), args.iterations),
+            # force=True: a freshly loaded config is clean, and a plain save would skip the write
+            'save_config_us': _time(lambda: config.save_config(loaded, force=True), args.iterations),
+            'save_config_unchanged_us': _time(lambda: config.save_config(loaded), args.iterations),
+        }
+    print(json.dumps({k: round(v, 1) for k, v in results.items()}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
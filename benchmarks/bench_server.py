@@ -0,0 +1,224 @@
+"""Startup, readiness, monitoring and shutdown benchmarks for ServerManager.
+
+Runs ServerManager against the fake ``open-webui`` in fake_open_webui.py and writes
+machine-readable results that can be compared across commits:
+
+    python benchmarks/bench_server.py [--iterations N] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_open_webui import fake_server_env  # noqa: E402
+from server_manager import ServerManager  # noqa: E402
+
+# (scenario name, startup method, fake server settings, readiness timeout)
+STARTUP_SCENARIOS = [
+    ('cold_start', 'direct', {}, 30),
+    ('cold_start', 'piped', {}, 30),
+    ('boot_delay_1s', 'direct', {'boot_delay': 1.0}, 30),
+    ('boot_delay_1s', 'piped', {'boot_delay': 1.0}, 30),
+    ('flaky_50pct', 'direct', {'flaky': 0.5}, 30),
+    ('slow_responses_300ms', 'direct', {'slow': 0.3}, 30),
+    # Failed starts should be reported as fast as successful ones, not after the readiness timeout
+    ('crash_on_start', 'direct', {'crash': 1}, 30),
+    ('crash_on_start', 'piped', {'crash': 1}, 30),
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        'mean': statistics.mean(samples),
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'max': max(samples),
+    }
+
+
+async def wait_for_state(manager: ServerManager, state: str, timeout: float = 30) -> float:
+    """Return the time at which manager reports state."""
+    loop = asyncio.get_running_loop()
+    reached = loop.create_future()
+
+    def on_event(event) -> None:
+        if event.state == state and not reached.done():
+            reached.set_result(time.perf_counter())
+
+    manager.subscribe(on_event)
+    try:
+        return await asyncio.wait_for(reached, timeout)
+    finally:
+        manager.unsubscribe(on_event)
+
+
+async def bench_startup(method: str, ready_timeout: float) -> Dict[str, Any]:
+    manager = ServerManager(port=free_port(), ready_timeout=ready_timeout)
+    start = time.perf_counter()
+    ready = await manager.start_server(method=method)
+    time_to_result = time.perf_counter() - start
+    start = time.perf_counter()
+    await manager.stop_server()
+    stop_latency = time.perf_counter() - start
+    await manager.close()
+    readiness = manager.last_readiness
+    return {
+        'ready': ready,
+        'time_to_result': time_to_result,
+        'stop_latency': stop_latency,
+        'signal': readiness.signal if readiness else None,
+        'failure': manager.last_failure.reason if manager.last_failure else None,
+    }
+
+
+async def bench_crash_detection() -> float:
+    """Latency from killing a running child to the 'crashed' event."""
+    manager = ServerManager(port=free_port())
+    await manager.start_server(method='piped')
+    crashed = asyncio.ensure_future(wait_for_state(manager, 'crashed'))
+    await asyncio.sleep(0)
+    killed_at = time.perf_counter()
+    manager.process.kill()
+    latency = await crashed - killed_at
+    manager.process = None
+    await manager.close()
+    return latency
+
+
+async def bench_crash_recovery() -> float:
+    """Time from killing a supervised child to the server being ready again."""
+    manager = ServerManager(port=free_port(), supervise=True)
+    await manager.start_server(method='piped')
+    crashed = asyncio.ensure_future(wait_for_state(manager, 'crashed'))
+    await asyncio.sleep(0)
+    killed_at = time.perf_counter()
+    manager.process.kill()
+    await crashed
+    recovered_at = await wait_for_state(manager, 'running')
+    await manager.stop_server()
+    await manager.close()
+    return recovered_at - killed_at
+
+
+async def bench_probe_detection(interval: float) -> Dict[str, float]:
+    """Latency for the liveness probe to notice an external server coming up and going down."""
+    port = free_port()
+    manager = ServerManager(port=port)
+    manager.start_monitoring(interval)
+    server = None
+    try:
+        await wait_for_state(manager, 'stopped')
+        up = asyncio.ensure_future(wait_for_state(manager, 'running'))
+        await asyncio.sleep(0)
+        server = subprocess.Popen([sys.executable, str(Path(__file__).parent / 'fake_open_webui.py'),
+                                   'serve', '--port', str(port)], stderr=subprocess.PIPE)
+        server.stderr.readline()  # "Uvicorn running on ..." is printed once the port is bound
+        bound_at = time.perf_counter()
+        up_latency = await up - bound_at
+
+        down = asyncio.ensure_future(wait_for_state(manager, 'stopped'))
+        await asyncio.sleep(0)
+        server.kill()
+        server.wait()
+        killed_at = time.perf_counter()
+        down_latency = await down - killed_at
+    finally:
+        manager._monitor_task.cancel()
+        await manager.close()
+        if server and server.poll() is None:
+            server.kill()
+            server.wait()
+    return {'up': up_latency, 'down': down_latency}
+
+
+async def run(iterations: int, probe_interval: float) -> List[Dict[str, Any]]:
+    results = []
+    with tempfile.TemporaryDirectory() as bin_dir:
+        for name, method, settings, ready_timeout in STARTUP_SCENARIOS:
+            with fake_server_env(Path(bin_dir), **settings):
+                runs = [await bench_startup(method, ready_timeout) for _ in range(iterations)]
+            result = {
+                'scenario': name,
+                'method': method,
+                'settings': settings,
+                'ready_rate': sum(r['ready'] for r in runs) / len(runs),
+                'signals': sorted({r['signal'] for r in runs if r['signal']}),
+                'failures': sorted({r['failure'] for r in runs if r['failure']}),
+                'time_to_result': summarize([r['time_to_result'] for r in runs]),
+                'stop_latency': summarize([r['stop_latency'] for r in runs]),
+            }
+            results.append(result)
+            print(f"{name:<22} {method:<7} ready {result['ready_rate']:.0%} "
+                  f"in {result['time_to_result']['median'] * 1000:8.1f} ms, "
+                  f"stop {result['stop_latency']['median'] * 1000:7.1f} ms")
+
+        with fake_server_env(Path(bin_dir)):
+            samples = [await bench_crash_detection() for _ in range(iterations)]
+        results.append({'scenario': 'crash_detection', 'latency': summarize(samples)})
+        print(f"{'crash_detection':<30} {statistics.median(samples) * 1000:8.1f} ms")
+
+        with fake_server_env(Path(bin_dir)):
+            samples = [await bench_crash_recovery() for _ in range(iterations)]
+        results.append({'scenario': 'crash_recovery', 'latency': summarize(samples)})
+        print(f"{'crash_recovery':<30} {statistics.median(samples) * 1000:8.1f} ms")
+
+        probes = [await bench_probe_detection(probe_interval) for _ in range(iterations)]
+        for direction in ('up', 'down'):
+            samples = [p[direction] for p in probes]
+            results.append({'scenario': f'probe_detection_{direction}', 'interval': probe_interval,
+                            'latency': summarize(samples)})
+            print(f"{'probe_detection_' + direction:<30} {statistics.median(samples) * 1000:8.1f} ms")
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--probe-interval', type=float, default=1.0,
+                        help='liveness probe interval used for the detection benchmark')
+    parser.add_argument('--output', type=Path, help='results file (default: benchmarks/results/server-<commit>.json)')
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = asyncio.run(run(args.iterations, args.probe_interval))
+    output = args.output or ROOT / 'benchmarks' / 'results' / f'server-{commit}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'commit': commit,
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'iterations': args.iterations,
+        'results': results,
+    }, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
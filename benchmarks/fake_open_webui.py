@@ -0,0 +1,110 @@
+"""A tiny stand-in for ``open-webui serve`` used by the benchmarks and tests.
+
+Behaviour is tuned through environment variables so the same shim on PATH can
+play a fast, slow, flaky or broken server:
+
+    FAKE_WEBUI_BOOT_DELAY   seconds to wait before binding the port (default 0)
+    FAKE_WEBUI_FLAKY        probability (0-1) that a request gets a 503 (default 0)
+    FAKE_WEBUI_SLOW         seconds added to every response (default 0)
+    FAKE_WEBUI_CRASH        exit with this code after the boot delay instead of serving
+"""
+import os
+import random
+import signal
+import sys
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+SETTINGS = {
+    'boot_delay': 'FAKE_WEBUI_BOOT_DELAY',
+    'flaky': 'FAKE_WEBUI_FLAKY',
+    'slow': 'FAKE_WEBUI_SLOW',
+    'crash': 'FAKE_WEBUI_CRASH',
+}
+
+
+def install_shim(directory: Path) -> Path:
+    """Write an ``open-webui`` executable into directory that runs this fake server."""
+    directory.mkdir(parents=True, exist_ok=True)
+    script = Path(__file__).resolve()
+    if sys.platform == 'win32':
+        shim = directory / 'open-webui.cmd'
+        shim.write_text(f'@"{sys.executable}" "{script}" %*\r\n')
+    else:
+        shim = directory / 'open-webui'
+        shim.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+        shim.chmod(0o755)
+    return shim
+
+
+@contextmanager
+def fake_server_env(directory: Path, **settings: float) -> Iterator[None]:
+    """Put the shim in directory first on PATH and apply settings for the duration of the block."""
+    saved = os.environ.copy()
+    install_shim(directory)
+    os.environ['PATH'] = f'{directory}{os.pathsep}{os.environ.get("PATH", "")}'
+    for name, value in settings.items():
+        os.environ[SETTINGS[name]] = str(value)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+
+class Handler(BaseHTTPRequestHandler):
+    flaky = 0.0
+    slow = 0.0
+
+    def do_GET(self) -> None:
+        if self.slow:
+            time.sleep(self.slow)
+        status = 503 if random.random() < self.flaky else 200
+        body = b'<html><body>fake open-webui</body></html>'
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # uvicorn-style access line on stdout
+        print(f'INFO:     {self.client_address[0]}:{self.client_address[1]} - "{self.requestline}" '
+              f'{args[1] if len(args) > 1 else ""}', flush=True)
+
+
+def main(argv: list) -> int:
+    if not argv or argv[0] != 'serve':
+        print('usage: open-webui serve [--host HOST] [--port PORT]', file=sys.stderr)
+        return 2
+    host, port = '0.0.0.0', 8080
+    args = argv[1:]
+    for i, arg in enumerate(args[:-1]):
+        if arg == '--port':
+            port = int(args[i + 1])
+        elif arg == '--host':
+            host = args[i + 1]
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    time.sleep(float(os.environ.get(SETTINGS['boot_delay'], 0)))
+    crash = os.environ.get(SETTINGS['crash'])
+    if crash:
+        print('ERROR:    fake open-webui crashed on start', file=sys.stderr, flush=True)
+        return int(crash)
+
+    Handler.flaky = float(os.environ.get(SETTINGS['flaky'], 0))
+    Handler.slow = float(os.environ.get(SETTINGS['slow'], 0))
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f'INFO:     Uvicorn running on http://{host}:{port} (Press CTRL+C to quit)', file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,82 +1,214 @@
 from pathlib import Path
 import json
 import logging
-from typing import Dict, Any, Optional
-from pydantic import BaseModel, HttpUrl, model_validator, SecretStr
-from cryptography.fernet import Fernet
-import base64
 import os
+import threading
+from typing import TYPE_CHECKING, Dict, Any, List, Literal, Optional, Set, Tuple
+from pydantic import BaseModel, HttpUrl, PrivateAttr, SecretStr, TypeAdapter, ValidationError, field_validator
+
+# cryptography is only imported once a password has to be encrypted or decrypted
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
 
 CONFIG_PATH = Path.home() / '.webui_config.json'
+KEY_PATH = Path.home() / '.webui_key'
+
+# Built once per process: URL validation and the Fernet object per key file
+_START_URL_ADAPTER = TypeAdapter(HttpUrl)
+_fernet_cache: Dict[Path, Tuple[bytes, 'Fernet']] = {}
+_save_lock = threading.Lock()
+
+
+def _load_fernet() -> Tuple[bytes, 'Fernet']:
+    """Return the (key, Fernet) pair for KEY_PATH, generating the key on first use."""
+    key_file = KEY_PATH
+    cached = _fernet_cache.get(key_file)
+    if cached is None:
+        from cryptography.fernet import Fernet
+        if key_file.exists():
+            key = key_file.read_bytes()
+        else:
+            key = Fernet.generate_key()
+            key_file.write_bytes(key)
+        cached = _fernet_cache[key_file] = (key, Fernet(key))
+    return cached
+
+
+class EncryptedSecretStr(SecretStr):
+    """SecretStr loaded from an encrypted token; decrypted the first time it is read."""
+
+    def __init__(self, token: str) -> None:
+        self.token = token
+        self._plain: Optional[str] = None
+
+    @property
+    def _secret_value(self) -> str:
+        if self._plain is None:
+            self._plain = _load_fernet()[1].decrypt(self.token.encode()).decode()
+        return self._plain
+
+    def _display(self) -> str:
+        return '**********'
+
 
 class AppConfig(BaseModel):
     window_title: str = 'Web UI'
     window_width: int = 1024
     window_height: int = 768
-    start_url: str = 'http://127.0.0.1:8080/'  # Use str, validate in __post_init__
+    window_x: Optional[int] = None
+    window_y: Optional[int] = None
+    start_url: str = 'http://127.0.0.1:8080/'  # Use str, validated by _validate_start_url
     username: Optional[str] = None
     password: Optional[SecretStr] = None
-    # Private attribute for encryption key
-    _fernet_key: Optional[bytes] = None
+    # Keep the server running in the background between launches and reattach to it
+    keep_warm: bool = False
+    idle_timeout_minutes: int = 30
+    # In-memory tail of server output shown in the controls bar; capturing it needs the server's
+    # output piped to us, so the piped startup method is tried first. 0 turns the buffer off
+    log_buffer_lines: int = 2000
+    log_buffer_kb: int = 512
+    # Seconds the server gets to exit on SIGTERM before its process group is killed
+    shutdown_timeout_seconds: float = 5.0
+    # Remember how past launches went (~/.webui/startup_history.json) to order startup methods,
+    # time readiness probes and warn about boots much slower than usual
+    startup_history: bool = True
+    # Requested once the server is ready, so the first real navigation finds its code paths warm.
+    # Unauthenticated requests still load each route's modules and open the database pool;
+    # an empty list turns warm-up off
+    warmup_endpoints: List[str] = ['/api/config', '/api/models', '/api/v1/chats/', '/manifest.json']
+    warmup_concurrency: int = 4
+    warmup_timeout_seconds: float = 10.0
+    # Restart the server automatically when it crashes or hangs (with backoff and a crash-loop breaker)
+    auto_restart: bool = True
+    # Sample the server's CPU/memory from /proc; restart it when idle and above rss_restart_mb
+    telemetry_interval_seconds: float = 5.0
+    rss_restart_mb: Optional[int] = None
+    # Scheduling and limits for the spawned server, e.g. to keep it off the cores used for inference
+    server_nice: Optional[int] = None
+    server_ionice_class: Optional[Literal['realtime', 'best-effort', 'idle']] = None
+    server_ionice_level: Optional[int] = None
+    server_cpu_affinity: Optional[List[int]] = None
+    server_memory_limit_mb: Optional[int] = None
+    server_max_open_files: Optional[int] = None
+    # Per-route request counts and response times parsed from the server's access log; needs the
+    # server's output piped to us, so the piped startup method is tried first when enabled
+    access_log_stats: bool = False
+    access_log_snapshot_file: Optional[str] = None
+    # Number of open-webui instances; more than 1 runs them behind a load-balancing proxy
+    pool_size: int = 1
+    # Serve the UI through a local proxy that caches static assets in memory and on disk;
+    # the port is fixed so the page's origin (and its localStorage) stays the same across launches
+    asset_cache: bool = False
+    asset_cache_port: int = 8081
+    asset_cache_memory_mb: int = 64
+    asset_cache_disk_mb: int = 256
+    # Export health-probe latency in Prometheus text format to a file and/or http://127.0.0.1:<port>/metrics
+    metrics_file: Optional[str] = None
+    metrics_port: Optional[int] = None
+    # Names of fields changed since the config was loaded or last saved
+    _dirty: Set[str] = PrivateAttr(default_factory=set)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name not in type(self).model_fields:
+            super().__setattr__(name, value)
+            return
+        old = getattr(self, name, None)
+        # Comparing secrets would decrypt a stored password, so assigning one always counts as a change
+        if isinstance(old, SecretStr) or isinstance(value, SecretStr):
+            changed = old is not value
+        else:
+            changed = old != value
+        super().__setattr__(name, value)
+        # Marked after the value is in place: a save that has already taken the dirty set
+        # either serializes the new value or leaves the field dirty for the next save
+        if changed:
+            self._dirty.add(name)
+
+    @property
+    def dirty_fields(self) -> Set[str]:
+        return set(self._dirty)
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self._dirty)
 
-    def __init__(self, **data: Any):
-        super().__init__(**data)
-        # Validate start_url as a URL
-        from pydantic import HttpUrl, ValidationError, parse_obj_as
+    def mark_clean(self) -> None:
+        self._dirty.clear()
+
+    @field_validator('start_url')
+    @classmethod
+    def _validate_start_url(cls, value: str) -> str:
         try:
-            parse_obj_as(HttpUrl, self.start_url)
+            _START_URL_ADAPTER.validate_python(value)
         except ValidationError:
-            raise ValueError(f"Invalid start_url: {self.start_url}")
+            raise ValueError(f"Invalid start_url: {value}")
+        return value
+
+    @field_validator('server_nice')
+    @classmethod
+    def _validate_server_nice(cls, value: Optional[int]) -> Optional[int]:
+        if value is not None and not -20 <= value <= 19:
+            raise ValueError(f"server_nice must be between -20 and 19, got {value}")
+        return value
+
+    @field_validator('server_ionice_level')
+    @classmethod
+    def _validate_server_ionice_level(cls, value: Optional[int]) -> Optional[int]:
+        if value is not None and not 0 <= value <= 7:
+            raise ValueError(f"server_ionice_level must be between 0 and 7, got {value}")
+        return value
+
+    @field_validator('server_cpu_affinity')
+    @classmethod
+    def _validate_server_cpu_affinity(cls, value: Optional[List[int]]) -> Optional[List[int]]:
+        if value is not None and (not value or min(value) < 0):
+            raise ValueError("server_cpu_affinity must list at least one CPU number, all >= 0")
+        return value
+
+    @field_validator('warmup_endpoints')
+    @classmethod
+    def _validate_warmup_endpoints(cls, value: List[str]) -> List[str]:
+        for path in value:
+            if not path.startswith('/'):
+                raise ValueError(f"warmup_endpoints must be paths starting with '/', got {path!r}")
+        return value
+
+    @field_validator('warmup_concurrency')
+    @classmethod
+    def _validate_warmup_concurrency(cls, value: int) -> int:
+        if value < 1:
+            raise ValueError(f"warmup_concurrency must be at least 1, got {value}")
+        return value
 
     @property
     def fernet_key(self) -> Optional[bytes]:
-        if not self._fernet_key:
-            # Generate or load encryption key
-            key_file = Path.home() / '.webui_key'
-            if key_file.exists():
-                with open(key_file, 'rb') as f:
-                    self._fernet_key = f.read()
-            else:
-                self._fernet_key = Fernet.generate_key()
-                with open(key_file, 'wb') as f:
-                    f.write(self._fernet_key)
-        return self._fernet_key
+        return _load_fernet()[0]
 
     def encrypt(self, data: str) -> str:
-        key = self.fernet_key
-        if not key:
-            raise ValueError("Encryption key not initialized")
-        fernet = Fernet(key)
-        return fernet.encrypt(data.encode()).decode()
+        return _load_fernet()[1].encrypt(data.encode()).decode()
 
     def decrypt(self, encrypted_data: str) -> str:
-        key = self.fernet_key
-        if not key:
-            raise ValueError("Encryption key not initialized")
-        fernet = Fernet(key)
-        return fernet.decrypt(encrypted_data.encode()).decode()
+        return _load_fernet()[1].decrypt(encrypted_data.encode()).decode()
 
     def to_json(self) -> str:
         """Convert config to JSON string with indentation"""
-        # Convert the model to a dict and handle HttpUrl
         data = self.model_dump()
-        # Convert HttpUrl to string for JSON serialization
-        data['start_url'] = str(data['start_url'])
-        # Handle password encryption
-        if 'password' in data and data['password'] is not None:
-            data['password'] = self.encrypt(data['password'].get_secret_value())
+        # Handle password encryption; a password that was never decrypted keeps its token
+        if self.password is not None:
+            if isinstance(self.password, EncryptedSecretStr):
+                data['password'] = self.password.token
+            else:
+                data['password'] = self.encrypt(self.password.get_secret_value())
         return json.dumps(data, indent=2)
 
     @classmethod
     def from_json(cls, json_str: str) -> 'AppConfig':
         """Create config from JSON string"""
         data = json.loads(json_str)
-        # Handle password decryption
-        if 'password' in data and data['password'] is not None:
-            config = cls()
-            data['password'] = SecretStr(config.decrypt(data['password']))
-        # The HttpUrl validation will happen automatically when creating the model
-        return cls(**data)
+        # The password stays encrypted until it is first accessed
+        if data.get('password') is not None:
+            data['password'] = EncryptedSecretStr(data['password'])
+        return cls.model_validate(data)
 
     def model_dump(self, **kwargs) -> Dict[str, Any]:
         """Override model_dump to handle HttpUrl"""
@@ -97,11 +229,28 @@ def load_config() -> AppConfig:
     logging.info("No configuration file was found; using defaults")
     return AppConfig()
 
-def save_config(config: AppConfig) -> bool:
-    """Save configuration to file"""
+def save_config(config: AppConfig, force: bool = False) -> bool:
+    """Save configuration to file if anything changed.
+
+    The file is written to a temporary sibling and renamed over the original, so a
+    crash mid-write never leaves a truncated config behind.
+    """
     try:
-        CONFIG_PATH.write_text(config.to_json())
-        logging.info("Configuration saved successfully")
+        with _save_lock:
+            if not force and not config.is_dirty and CONFIG_PATH.exists():
+                logging.debug("Configuration unchanged; skipping save")
+                return True
+            # Take the dirty set before serializing, so a field changed while the file is being
+            # written (e.g. the window moving) stays dirty for the next save
+            changed, config._dirty = config._dirty, set()
+            try:
+                tmp_path = CONFIG_PATH.with_name(f'{CONFIG_PATH.name}.tmp')
+                tmp_path.write_text(config.to_json())
+                os.replace(tmp_path, CONFIG_PATH)
+            except Exception:
+                config._dirty |= changed
+                raise
+        logging.info(f"Configuration saved successfully (changed: {', '.join(sorted(changed)) or 'none'})")
         return True
     except Exception as e:
         logging.error(f"Error saving configuration: {e}")
@@ -0,0 +1,91 @@
+import threading
+from array import array
+from typing import Any, Dict
+
+STREAMS = ('STDOUT', 'STDERR')
+
+
+class LogRingBuffer:
+    """Fixed-size ring buffer of the server's most recent output lines.
+
+    Line bytes live in one preallocated bytearray used as a circular byte store;
+    per-line offsets, lengths and stream ids live in fixed-size arrays. Lines are
+    evicted when either the line count or the byte budget is exceeded, so memory
+    stays flat however long the server runs. Every line gets a monotonically
+    increasing sequence number so readers can fetch only what is new.
+    """
+
+    def __init__(self, max_lines: int = 2000, max_bytes: int = 512 * 1024, max_line_bytes: int = 4096) -> None:
+        if max_lines <= 0 or max_bytes <= 0:
+            raise ValueError("Log buffer sizes must be positive")
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.max_line_bytes = min(max_line_bytes, max_bytes)
+        self._data = bytearray(max_bytes)
+        self._starts = array('q', bytes(8 * max_lines))
+        self._lengths = array('I', bytes(4 * max_lines))
+        self._streams = array('B', bytes(max_lines))
+        self._write_pos = 0  # absolute byte offset of the next write
+        self._first = 0  # oldest retained sequence number
+        self._next = 0  # sequence number of the next line
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._next - self._first
+
+    @property
+    def next_seq(self) -> int:
+        return self._next
+
+    def append(self, stream: str, line: bytes) -> int:
+        """Store a line (without trailing newline) and return its sequence number."""
+        line = line[:self.max_line_bytes]
+        size = len(line)
+        stream_id = STREAMS.index(stream) if stream in STREAMS else 0
+        with self._lock:
+            start = self._write_pos
+            offset = start % self.max_bytes
+            head = min(size, self.max_bytes - offset)
+            self._data[offset:offset + head] = line[:head]
+            if head < size:
+                self._data[0:size - head] = line[head:]
+            self._write_pos += size
+
+            seq = self._next
+            slot = seq % self.max_lines
+            self._starts[slot] = start
+            self._lengths[slot] = size
+            self._streams[slot] = stream_id
+            self._next += 1
+
+            # Evict lines whose slot was reused or whose bytes were overwritten
+            floor = self._write_pos - self.max_bytes
+            while self._first < self._next and (
+                    self._next - self._first > self.max_lines or self._starts[self._first % self.max_lines] < floor):
+                self._first += 1
+            return seq
+
+    def _read(self, seq: int) -> bytes:
+        slot = seq % self.max_lines
+        offset = self._starts[slot] % self.max_bytes
+        size = self._lengths[slot]
+        end = offset + size
+        if end <= self.max_bytes:
+            return bytes(self._data[offset:end])
+        return bytes(self._data[offset:]) + bytes(self._data[:end - self.max_bytes])
+
+    def since(self, seq: int = 0, limit: int = 500) -> Dict[str, Any]:
+        """Return up to limit lines with sequence numbers >= seq.
+
+        The result carries 'next' (the sequence number to ask for next time) and
+        'skipped' (lines evicted before the reader got to them).
+        """
+        with self._lock:
+            start = max(seq, self._first)
+            end = min(self._next, start + max(limit, 0))
+            lines = [
+                {'seq': s, 'stream': STREAMS[self._streams[s % self.max_lines]],
+                 'text': self._read(s).decode('utf-8', errors='replace')}
+                for s in range(start, end)
+            ]
+            return {'lines': lines, 'next': end, 'skipped': max(self._first - seq, 0)}
@@ -0,0 +1,164 @@
+"""Non-blocking logging: a bounded queue in front of a writer thread with batched, rotating file output."""
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler with an explicit policy for a full queue.
+
+    Records below block_level are dropped immediately so a chatty server never stalls
+    the event loop. Records at or above it wait up to block_timeout for space
+    (bounded backpressure) before they are dropped too. Drops are counted and
+    reported by the listener.
+    """
+
+    def __init__(self, q: queue.Queue, block_level: int = logging.WARNING, block_timeout: float = 0.05) -> None:
+        super().__init__(q)
+        self.block_level = block_level
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the message arguments here; the formatter runs on the writer thread
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if record.levelno >= self.block_level:
+            try:
+                self.queue.put(record, timeout=self.block_timeout)
+                return
+            except queue.Full:
+                pass
+        self.dropped += 1
+
+
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that flushes in batches and can also rotate by age."""
+
+    def __init__(self, filename: Path, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3,
+                 rotate_interval: Optional[float] = None, flush_interval: float = 1.0,
+                 flush_records: int = 256) -> None:
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.rotate_interval = rotate_interval
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._rollover_at = time.time() + rotate_interval if rotate_interval else None
+
+    def flush(self) -> None:
+        # Called by emit() after every record; only hit the disk once per batch
+        self._pending += 1
+        if self._pending >= self.flush_records or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.force_flush()
+
+    def force_flush(self) -> None:
+        if self._pending:
+            super().flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self._rollover_at is not None and time.time() >= self._rollover_at:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.stream.tell() > 0:
+                return True
+            self._rollover_at = time.time() + self.rotate_interval
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        if self.rotate_interval:
+            self._rollover_at = time.time() + self.rotate_interval
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            if self.stream:
+                self.force_flush()
+        finally:
+            self.release()
+        super().close()
+
+
+class BatchQueueListener(QueueListener):
+    """QueueListener that flushes batching handlers when the queue goes idle and reports drops."""
+
+    def __init__(self, q: queue.Queue, *handlers: logging.Handler, queue_handler: Optional[DroppingQueueHandler] = None,
+                 flush_interval: float = 1.0) -> None:
+        super().__init__(q, *handlers, respect_handler_level=True)
+        self.queue_handler = queue_handler
+        self.flush_interval = flush_interval
+        self._reported_drops = 0
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        while True:
+            try:
+                return self.queue.get(block, timeout=self.flush_interval)
+            except queue.Empty:
+                self.flush()
+
+    def handle(self, record: logging.LogRecord) -> None:
+        if self.queue_handler and self.queue_handler.dropped != self._reported_drops:
+            dropped = self.queue_handler.dropped - self._reported_drops
+            self._reported_drops = self.queue_handler.dropped
+            super().handle(logging.makeLogRecord({
+                'levelno': logging.WARNING,
+                'levelname': 'WARNING',
+                'msg': f"Logging queue full; dropped {dropped} record(s)",
+            }))
+        super().handle(record)
+
+    def flush(self) -> None:
+        for handler in self.handlers:
+            if isinstance(handler, BatchingRotatingFileHandler):
+                handler.acquire()
+                try:
+                    handler.force_flush()
+                finally:
+                    handler.release()
+
+    def stop(self) -> None:
+        super().stop()
+        self.flush()
+
+
+def setup_logging(log_file: Path, level: int = logging.INFO, max_bytes: int = 5 * 1024 * 1024,
+                  backup_count: int = 3, rotate_interval: Optional[float] = None,
+                  queue_size: int = 10000) -> BatchQueueListener:
+    """Route root logging through a bounded queue to a writer thread.
+
+    Returns the started listener; call stop() on exit to drain and flush it.
+    """
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = BatchingRotatingFileHandler(log_file, max_bytes=max_bytes, backup_count=backup_count,
+                                               rotate_interval=rotate_interval)
+    console_handler = logging.StreamHandler()
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    listener = BatchQueueListener(log_queue, file_handler, console_handler, queue_handler=queue_handler)
+    listener.start()
+    return listener
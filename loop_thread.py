@@ -0,0 +1,75 @@
+"""A long-lived asyncio event loop on a background thread.
+
+The GUI toolkit owns the main thread, so everything asynchronous (ServerManager,
+its monitors, log streaming, the proxies) lives on this loop instead. Other
+threads, such as pywebview's JS API threads and atexit hooks, submit coroutines to
+it and optionally wait for the result with a timeout. A timed-out call cancels
+its coroutine rather than leaving it running unobserved.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class LoopThread:
+    def __init__(self, name: str = 'server-loop') -> None:
+        self.name = name
+        self.loop = asyncio.new_event_loop()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'LoopThread':
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and self.loop.is_running()
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable[T]) -> 'concurrent.futures.Future[T]':
+        """Schedule coro on the loop and return a thread-safe future for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run coro on the loop and block until it finishes; cancel it and raise TimeoutError on timeout."""
+        if self.in_loop_thread():
+            raise RuntimeError("LoopThread.run() would deadlock when called from the loop thread")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def call_soon(self, callback: Callable[..., Any], *args: Any) -> None:
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    async def _cancel_pending(self) -> None:
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Cancel whatever is still scheduled (monitors, streams), then stop the loop and join the thread."""
+        if not self.running:
+            return
+        try:
+            self.run(self._cancel_pending(), timeout)
+        except concurrent.futures.TimeoutError:
+            logging.warning("Background tasks did not finish cancelling in time")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self.loop.close()
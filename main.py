@@ -1,34 +1,176 @@
+import argparse
 import asyncio
+import concurrent.futures
 import logging
 import atexit
 import sys
 import os
+import time
 from pathlib import Path
-from config import load_config, save_config, AppConfig
-from server_manager import ServerManager
-from ui_manager import UIManager
+from typing import TYPE_CHECKING, List, Optional, Sequence
+import tracing
+from log_pipeline import setup_logging
+from loop_thread import LoopThread
+from startup_profile import StartupProfiler
 
-# Set up logging to both file and console
+# config (pydantic), server_manager and ui_manager (webview) are imported inside main()
+# so the first log line is not held up by heavy dependencies
+if TYPE_CHECKING:
+    from asset_cache import CachingFrontend
+    from config import AppConfig
+    from resource_policy import ResourcePolicy
+    from server_manager import ServerManager
+    from single_instance import InstanceLock
+
+# Set up logging to both file and console; formatting and disk I/O run on a writer thread
 log_file: Path = Path(os.path.expanduser('~')) / '.webui' / 'webui.log'
-log_file.parent.mkdir(parents=True, exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
-
-def cleanup_server(server_manager: ServerManager) -> None:
+log_listener = setup_logging(log_file, max_bytes=5 * 1024 * 1024, backup_count=3, rotate_interval=7 * 24 * 3600)
+atexit.register(log_listener.stop)
+
+def cleanup_server(server_manager: 'ServerManager', loop_thread: LoopThread) -> None:
+    """Last-resort stop at interpreter exit, for paths that skipped the normal shutdown."""
+    if not server_manager.owns_server or server_manager.keep_warm:
+        return
     try:
-        if server_manager.process:
-            asyncio.run(server_manager.stop_server())
-    except (ProcessLookupError, AttributeError):
-        logging.info("Server process already terminated")
+        if loop_thread.running:
+            loop_thread.run(server_manager.stop_server(), timeout=server_manager.stop_timeout + 5)
+            return
+    except Exception as e:
+        logging.error(f"Error stopping server at exit: {e}")
+    # No loop left to run the graceful path: kill the server's process group outright
+    from server_lock import signal_group
+    pid = server_manager.server_pid
+    if pid and signal_group(pid, force=True):
+        logging.warning(f"Killed server process group {pid} at exit")
+
+@tracing.traced('boot_server')
+async def boot_server(server_manager: 'ServerManager', config: 'AppConfig', profiler: StartupProfiler) -> bool:
+    """Reattach to, detect or start the server. Runs on the server loop while the window opens."""
+    # Reattach to a warm server from a previous launch, or check if one is already running
+    with profiler.phase('check_server'):
+        if config.keep_warm and await server_manager.reattach():
+            logging.info("Reattached to warm server from a previous launch")
+            server_up = True
+        else:
+            server_up = await server_manager.check_port()
+            if server_up:
+                logging.info("Server is already running on port 8080")
+    if not server_up:
+        # Attempt to start server if not running
+        # The log buffer and access-log statistics need the server's output, which only the
+        # piped method captures
+        methods = ['piped', 'direct'] if server_manager.captures_output else ['direct', 'piped']
+        if server_manager.history and not server_manager.captures_output:
+            # Either method will do, so try the one that worked last time first; methods that
+            # keep failing go last
+            methods = server_manager.history.method_order(methods)
+        for method in methods:
+            logging.info(f"Attempting to start server using method: {method}")
+            with profiler.phase(f'start_server ({method})'):
+                server_up = await server_manager.start_server(method=method)
+            if server_up:
+                break
+            failure = server_manager.last_failure
+            logging.warning(f"Server startup failed using method: {method} ({failure})")
+            if failure and failure.permanent:
+                # e.g. open-webui is not installed: another startup method would fail the same way
+                break
+        if not server_up:
+            logging.error("Server could not be started; use Start Server to retry")
+    # Liveness probe; also reports an already-running server to the UI
+    server_manager.start_monitoring()
+    server_manager.start_telemetry(config.telemetry_interval_seconds)
+    return server_up
+
+@tracing.traced('shutdown_server')
+async def shutdown_server(server_manager: 'ServerManager', services: Sequence = (), force_stop: bool = False) -> None:
+    """Stop the server and the helpers around it (caching proxy, metrics exporter) in parallel."""
+    start = time.perf_counter()
+
+    async def stop_main_server() -> None:
+        # Stop the server if running (or leave it warm for the next launch)
+        if server_manager.keep_warm and not force_stop:
+            server_manager.release()
+        elif server_manager.owns_server or await server_manager.check_port():
+            await server_manager.stop_server()
+
+    results = await asyncio.gather(stop_main_server(), *(service.stop() for service in services),
+                                   return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logging.error(f"Shutdown step failed: {result!r}")
+    await server_manager.close()
+    logging.info(f"Shutdown finished in {time.perf_counter() - start:.2f}s")
 
-async def main() -> None:
+def build_resource_policy(config: 'AppConfig') -> Optional['ResourcePolicy']:
+    from resource_policy import ResourcePolicy
+    policy = ResourcePolicy(
+        nice=config.server_nice,
+        ionice_class=config.server_ionice_class,
+        ionice_level=config.server_ionice_level,
+        cpu_affinity=config.server_cpu_affinity,
+        memory_limit_bytes=config.server_memory_limit_mb * 1024 * 1024 if config.server_memory_limit_mb else None,
+        max_open_files=config.server_max_open_files,
+    )
+    return policy or None
+
+def build_server_manager(config: 'AppConfig', headless: bool = False) -> 'ServerManager':
+    """The server manager, or pool of servers, that config describes."""
+    from server_manager import ServerManager
+    manager_kwargs = dict(
+        log_buffer_lines=config.log_buffer_lines,
+        log_buffer_bytes=config.log_buffer_kb * 1024,
+        resource_policy=build_resource_policy(config),
+        stop_timeout=config.shutdown_timeout_seconds,
+        parse_access_log=config.access_log_stats,
+        warmup_paths=config.warmup_endpoints,
+        warmup_concurrency=config.warmup_concurrency,
+        warmup_timeout=config.warmup_timeout_seconds
+    )
+    if config.pool_size > 1:
+        # Several instances behind a local load-balancing proxy on the public port
+        from server_pool import ServerPool
+        return ServerPool(config.pool_size, **manager_kwargs)
+    history = None
+    if config.startup_history:
+        from startup_history import StartupHistory
+        history = StartupHistory.load()
+    if headless and config.keep_warm:
+        logging.info("keep_warm has no effect in headless mode; the server stops with this process")
+    return ServerManager(
+        keep_warm=config.keep_warm and not headless,
+        idle_timeout=config.idle_timeout_minutes * 60,
+        supervise=config.auto_restart,
+        rss_limit_bytes=config.rss_restart_mb * 1024 * 1024 if config.rss_restart_mb else None,
+        history=history,
+        **manager_kwargs
+    )
+
+async def start_services(server_manager: 'ServerManager', config: 'AppConfig') -> List:
+    """Start the metrics exporter and access-log snapshots that config asks for; returns them for shutdown."""
+    services: List = []
+    if config.metrics_file or config.metrics_port:
+        from probe_metrics import MetricsExporter
+        exporter = MetricsExporter(server_manager.probe_metrics,
+                                   path=Path(config.metrics_file).expanduser() if config.metrics_file else None,
+                                   port=config.metrics_port)
+        try:
+            await exporter.start()
+            services.append(exporter)
+        except Exception as e:
+            logging.warning(f"Could not start probe metrics export: {e}")
+
+    if server_manager.access_log and config.access_log_snapshot_file:
+        from access_log import SnapshotWriter
+        snapshots = SnapshotWriter(server_manager.access_log.snapshot,
+                                   Path(config.access_log_snapshot_file).expanduser())
+        await snapshots.start()
+        services.append(snapshots)
+    return services
+
+def main(profiler: Optional[StartupProfiler] = None, instance: Optional['InstanceLock'] = None,
+         url: Optional[str] = None) -> None:
+    profiler = profiler or StartupProfiler(enabled=False)
     try:
         # Log startup information
         logging.info("Starting WebUI")
@@ -36,50 +178,221 @@ async def main() -> None:
         logging.info(f"Working directory: {os.getcwd()}")
 
         # Load configuration using pydantic
-        config: AppConfig = load_config()
-        logging.info(f"Configuration loaded: {config.to_json()}")
+        with profiler.phase('load_config'):
+            from config import load_config, save_config, AppConfig
+            config: AppConfig = load_config()
+        logging.info(f"Configuration loaded: {config.model_dump_json(exclude={'password'})}")
 
-        # Initialize server manager
-        server_manager: ServerManager = ServerManager()
-
-        # Check if server is already running
-        if await server_manager.check_port():
-            logging.info("Server is already running on port 8080")
-        else:
-            # Attempt to start server if not running
-            server_started: bool = False
-            for method in ['direct', 'piped']:
-                logging.info(f"Attempting to start server using method: {method}")
-                if await server_manager.start_server(method=method):
-                    server_started = True
-                    break
-                else:
-                    logging.warning(f"Server startup failed using method: {method}")
-
-            if not server_started:
-                logging.error("All server startup methods failed. Exiting.")
-                sys.exit(1)
+        server_manager = build_server_manager(config)
+        # The server manager and everything async live on this loop; the main thread belongs to the GUI
+        loop_thread = LoopThread().start()
 
         atexit.register(lambda: save_config(config))
-        atexit.register(lambda: cleanup_server(server_manager))
+        atexit.register(lambda: cleanup_server(server_manager, loop_thread))
+
+        services: List = loop_thread.run(start_services(server_manager, config), timeout=10)
+
+        # Optional caching front end: the window loads through it so static assets come from cache
+        frontend: Optional[CachingFrontend] = None
+        page_url = url or str(config.start_url)
+        if config.asset_cache:
+            with profiler.phase('asset_cache'):
+                from asset_cache import AssetCache, CachingFrontend
+                cache = AssetCache(memory_bytes=config.asset_cache_memory_mb * 1024 * 1024,
+                                   disk_bytes=config.asset_cache_disk_mb * 1024 * 1024)
+                frontend = CachingFrontend(page_url, config.asset_cache_port, cache)
+                try:
+                    loop_thread.run(frontend.start(), timeout=5)
+                    page_url = frontend.url_for(page_url)
+                    services.append(frontend)
+                except Exception as e:
+                    logging.warning(f"Asset cache disabled; could not start caching proxy: {e}")
+                    frontend = None
 
-        # Start the UI window with server manager
-        ui: UIManager = UIManager(config, server_manager)
+        # Create the window first so it can subscribe to server events, then boot the server
+        # concurrently; the window shows a splash page until the server reports ready
+        with profiler.phase('create_window'):
+            from ui_manager import UIManager
+            ui: UIManager = UIManager(config, server_manager, page_url=page_url,
+                                      asset_cache=frontend.cache if frontend else None, loop_thread=loop_thread)
+            boot = loop_thread.submit(boot_server(server_manager, config, profiler))
+            ui.create_window()
+        boot.add_done_callback(lambda _: profiler.finish())
+
+        if instance:
+            # Later launches hand their request to this window instead of opening their own
+            def on_second_launch(request: dict) -> dict:
+                target = request.get('url')
+                if target and frontend:
+                    target = frontend.url_for(target)
+                return {'ok': ui.focus_window(target)}
+
+            try:
+                loop_thread.run(instance.serve(on_second_launch), timeout=5)
+                services.append(instance)
+            except Exception as e:
+                logging.warning(f"Not answering later launches: {e}")
         ui.run_window()
 
-        # After window closes, stop the server if running
-        if await server_manager.check_port():
-            await server_manager.stop_server()
+        # After window closes
+        boot.cancel()
+        with tracing.span('shutdown'):
+            try:
+                loop_thread.run(shutdown_server(server_manager, services, force_stop=ui.shutdown_requested),
+                                timeout=server_manager.stop_timeout + 10)
+            except concurrent.futures.TimeoutError:
+                # cleanup_server() kills the process group at exit if the server is still ours
+                logging.error("Shutdown did not finish in time")
+            with tracing.span('loop_thread.stop'):
+                loop_thread.stop()
 
     except Exception:
         logging.exception("Fatal error occurred")
         sys.exit(1)
 
+async def run_headless(server_manager: 'ServerManager', config: 'AppConfig',
+                       profiler: Optional[StartupProfiler] = None) -> int:
+    """Start and supervise the server without a window until SIGTERM/SIGINT; returns the exit code.
+
+    Progress is reported over the sd_notify protocol: READY=1 once the server answers, STATUS=
+    on every state change, WATCHDOG=1 after each passed health probe if the service manager asked
+    for them, STOPPING=1.
+    """
+    import signal
+    from sd_notify import notify, watchdog_interval
+    profiler = profiler or StartupProfiler(enabled=False)
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    exit_code = 0
+    ready = False
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except NotImplementedError:  # Windows: Ctrl+C arrives as KeyboardInterrupt instead
+            pass
+
+    def on_event(event) -> None:
+        nonlocal exit_code
+        notify(f'STATUS=Server {event.state}: {event.reason}')
+        supervisor = server_manager.supervisor
+        # Failed start attempts report 'crashed' too, and boot_server moves on to the next method;
+        # only a crash after the server was ready ends the process
+        if ready and event.state == 'crashed' and (supervisor is None or supervisor.tripped):
+            # Nothing will bring the server back from here; exit so the service manager can
+            logging.error("Server crashed and will not be restarted; exiting")
+            exit_code = 1
+            stop.set()
+
+    async def ping_watchdog(interval: float) -> None:
+        # Pinged only after a health probe the server passes, so a hung server lets the watchdog fire
+        while True:
+            started = loop.time()
+            status = await server_manager.probe_http()
+            if status is not None and status < 500:
+                notify('WATCHDOG=1')
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+    server_manager.subscribe(on_event)
+    services = await start_services(server_manager, config)
+    boot = asyncio.ensure_future(boot_server(server_manager, config, profiler))
+    stopped = asyncio.ensure_future(stop.wait())
+    watchdog: Optional[asyncio.Task] = None
+    try:
+        await asyncio.wait({boot, stopped}, return_when=asyncio.FIRST_COMPLETED)
+        profiler.finish()
+        if not boot.done():
+            # Stopped while still booting
+            boot.cancel()
+            await asyncio.gather(boot, return_exceptions=True)
+        elif not boot.result():
+            exit_code = 1
+        else:
+            ready = True
+            notify('READY=1', f'STATUS=Server running at {server_manager.url}', f'MAINPID={os.getpid()}')
+            logging.info(f"Server running at {server_manager.url}; send SIGTERM or press Ctrl+C to stop")
+            interval = watchdog_interval()
+            if interval:
+                watchdog = asyncio.ensure_future(ping_watchdog(interval))
+            await stopped
+    finally:
+        for task in (stopped, watchdog):
+            if task:
+                task.cancel()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.remove_signal_handler(signum)
+            except NotImplementedError:
+                pass
+        server_manager.unsubscribe(on_event)
+        notify('STOPPING=1', 'STATUS=Stopping server')
+        await shutdown_server(server_manager, services, force_stop=True)
+    return exit_code
+
+def main_headless(profiler: Optional[StartupProfiler] = None) -> int:
+    """Entry point for --headless: the server manager and its monitoring, with no GUI imported."""
+    logging.info("Starting WebUI server manager (headless)")
+    logging.info(f"Python version: {sys.version}")
+    with (profiler or StartupProfiler(enabled=False)).phase('load_config'):
+        from config import load_config
+        config = load_config()
+    logging.info(f"Configuration loaded: {config.model_dump_json(exclude={'password'})}")
+    server_manager = build_server_manager(config, headless=True)
+    return asyncio.run(run_headless(server_manager, config, profiler))
+
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Desktop wrapper for Open WebUI')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Record per-module import cost and per-phase startup time')
+    parser.add_argument('--trace', type=Path, metavar='FILE',
+                        help='Write a Chrome trace (open in ui.perfetto.dev) of launch and shutdown to FILE')
+    parser.add_argument('--url', help='Page to open instead of start_url (in the running window, if any)')
+    parser.add_argument('--headless', action='store_true',
+                        help='Run and supervise the server without a window until SIGTERM (for systemd and servers)')
+    parser.add_argument('--new-instance', action='store_true',
+                        help='Start a separate instance even if the app is already running')
+    return parser.parse_args(argv)
+
+def claim_instance(args: argparse.Namespace) -> Optional['InstanceLock']:
+    """Become the single running instance, or hand off to the one already running and exit."""
+    from single_instance import SINGLE_INSTANCE_SUPPORTED, InstanceLock, notify_running_instance
+    if args.new_instance or not SINGLE_INSTANCE_SUPPORTED:
+        return None
+    instance = InstanceLock()
+    if instance.acquire():
+        return instance
+    reply = notify_running_instance({'command': 'focus', 'url': args.url})
+    if reply and reply.get('ok'):
+        logging.info("WebUI is already running; brought its window to the front")
+        sys.exit(0)
+    logging.error("WebUI is already running but did not respond; use --new-instance to start another")
+    sys.exit(1)
+
+
 if __name__ == '__main__':
+    args = parse_args()
+    if args.trace:
+        tracing.enable()
+    # Before anything heavy is imported, so a second launch costs only a few milliseconds; the
+    # headless server manager has no window to hand off to
+    instance_lock = None if args.headless else claim_instance(args)
+    startup_profiler = StartupProfiler(enabled=args.profile_startup)
+    startup_profiler.install()
+    exit_code = 0
     try:
-        asyncio.run(main())
+        with tracing.span('main'):
+            if args.headless:
+                exit_code = main_headless(startup_profiler)
+            else:
+                main(startup_profiler, instance_lock, args.url)
     except KeyboardInterrupt:
         logging.info("Application terminated by user")
     except Exception:
         logging.exception("Fatal error in main")
-        sys.exit(1)
+        exit_code = 1
+    finally:
+        if instance_lock:
+            instance_lock.release()
+        tracer = tracing.disable()
+        if tracer:
+            tracer.write(args.trace)
+    sys.exit(exit_code)
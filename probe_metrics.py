@@ -0,0 +1,207 @@
+"""Rolling latency histogram for HTTP health probes, with Prometheus text export.
+
+Probe latencies are counted into fixed buckets; the buckets for the last
+``window_seconds`` live in one preallocated array split into time slices, so the
+rolling p50/p95/p99 cost the same however long the app runs. Cumulative bucket
+counts are kept alongside for the Prometheus histogram.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Sequence
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+# Upper bucket bounds in seconds; a final overflow bucket catches everything slower
+BUCKET_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ERROR_KINDS = ('timeout', 'connect', 'http_5xx')
+METRIC_PREFIX = 'webui_probe'
+
+
+def bucket_percentile(bounds: Sequence[float], counts: Sequence[int], q: float) -> Optional[float]:
+    """Estimate the q-th quantile from per-bucket counts (len(bounds) + 1 buckets, last one overflow)."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(counts):
+        if count and seen + count >= rank:
+            if i == len(bounds):
+                return bounds[-1]
+            # Interpolate linearly inside the bucket
+            lower = bounds[i - 1] if i else 0.0
+            return lower + (bounds[i] - lower) * (rank - seen) / count
+        seen += count
+    return bounds[-1]
+
+
+class ProbeMetrics:
+    def __init__(self, window_seconds: float = 300, slices: int = 10, bounds: Sequence[float] = BUCKET_BOUNDS,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if window_seconds <= 0 or slices <= 0:
+            raise ValueError("Probe metrics window must be positive")
+        self.window_seconds = window_seconds
+        self.slices = slices
+        self.slice_seconds = window_seconds / slices
+        self.bounds = tuple(bounds)
+        self.clock = clock
+        # Each row holds one time slice: a count per latency bucket, then a count per error kind
+        self._width = len(self.bounds) + 1 + len(ERROR_KINDS)
+        self._rows = array('L', bytes(array('L').itemsize * slices * self._width))
+        self._row_ids = array('q', [-1] * slices)
+        self._totals = array('Q', bytes(8 * self._width))
+        self._sum = 0.0
+        self.last_latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _row(self, slice_id: int) -> int:
+        index = slice_id % self.slices
+        offset = index * self._width
+        if self._row_ids[index] != slice_id:
+            for i in range(offset, offset + self._width):
+                self._rows[i] = 0
+            self._row_ids[index] = slice_id
+        return offset
+
+    def _bucket(self, latency: float) -> int:
+        for i, bound in enumerate(self.bounds):
+            if latency <= bound:
+                return i
+        return len(self.bounds)
+
+    def record(self, latency: Optional[float], error: Optional[str] = None) -> None:
+        """Count one probe. latency is None when no HTTP response arrived."""
+        if error is not None and error not in ERROR_KINDS:
+            raise ValueError(f"Unknown probe error kind: {error}")
+        with self._lock:
+            offset = self._row(int(self.clock() // self.slice_seconds))
+            if latency is not None:
+                bucket = self._bucket(latency)
+                self._rows[offset + bucket] += 1
+                self._totals[bucket] += 1
+                self._sum += latency
+                self.last_latency = latency
+            if error is not None:
+                column = len(self.bounds) + 1 + ERROR_KINDS.index(error)
+                self._rows[offset + column] += 1
+                self._totals[column] += 1
+            self.last_error = error
+
+    def _window(self) -> array:
+        """Sum the rows still inside the rolling window."""
+        current = int(self.clock() // self.slice_seconds)
+        counts = array('Q', bytes(8 * self._width))
+        for index, slice_id in enumerate(self._row_ids):
+            if slice_id >= 0 and current - slice_id < self.slices:
+                offset = index * self._width
+                for i in range(self._width):
+                    counts[i] += self._rows[offset + i]
+        return counts
+
+    def snapshot(self) -> Dict:
+        """Rolling percentiles (in seconds) and error counts for the controls bar."""
+        with self._lock:
+            counts = self._window()
+            buckets = counts[:len(self.bounds) + 1]
+            errors = {kind: counts[len(self.bounds) + 1 + i] for i, kind in enumerate(ERROR_KINDS)}
+            return {
+                'window_seconds': self.window_seconds,
+                'samples': sum(buckets),
+                'p50': bucket_percentile(self.bounds, buckets, 0.50),
+                'p95': bucket_percentile(self.bounds, buckets, 0.95),
+                'p99': bucket_percentile(self.bounds, buckets, 0.99),
+                'errors': errors,
+                'last_latency': self.last_latency,
+                'last_error': self.last_error,
+            }
+
+    def to_prometheus(self, prefix: str = METRIC_PREFIX) -> str:
+        with self._lock:
+            totals = self._totals[:]
+            latency_sum = self._sum
+        snapshot = self.snapshot()
+        name = f'{prefix}_latency_seconds'
+        lines = [f'# HELP {name} Latency of HTTP health probes against open-webui.',
+                 f'# TYPE {name} histogram']
+        cumulative = 0
+        for bound, count in zip(self.bounds, totals):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += totals[len(self.bounds)]
+        lines += [f'{name}_bucket{{le="+Inf"}} {cumulative}',
+                  f'{name}_sum {latency_sum:.6f}',
+                  f'{name}_count {cumulative}']
+        lines += [f'# HELP {prefix}_errors_total Failed HTTP health probes by kind.',
+                  f'# TYPE {prefix}_errors_total counter']
+        for i, kind in enumerate(ERROR_KINDS):
+            lines.append(f'{prefix}_errors_total{{kind="{kind}"}} {totals[len(self.bounds) + 1 + i]}')
+        rolling = f'{prefix}_rolling_latency_seconds'
+        lines += [f'# HELP {rolling} Probe latency percentiles over the last {self.window_seconds:g} seconds.',
+                  f'# TYPE {rolling} gauge']
+        for key, quantile in (('p50', '0.5'), ('p95', '0.95'), ('p99', '0.99')):
+            if snapshot[key] is not None:
+                lines.append(f'{rolling}{{quantile="{quantile}"}} {snapshot[key]:.6f}')
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """Publish probe metrics as a Prometheus text file, a localhost /metrics endpoint, or both."""
+
+    def __init__(self, metrics: ProbeMetrics, path: Optional[Path] = None, port: Optional[int] = None,
+                 host: str = '127.0.0.1', interval: float = 15.0) -> None:
+        self.metrics = metrics
+        self.path = path
+        self.port = port
+        self.host = host
+        self.interval = interval
+        self._runner: Optional['web.AppRunner'] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def write_file(self) -> None:
+        """Write the metrics atomically so a scraper never reads half a file."""
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(self.metrics.to_prometheus(), encoding='utf-8')
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write metrics file {self.path}: {e}")
+
+    async def _write_periodically(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await loop.run_in_executor(None, self.write_file)
+            await asyncio.sleep(self.interval)
+
+    async def _handle(self, request: 'web.Request') -> 'web.Response':
+        from aiohttp import web
+        return web.Response(text=self.metrics.to_prometheus(), content_type='text/plain', charset='utf-8',
+                            headers={'Cache-Control': 'no-store'})
+
+    async def start(self) -> None:
+        if self.path:
+            self._task = asyncio.ensure_future(self._write_periodically())
+        if self.port:
+            from aiohttp import web
+            app = web.Application()
+            app.router.add_get('/metrics', self._handle)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            logging.info(f"Probe metrics served on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+            await asyncio.get_running_loop().run_in_executor(None, self.write_file)
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,136 @@
+"""Resource telemetry for the server's process tree, sampled from /proc.
+
+Each sample sums RSS, CPU time, threads and open file descriptors over the
+server process and all its descendants (open-webui spawns workers). Samples
+go into a fixed-capacity ring of typed arrays, so an hour of history costs a
+few tens of kilobytes. Platforms without /proc report no telemetry.
+"""
+import os
+import threading
+from array import array
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROC = Path('/proc')
+TELEMETRY_SUPPORTED = PROC.is_dir()
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+@dataclass
+class ProcSample:
+    timestamp: float
+    rss_bytes: int
+    cpu_seconds: float
+    threads: int
+    fds: int
+    processes: int
+
+
+def _read_stat(pid: int, proc: Path = PROC) -> Optional[List[str]]:
+    """Fields of /proc/<pid>/stat after the command name, which may itself contain spaces."""
+    try:
+        raw = (proc / str(pid) / 'stat').read_text()
+    except OSError:
+        return None
+    return raw[raw.rfind(')') + 2:].split()
+
+
+def process_tree(pid: int, proc: Path = PROC) -> List[int]:
+    """pid and all of its live descendants."""
+    children: Dict[int, List[int]] = {}
+    for entry in proc.iterdir():
+        if entry.name.isdigit():
+            fields = _read_stat(int(entry.name), proc)
+            if fields:
+                children.setdefault(int(fields[1]), []).append(int(entry.name))
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children.get(current, ()))
+    return tree
+
+
+def sample_tree(pid: int, timestamp: float, proc: Path = PROC) -> Optional[ProcSample]:
+    """Sum resource usage over a process tree; None if the root process is gone."""
+    sample = ProcSample(timestamp, 0, 0.0, 0, 0, 0)
+    for member in process_tree(pid, proc):
+        # proc(5) field N is at index N - 3 once pid and comm are stripped
+        fields = _read_stat(member, proc)
+        if fields is None:
+            continue
+        sample.processes += 1
+        sample.cpu_seconds += (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+        sample.threads += int(fields[17])
+        sample.rss_bytes += int(fields[21]) * PAGE_SIZE
+        try:
+            sample.fds += len(os.listdir(proc / str(member) / 'fd'))
+        except OSError:
+            pass
+    return sample if sample.processes else None
+
+
+class TelemetrySeries:
+    """Fixed-capacity ring buffer of ProcSamples stored column-wise in typed arrays."""
+
+    def __init__(self, capacity: int = 720) -> None:
+        if capacity <= 0:
+            raise ValueError("Telemetry capacity must be positive")
+        self.capacity = capacity
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._rss = array('Q', bytes(8 * capacity))
+        self._cpu = array('d', bytes(8 * capacity))
+        self._threads = array('I', bytes(4 * capacity))
+        self._fds = array('I', bytes(4 * capacity))
+        self._processes = array('H', bytes(2 * capacity))
+        self._count = 0  # samples ever appended
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def append(self, sample: ProcSample) -> None:
+        with self._lock:
+            i = self._count % self.capacity
+            self._timestamps[i] = sample.timestamp
+            self._rss[i] = sample.rss_bytes
+            self._cpu[i] = sample.cpu_seconds
+            self._threads[i] = sample.threads
+            self._fds[i] = sample.fds
+            self._processes[i] = min(sample.processes, 0xFFFF)
+            self._count += 1
+
+    def _get(self, age: int) -> ProcSample:
+        """The sample appended age steps before the newest one."""
+        i = (self._count - 1 - age) % self.capacity
+        return ProcSample(self._timestamps[i], self._rss[i], self._cpu[i], self._threads[i], self._fds[i],
+                          self._processes[i])
+
+    def samples(self, limit: Optional[int] = None) -> List[ProcSample]:
+        """Newest samples last."""
+        with self._lock:
+            n = len(self) if limit is None else min(limit, len(self))
+            return [self._get(age) for age in range(n - 1, -1, -1)]
+
+    def cpu_percent(self, window: int = 1) -> Optional[float]:
+        """Average CPU use over the last window sampling intervals (100 = one full core)."""
+        with self._lock:
+            if len(self) <= window:
+                return None
+            newest, oldest = self._get(0), self._get(window)
+        elapsed = newest.timestamp - oldest.timestamp
+        if elapsed <= 0:
+            return None
+        # Exited children take their CPU time with them; never report a negative rate
+        return max(0.0, (newest.cpu_seconds - oldest.cpu_seconds) / elapsed * 100)
+
+    def to_dict(self, limit: int = 120) -> Dict:
+        samples = self.samples(limit)
+        return {
+            'latest': asdict(samples[-1]) if samples else None,
+            'cpu_percent': self.cpu_percent(),
+            'peak_rss_bytes': max((s.rss_bytes for s in samples), default=None),
+            'samples': [asdict(s) for s in samples],
+        }
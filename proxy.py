@@ -0,0 +1,193 @@
+"""Asyncio reverse proxy that fronts one or more open-webui instances.
+
+Requests are forwarded over a pooled aiohttp session with bodies streamed in both
+directions. WebSocket upgrades are bridged message by message. The choice of
+backend is delegated to a picker callable, so the routing policy (least
+connections, sticky sessions) lives with whoever owns the backends.
+"""
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Callable, Optional, Protocol
+
+import aiohttp
+from aiohttp import web
+from multidict import CIMultiDict
+
+if TYPE_CHECKING:
+    from asset_cache import AssetCache, CacheEntry
+
+# Headers that describe a single hop and must not be forwarded
+HOP_BY_HOP = frozenset({
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'te', 'trailer',
+    'transfer-encoding', 'upgrade', 'host',
+})
+WEBSOCKET_HANDSHAKE = frozenset({
+    'sec-websocket-key', 'sec-websocket-version', 'sec-websocket-extensions', 'sec-websocket-protocol',
+})
+
+
+class Backend(Protocol):
+    url: str  # base URL without trailing slash, e.g. http://127.0.0.1:40123
+    active: int  # in-flight requests and open websockets
+
+
+def is_websocket(request: web.Request) -> bool:
+    return (request.headers.get('Upgrade', '').lower() == 'websocket'
+            and 'upgrade' in request.headers.get('Connection', '').lower())
+
+
+def forward_headers(request: web.Request) -> CIMultiDict:
+    headers = CIMultiDict((k, v) for k, v in request.headers.items()
+                          if k.lower() not in HOP_BY_HOP and k.lower() not in WEBSOCKET_HANDSHAKE)
+    headers['X-Forwarded-For'] = request.remote or ''
+    headers['X-Forwarded-Host'] = request.host
+    headers['X-Forwarded-Proto'] = request.scheme
+    return headers
+
+
+class ReverseProxy:
+    def __init__(self, pick_backend: Callable[[web.Request], Optional[Backend]], host: str = '127.0.0.1',
+                 port: int = 8080, chunk_size: int = 64 * 1024, cache: Optional['AssetCache'] = None) -> None:
+        self.pick_backend = pick_backend
+        self.cache = cache
+        self.host = host
+        self.port = port
+        self.chunk_size = chunk_size
+        self._runner: Optional[web.AppRunner] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        self._session = aiohttp.ClientSession(
+            auto_decompress=False,
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=5),
+            connector=aiohttp.TCPConnector(limit=0),
+        )
+        app = web.Application(client_max_size=0)
+        app.router.add_route('*', '/{path:.*}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logging.info(f"Proxy listening on http://{self.host}:{self.port}/")
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        cacheable = False
+        entry = None
+        if self.cache is not None and request.method == 'GET' and not is_websocket(request):
+            from asset_cache import is_static_path
+            cacheable = is_static_path(request.path)
+            if cacheable:
+                entry = await self.cache.get(self.cache.key(request))
+                # Immutable assets never need the server, even while it is restarting
+                if entry is not None and entry.immutable:
+                    return self._cached_response(request, entry)
+            else:
+                self.cache.counters['bypassed'] += 1
+        backend = self.pick_backend(request)
+        if backend is None:
+            if entry is not None:
+                return self._cached_response(request, entry)
+            return web.Response(status=503, text='No healthy open-webui instance available')
+        backend.active += 1
+        try:
+            if is_websocket(request):
+                return await self._proxy_websocket(request, backend)
+            if cacheable:
+                return await self._proxy_cacheable(request, backend, entry)
+            return await self._proxy_http(request, backend)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.warning(f"Proxy request to {backend.url} failed: {e}")
+            if entry is not None:
+                return self._cached_response(request, entry)
+            return web.Response(status=502, text='Bad gateway')
+        finally:
+            backend.active -= 1
+
+    async def _proxy_http(self, request: web.Request, backend: Backend) -> web.StreamResponse:
+        async with self._session.request(
+            request.method,
+            backend.url + request.rel_url.path_qs,
+            headers=forward_headers(request),
+            data=request.content if request.body_exists else None,
+            allow_redirects=False,
+        ) as upstream:
+            return await self._relay(request, upstream)
+
+    def _cached_response(self, request: web.Request, entry: 'CacheEntry') -> web.Response:
+        """Serve a cache entry, answering the client's own If-None-Match with 304."""
+        if entry.etag and request.headers.get('If-None-Match') == entry.etag:
+            return web.Response(status=304, headers={'ETag': entry.etag})
+        return web.Response(status=entry.status, body=entry.body, headers=entry.headers)
+
+    async def _proxy_cacheable(self, request: web.Request, backend: Backend,
+                               entry: Optional['CacheEntry']) -> web.StreamResponse:
+        """Fetch a static asset for the cache, revalidating a stored copy with If-None-Match."""
+        from asset_cache import STORED_HEADERS, CacheEntry, is_immutable
+        key = self.cache.key(request)
+        headers = forward_headers(request)
+        for name in ('If-None-Match', 'If-Modified-Since', 'Range'):
+            headers.pop(name, None)
+        headers['Accept-Encoding'] = key.rsplit('|', 1)[1]
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        async with self._session.get(backend.url + request.rel_url.path_qs, headers=headers,
+                                     allow_redirects=False) as upstream:
+            if upstream.status == 304 and entry is not None:
+                self.cache.counters['revalidated'] += 1
+                return self._cached_response(request, entry)
+            if upstream.status != 200 or 'no-store' in upstream.headers.get('Cache-Control', ''):
+                self.cache.counters['misses'] += 1
+                return await self._relay(request, upstream)
+            body = await upstream.read()
+            stored = {name: upstream.headers[name] for name in STORED_HEADERS if name in upstream.headers}
+            entry = CacheEntry(200, stored, body, is_immutable(request.path, stored.get('Cache-Control', '')))
+            self.cache.counters['misses'] += 1
+            await self.cache.put(key, entry)
+            return self._cached_response(request, entry)
+
+    async def _relay(self, request: web.Request, upstream: aiohttp.ClientResponse) -> web.StreamResponse:
+        headers = CIMultiDict((k, v) for k, v in upstream.headers.items() if k.lower() not in HOP_BY_HOP)
+        response = web.StreamResponse(status=upstream.status, reason=upstream.reason, headers=headers)
+        await response.prepare(request)
+        async for chunk in upstream.content.iter_chunked(self.chunk_size):
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+
+    async def _proxy_websocket(self, request: web.Request, backend: Backend) -> web.StreamResponse:
+        protocols = [p.strip() for p in request.headers.get('Sec-WebSocket-Protocol', '').split(',') if p.strip()]
+        url = backend.url.replace('http', 'ws', 1) + request.rel_url.path_qs
+        async with self._session.ws_connect(url, headers=forward_headers(request), protocols=protocols,
+                                            autoping=False) as upstream:
+            client = web.WebSocketResponse(protocols=protocols, autoping=False)
+            await client.prepare(request)
+
+            async def pump(source, target) -> None:
+                async for message in source:
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        await target.send_str(message.data)
+                    elif message.type == aiohttp.WSMsgType.BINARY:
+                        await target.send_bytes(message.data)
+                    elif message.type == aiohttp.WSMsgType.PING:
+                        await target.ping(message.data)
+                    elif message.type == aiohttp.WSMsgType.PONG:
+                        await target.pong(message.data)
+                    else:
+                        break
+                await target.close()
+
+            tasks = [asyncio.ensure_future(pump(client, upstream)), asyncio.ensure_future(pump(upstream, client))]
+            try:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            return client
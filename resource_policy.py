@@ -0,0 +1,145 @@
+"""CPU, I/O and memory governance for the spawned open-webui server.
+
+The policy is applied to the child right after it is spawned, while
+open-webui is still importing and before it starts any workers, so every
+worker inherits it. Applying it afterwards rather than in a preexec_fn keeps
+spawning safe from our threaded process. The values the kernel actually took
+are read back and logged, and any mismatch is reported.
+"""
+import ctypes
+import logging
+import os
+import platform
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+IONICE_CLASSES = {'realtime': 1, 'best-effort': 2, 'idle': 3}
+# ioprio_get/ioprio_set have no libc wrapper; their syscall numbers per architecture
+_IOPRIO_SYSCALLS = {'x86_64': (252, 251), 'aarch64': (31, 30), 'i686': (290, 289), 'armv7l': (315, 314)}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_SHIFT = 13
+
+
+@dataclass
+class ResourcePolicy:
+    nice: Optional[int] = None
+    ionice_class: Optional[str] = None  # one of IONICE_CLASSES
+    ionice_level: Optional[int] = None  # 0 (highest) to 7, for realtime and best-effort
+    cpu_affinity: Optional[List[int]] = None
+    memory_limit_bytes: Optional[int] = None  # RLIMIT_DATA: heap and private mappings
+    max_open_files: Optional[int] = None  # RLIMIT_NOFILE
+    requested: Dict[str, Any] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.ionice_class is not None and self.ionice_class not in IONICE_CLASSES:
+            raise ValueError(f"Unknown ionice class: {self.ionice_class}")
+        if self.cpu_affinity is not None:
+            self.cpu_affinity = sorted(set(self.cpu_affinity))
+        self.requested = {name: value for name, value in (
+            ('nice', self.nice), ('ionice', self._ionice_value()), ('cpu_affinity', self.cpu_affinity),
+            ('memory_limit_bytes', self.memory_limit_bytes), ('max_open_files', self.max_open_files),
+        ) if value is not None}
+
+    def __bool__(self) -> bool:
+        return bool(self.requested)
+
+    def _ionice_value(self) -> Optional[str]:
+        if self.ionice_class is None:
+            return None
+        if self.ionice_class == 'idle':
+            return 'idle'
+        return f'{self.ionice_class}:{self.ionice_level if self.ionice_level is not None else 4}'
+
+
+def spawn_kwargs(policy: Optional[ResourcePolicy]) -> Dict[str, Any]:
+    """Extra subprocess arguments; Windows can only take a priority class at creation time."""
+    if sys.platform != 'win32' or not policy or policy.nice is None or policy.nice == 0:
+        return {}
+    if policy.nice < 0:
+        return {'creationflags': subprocess.ABOVE_NORMAL_PRIORITY_CLASS}
+    if policy.nice >= 15:
+        return {'creationflags': subprocess.IDLE_PRIORITY_CLASS}
+    return {'creationflags': subprocess.BELOW_NORMAL_PRIORITY_CLASS}
+
+
+def _ioprio_syscall(index: int, *args: int) -> int:
+    numbers = _IOPRIO_SYSCALLS.get(platform.machine())
+    if not sys.platform.startswith('linux') or numbers is None:
+        raise OSError(f"ionice is not supported on {platform.machine()}")
+    libc = ctypes.CDLL(None, use_errno=True)
+    result = libc.syscall(numbers[index], *args)
+    if result < 0:
+        raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+    return result
+
+
+def _get_ionice(pid: int) -> str:
+    value = _ioprio_syscall(0, _IOPRIO_WHO_PROCESS, pid)
+    io_class, level = value >> _IOPRIO_CLASS_SHIFT, value & ((1 << _IOPRIO_CLASS_SHIFT) - 1)
+    names = {number: name for name, number in IONICE_CLASSES.items()}
+    if io_class == 0:
+        return 'none'
+    return 'idle' if io_class == 3 else f'{names.get(io_class, io_class)}:{level}'
+
+
+def _set_ionice(pid: int, policy: ResourcePolicy) -> None:
+    level = 0 if policy.ionice_class == 'idle' else (policy.ionice_level if policy.ionice_level is not None else 4)
+    _ioprio_syscall(1, _IOPRIO_WHO_PROCESS, pid, IONICE_CLASSES[policy.ionice_class] << _IOPRIO_CLASS_SHIFT | level)
+
+
+def read_effective(pid: int) -> Dict[str, Any]:
+    """The scheduling and limits currently in force for pid, where this platform can tell."""
+    effective: Dict[str, Any] = {}
+    readers = {
+        'nice': lambda: os.getpriority(os.PRIO_PROCESS, pid),
+        'ionice': lambda: _get_ionice(pid),
+        'cpu_affinity': lambda: sorted(os.sched_getaffinity(pid)),
+        'memory_limit_bytes': lambda: resource.prlimit(pid, resource.RLIMIT_DATA)[0],
+        'max_open_files': lambda: resource.prlimit(pid, resource.RLIMIT_NOFILE)[0],
+    }
+    for name, read in readers.items():
+        try:
+            value = read()
+        except (AttributeError, OSError):
+            continue
+        if resource and value == getattr(resource, 'RLIM_INFINITY', None):
+            value = 'unlimited'
+        effective[name] = value
+    return effective
+
+
+def apply_policy(pid: int, policy: ResourcePolicy) -> Dict[str, Any]:
+    """Apply policy to a freshly spawned process; returns the effective values read back."""
+    setters = []
+    if policy.nice is not None and sys.platform != 'win32':
+        setters.append(('nice', lambda: os.setpriority(os.PRIO_PROCESS, pid, policy.nice)))
+    if policy.ionice_class is not None:
+        setters.append(('ionice', lambda: _set_ionice(pid, policy)))
+    if policy.cpu_affinity is not None:
+        setters.append(('cpu_affinity', lambda: os.sched_setaffinity(pid, policy.cpu_affinity)))
+    if policy.memory_limit_bytes is not None:
+        setters.append(('memory_limit_bytes', lambda: resource.prlimit(
+            pid, resource.RLIMIT_DATA, (policy.memory_limit_bytes, policy.memory_limit_bytes))))
+    if policy.max_open_files is not None:
+        setters.append(('max_open_files', lambda: resource.prlimit(
+            pid, resource.RLIMIT_NOFILE, (policy.max_open_files, policy.max_open_files))))
+    for name, apply in setters:
+        try:
+            apply()
+        except (AttributeError, OSError, ValueError) as e:
+            # AttributeError: the call does not exist on this platform (e.g. prlimit on macOS)
+            logging.warning(f"Could not apply server {name}={policy.requested[name]}: {e}")
+
+    effective = read_effective(pid)
+    logging.info("Server resource policy: " + ', '.join(f'{k}={v}' for k, v in effective.items()))
+    for name, wanted in policy.requested.items():
+        if name in effective and effective[name] != wanted:
+            logging.warning(f"Server {name} is {effective[name]}, not the configured {wanted}")
+    return effective
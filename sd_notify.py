@@ -0,0 +1,45 @@
+"""systemd-style service notifications for ``main.py --headless``.
+
+Implements the sd_notify(3) wire protocol: newline-separated assignments such as
+``READY=1`` or ``STATUS=...`` sent as one datagram to the Unix socket named by
+$NOTIFY_SOCKET. A leading ``@`` in the name means the abstract namespace. Under
+systemd (Type=notify) this tells the unit the server is up. Anything else can
+bind a datagram socket and set NOTIFY_SOCKET to receive the same messages.
+Without NOTIFY_SOCKET, notifications are skipped.
+"""
+import logging
+import os
+import socket
+from typing import Optional
+
+
+def notify(*assignments: str, socket_path: Optional[str] = None) -> bool:
+    """Send assignments (e.g. 'READY=1') to the notify socket; False if there is none or it failed."""
+    path = socket_path or os.environ.get('NOTIFY_SOCKET')
+    if not path or not hasattr(socket, 'AF_UNIX'):
+        return False
+    if path.startswith('@'):
+        path = '\0' + path[1:]
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            # Called on the event loop: a receiver that is not reading drops the message instead of
+            # blocking the loop once its queue (10 datagrams by default on Linux) is full
+            sock.setblocking(False)
+            sock.connect(path)
+            sock.sendall('\n'.join(assignments).encode())
+        return True
+    except OSError as e:
+        logging.warning(f"Could not send service notification to {path!r}: {e}")
+        return False
+
+
+def watchdog_interval() -> Optional[float]:
+    """Seconds between WATCHDOG=1 pings: half of $WATCHDOG_USEC, if the watchdog is meant for us."""
+    try:
+        usec = int(os.environ.get('WATCHDOG_USEC', ''))
+    except ValueError:
+        return None
+    pid = os.environ.get('WATCHDOG_PID')
+    if usec <= 0 or (pid and pid != str(os.getpid())):
+        return None
+    return usec / 2 / 1_000_000
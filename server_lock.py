@@ -0,0 +1,250 @@
+"""PID/lock file bookkeeping for a detached ("keep warm") open-webui server.
+
+The lock file records the detached server's PID and command line together with the
+PIDs of the UI processes currently attached to it. A small reaper process (run as
+``python server_lock.py reap``) stops the server once no UI has been attached for
+the configured idle timeout. Every read-modify-write of the client list holds an
+exclusive lock on a ``.guard`` file next to the lock file, so concurrent launches
+and the reaper never drop each other's updates.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_PATH = Path.home() / '.webui' / 'server.lock'
+
+
+@dataclass
+class ServerLock:
+    pid: int
+    cmdline: List[str]
+    url: str
+    started_at: float = field(default_factory=time.time)
+    clients: List[int] = field(default_factory=list)
+    idle_since: Optional[float] = None
+
+
+def read_lock(path: Path = LOCK_PATH) -> Optional[ServerLock]:
+    """Read the lock file, returning None when it is missing or unreadable."""
+    try:
+        return ServerLock(**json.loads(path.read_text()))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def write_lock(lock: ServerLock, path: Path = LOCK_PATH) -> None:
+    """Atomically write the lock file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps(asdict(lock)))
+    os.replace(tmp, path)
+
+
+@contextmanager
+def _guarded(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on the lock file's guard for one read-modify-write."""
+    guard = path.with_name(f'{path.name}.guard')
+    guard.parent.mkdir(parents=True, exist_ok=True)
+    with open(guard, 'a+b') as handle:
+        if fcntl is not None:
+            # Released when the file is closed
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            yield
+            return
+        handle.seek(0)
+        while True:
+            try:
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:  # LK_LOCK gives up after about 10 seconds
+                pass
+        try:
+            yield
+        finally:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def remove_lock(path: Path = LOCK_PATH) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def pid_alive(pid: int) -> bool:
+    """Return True if a process with the given PID exists."""
+    if pid <= 0:
+        return False
+    if sys.platform == 'win32':
+        import ctypes
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_cmdline(pid: int) -> Optional[List[str]]:
+    """Return the command line of a process, or None where it cannot be read."""
+    try:
+        raw = Path(f'/proc/{pid}/cmdline').read_bytes()
+    except OSError:
+        return None
+    return [arg.decode(errors='replace') for arg in raw.split(b'\0') if arg]
+
+
+def cmdline_matches(pid: int, expected: List[str]) -> bool:
+    """Check that a PID still runs the expected command.
+
+    Console scripts show up as ``python /path/to/open-webui serve``, so the check
+    compares executable basenames rather than full argument lists. Platforms without
+    /proc cannot be verified and are accepted.
+    """
+    actual = read_cmdline(pid)
+    if actual is None:
+        return True
+    names = [os.path.basename(arg).lower() for arg in actual]
+    program, *args = expected
+    return any(name.startswith(program) for name in names) and all(arg in actual for arg in args)
+
+
+def attach_client(pid: int, path: Path = LOCK_PATH) -> None:
+    """Register a UI process as attached to the detached server."""
+    with _guarded(path):
+        lock = read_lock(path)
+        if lock is None:
+            return
+        lock.clients = [client for client in lock.clients if client != pid and pid_alive(client)] + [pid]
+        lock.idle_since = None
+        write_lock(lock, path)
+
+
+def detach_client(pid: int, path: Path = LOCK_PATH) -> None:
+    """Unregister a UI process; starts the idle clock when no clients remain."""
+    with _guarded(path):
+        lock = read_lock(path)
+        if lock is None:
+            return
+        lock.clients = [client for client in lock.clients if client != pid and pid_alive(client)]
+        if not lock.clients:
+            lock.idle_since = time.time()
+        write_lock(lock, path)
+
+
+def signal_group(pid: int, force: bool = False) -> bool:
+    """SIGTERM (or SIGKILL if force) the process group led by pid; False if nothing was signalled.
+
+    On Windows a plain stop reaches only the process itself; force kills its whole tree.
+    """
+    try:
+        if sys.platform == 'win32':
+            if force:
+                result = subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)], capture_output=True)
+                return result.returncode == 0
+            os.kill(pid, signal.SIGTERM)
+        else:
+            os.killpg(pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        return False
+    except OSError as e:
+        logging.warning(f"Could not signal process group {pid}: {e}")
+        return False
+    return True
+
+
+def terminate_server(pid: int, timeout: float = 10.0) -> None:
+    """Stop a detached server and its process group, escalating to SIGKILL after timeout."""
+    if not signal_group(pid):
+        return
+    deadline = time.monotonic() + timeout
+    while pid_alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    # Also sweeps up workers that outlived the group leader
+    signal_group(pid, force=True)
+
+
+def spawn_reaper(idle_timeout: float, path: Path = LOCK_PATH) -> None:
+    """Launch the idle reaper as a detached process."""
+    kwargs = {}
+    if sys.platform == 'win32':
+        kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs['start_new_session'] = True
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), 'reap', '--lock', str(path), '--idle-timeout', str(idle_timeout)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+        **kwargs
+    )
+
+
+def run_reaper(idle_timeout: float, path: Path = LOCK_PATH, poll_interval: Optional[float] = None) -> None:
+    """Stop the detached server once no UI has been attached for idle_timeout seconds."""
+    if poll_interval is None:
+        poll_interval = min(max(idle_timeout / 4, 1.0), 30.0)
+    while True:
+        with _guarded(path):
+            lock = read_lock(path)
+            if lock is None:
+                return
+            if not pid_alive(lock.pid):
+                logging.info(f"Detached server {lock.pid} is gone; removing lock file")
+                remove_lock(path)
+                return
+            live_clients = [client for client in lock.clients if pid_alive(client)]
+            if live_clients != lock.clients:
+                lock.clients = live_clients
+                if not live_clients and lock.idle_since is None:
+                    lock.idle_since = time.time()
+                write_lock(lock, path)
+            idle = not live_clients and time.time() - (lock.idle_since or lock.started_at) >= idle_timeout
+            if idle:
+                # Removed before the guard is released, so no launch can attach to a server being stopped
+                remove_lock(path)
+        if idle:
+            logging.info(f"Detached server {lock.pid} idle for {idle_timeout:.0f}s; stopping it")
+            terminate_server(lock.pid)
+            return
+        time.sleep(poll_interval)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Detached open-webui server bookkeeping')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    reap = subparsers.add_parser('reap', help='Stop the detached server after an idle timeout')
+    reap.add_argument('--lock', type=Path, default=LOCK_PATH)
+    reap.add_argument('--idle-timeout', type=float, required=True)
+    args = parser.parse_args()
+    if args.command == 'reap':
+        run_reaper(args.idle_timeout, args.lock)
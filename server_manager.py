@@ -1,106 +1,634 @@
 import asyncio
 import logging
-from typing import Optional
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 from asyncio.subprocess import Process
-import aiohttp
+import tracing
+from access_log import AccessLogStats
+from log_buffer import LogRingBuffer
+from probe_metrics import ProbeMetrics
+from proc_telemetry import TELEMETRY_SUPPORTED, TelemetrySeries, sample_tree
+from resource_policy import ResourcePolicy, apply_policy, spawn_kwargs
+from server_lock import (LOCK_PATH, ServerLock, attach_client, cmdline_matches, detach_client, pid_alive,
+                         read_lock, remove_lock, signal_group, spawn_reaper, terminate_server, write_lock)
+
+SERVER_COMMAND = ['open-webui', 'serve']
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DETACHED_LOG_PATH = Path.home() / '.webui' / 'server.log'
+
+# aiohttp is imported where it is first needed so a plain port check stays cheap
+if TYPE_CHECKING:
+    import aiohttp
+    from startup_history import StartupHistory
+    from supervisor import Supervisor
+
+# uvicorn announces "Uvicorn running on http://0.0.0.0:8080" once the socket is bound
+READY_LINE_PATTERN = re.compile(rb'running on https?://', re.IGNORECASE)
+# Server output that means the boot cannot succeed, so there is no point waiting for readiness
+STARTUP_ERROR_PATTERNS = (
+    (re.compile(rb'address already in use|error while attempting to bind', re.IGNORECASE), 'port_in_use'),
+    (re.compile(rb'^(?:ModuleNotFoundError|ImportError): '), 'import_error'),
+)
+# Failures that retrying the same command with another startup method cannot fix
+PERMANENT_FAILURES = frozenset({'not_found', 'port_in_use', 'import_error'})
+
+
+@dataclass
+class StartupFailure:
+    """Why a start attempt failed: 'not_found', 'spawn_error', 'exited', 'port_in_use', 'import_error' or 'timeout'."""
+    reason: str
+    detail: str
+
+    @property
+    def permanent(self) -> bool:
+        return self.reason in PERMANENT_FAILURES
+
+    def __str__(self) -> str:
+        return f'{self.reason}: {self.detail}'
+
+
+@dataclass
+class ReadinessResult:
+    """Outcome of a readiness wait: which signal fired first and how long it took."""
+    ready: bool
+    signal: Optional[str]
+    elapsed: float
+    attempts: int
+    failure: Optional[StartupFailure] = None
+
+    def __bool__(self) -> bool:
+        return self.ready
+
+
+async def _probe(session: 'aiohttp.ClientSession', url: str) -> bool:
+    import aiohttp
+    try:
+        async with session.get(url) as response:
+            return response.status == 200
+    except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+        return False
+
+
+async def wait_for_server(url: str, timeout: float = 60, interval: float = 5,
+                          ready_event: Optional[asyncio.Event] = None,
+                          session: Optional['aiohttp.ClientSession'] = None,
+                          initial_interval: float = 0.05,
+                          jitter: float = 0.25,
+                          failure: Optional['asyncio.Future[StartupFailure]'] = None,
+                          expected: Optional[float] = None) -> ReadinessResult:
+    """Waits asynchronously until the server responds with HTTP 200 or ready_event is set.
+
+    Probes start at initial_interval and back off exponentially (with jitter) up to
+    interval, so readiness is noticed shortly after the server actually boots. If the
+    failure future resolves first (the child died or logged a fatal error), the wait
+    ends at once with that failure instead of running out the timeout.
+
+    With an expected ready time (from earlier launches), probes are packed densely
+    from 0.75x to 1.5x of it so a server that boots on schedule is noticed at once.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + timeout
+    own_session = session is None
+    if own_session:
+        import aiohttp
+        session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2))
+    event_task = asyncio.ensure_future(ready_event.wait()) if ready_event else None
+    delay = initial_interval
+    attempts = 0
+    if expected is not None:
+        dense_from, dense_until = expected * 0.75, expected * 1.5
+        dense_interval = max(initial_interval, min(expected * 0.05, 1.0))
+
+    def result(ready: bool, signal: Optional[str]) -> ReadinessResult:
+        failed = failure.result() if failure is not None and failure.done() and not ready else None
+        return ReadinessResult(ready, signal, loop.time() - start, attempts, failed)
+
+    # Signals that end the wait early, whether the probe is in flight or we are pausing between probes
+    signals = {task for task in (event_task, failure) if task is not None}
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return result(False, None)
+            attempts += 1
+            probe = asyncio.ensure_future(_probe(session, url))
+            done, _ = await asyncio.wait(signals | {probe}, timeout=remaining,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if event_task in done:
+                probe.cancel()
+                return result(True, 'stdout')
+            if probe in done and probe.result():
+                return result(True, 'http')
+            if failure in done or probe not in done:
+                probe.cancel()
+                return result(False, None)
 
-async def wait_for_server(url: str, timeout: int = 60, interval: int = 5) -> bool:
-    """Waits asynchronously until the server responds with HTTP 200."""
-    loop = asyncio.get_event_loop()
-    deadline = loop.time() + timeout
-    while loop.time() < deadline:
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        return True
-        except Exception:
             # Server isn't ready yet
-            await asyncio.sleep(interval)
-    return False
+            pause = delay * (1 + random.uniform(-jitter, jitter))
+            if expected is not None:
+                elapsed = loop.time() - start
+                if elapsed < dense_from:
+                    pause = min(pause, dense_from - elapsed)
+                elif elapsed < dense_until:
+                    pause = min(pause, dense_interval)
+            pause = min(pause, max(deadline - loop.time(), 0))
+            if signals:
+                done, _ = await asyncio.wait(signals, timeout=pause, return_when=asyncio.FIRST_COMPLETED)
+                if event_task in done:
+                    return result(True, 'stdout')
+                if done:
+                    return result(False, None)
+            else:
+                await asyncio.sleep(pause)
+            delay = min(delay * 2, interval)
+    finally:
+        if event_task and not event_task.done():
+            event_task.cancel()
+        if own_session:
+            await session.close()
+
+@dataclass
+class ServerStatusEvent:
+    """A server state change pushed to subscribers: 'starting', 'running', 'stopped' or 'crashed'."""
+    state: str
+    reason: str
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
 
 class ServerManager:
-    def __init__(self, cwd: Optional[str] = None) -> None:
+    def __init__(self, cwd: Optional[str] = None, keep_warm: bool = False, idle_timeout: float = 1800,
+                 lock_path: Path = LOCK_PATH, log_buffer_lines: int = 2000,
+                 log_buffer_bytes: int = 512 * 1024, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 ready_timeout: float = 60, extra_args: Optional[List[str]] = None,
+                 probe_timeout: float = 5.0, supervise: bool = False, rss_limit_bytes: Optional[int] = None,
+                 idle_cpu_percent: float = 5.0, resource_policy: Optional[ResourcePolicy] = None,
+                 stop_timeout: float = 5.0, parse_access_log: bool = False,
+                 history: Optional['StartupHistory'] = None, warmup_paths: Optional[List[str]] = None,
+                 warmup_concurrency: int = 4, warmup_timeout: float = 10.0) -> None:
         # The working directory (if needed) to locate your server's executable
         self.cwd = cwd
         self.process: Optional[Process] = None
-        self._port = 8080
-        self._host = '127.0.0.1'
+        # Keep-warm mode: the server outlives the app and later launches reattach to it
+        self.keep_warm = keep_warm
+        self.idle_timeout = idle_timeout
+        self.lock_path = lock_path
+        self.detached_pid: Optional[int] = None
+        # Recent server output for the controls bar log viewer (piped output only)
+        self.log_buffer: Optional[LogRingBuffer] = None
+        if log_buffer_lines > 0 and log_buffer_bytes > 0:
+            self.log_buffer = LogRingBuffer(max_lines=log_buffer_lines, max_bytes=log_buffer_bytes)
+        self._port = port
+        self._host = host
+        self.ready_timeout = ready_timeout
+        self.extra_args = list(extra_args or [])
         self._monitor_task: Optional[asyncio.Task] = None
         self._connection_callback = None
         self._last_state = None
+        self._subscribers: List[Callable] = []
+        self.state: Optional[str] = None
+        self._stopping = False
+        self._session: Optional['aiohttp.ClientSession'] = None
+        self._ready_event: Optional[asyncio.Event] = None
+        self.last_readiness: Optional[ReadinessResult] = None
+        # Resolved by the process watcher or the log reader when a start attempt fails early
+        self._startup_failure: Optional['asyncio.Future[StartupFailure]'] = None
+        self.last_failure: Optional[StartupFailure] = None
+        self._log_tasks: List[asyncio.Task] = []
+        self._last_output = ''
+        # Outcomes of earlier launches: tunes the probe schedule and records this one
+        self.history = history
+        # Paths requested once the server is ready so its caches and lazy imports are hot
+        # before the user's first click
+        self.warmup_paths = list(warmup_paths or [])
+        self.warmup_concurrency = warmup_concurrency
+        self.warmup_timeout = warmup_timeout
+        self.last_warmup: Optional[Dict[str, Any]] = None
+        self._warmup_task: Optional[asyncio.Task] = None
+        # Latency and errors of the HTTP health probes, over a rolling window
+        self.probe_metrics = ProbeMetrics()
+        self.probe_timeout = probe_timeout
+        # CPU/memory history of the server's process tree; rss_limit_bytes triggers a soft restart
+        # once usage has been above the limit while the server sat idle (below idle_cpu_percent)
+        self.telemetry = TelemetrySeries()
+        self.rss_limit_bytes = rss_limit_bytes
+        self.idle_cpu_percent = idle_cpu_percent
+        self._telemetry_task: Optional[asyncio.Task] = None
+        # Scheduling and limits applied to every child we spawn, and what the kernel reported back
+        self.resource_policy = resource_policy
+        # Seconds between SIGTERM and SIGKILL for the server's process group
+        self.stop_timeout = stop_timeout
+        self.effective_resources: Dict[str, Any] = {}
+        # Per-route request statistics from the access log (piped output only)
+        self.access_log: Optional[AccessLogStats] = AccessLogStats() if parse_access_log else None
+        # Startup method of the last start_server() call, reused for automatic restarts
+        self.method = 'direct'
+        self.supervisor: Optional['Supervisor'] = None
+        if supervise:
+            from supervisor import Supervisor
+            self.supervisor = Supervisor(self)
+
+    @property
+    def owns_server(self) -> bool:
+        """True when this manager spawned the server process it is managing."""
+        return self.process is not None
+
+    @property
+    def captures_output(self) -> bool:
+        """True when the server's output feeds the log buffer or access-log stats, which only 'piped' provides."""
+        return self.log_buffer is not None or self.access_log is not None
+
+    @property
+    def url(self) -> str:
+        return f'http://{self._host}:{self._port}/'
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        """Return the pooled HTTP session used for readiness probes."""
+        if self._session is None or self._session.closed:
+            import aiohttp
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2))
+        return self._session
+
+    async def close(self) -> None:
+        """Stop supervising, sampling and warming up, and release the pooled HTTP session."""
+        if self.supervisor:
+            self.supervisor.stop()
+        if self._warmup_task:
+            self._warmup_task.cancel()
+            self._warmup_task = None
+        if self._telemetry_task:
+            self._telemetry_task.cancel()
+            self._telemetry_task = None
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     def set_connection_callback(self, callback):
         """Set a callback to be called when connection state changes."""
         self._connection_callback = callback
 
-    async def monitor_port(self, interval: float = 2.0):
-        """Monitor the server port and call the callback on state change."""
+    def subscribe(self, callback: Callable) -> None:
+        """Subscribe to ServerStatusEvent notifications (sync or async callback)."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    async def _set_state(self, state: str, reason: str, force: bool = False) -> None:
+        """Record a state change and push it to subscribers and the connection callback.
+
+        Repeats of the current state are dropped unless force is set, for transitions such as the
+        crash-loop breaker tripping that subscribers must hear about even in the same state.
+        """
+        if state == self.state and not force:
+            return
+        self.state = state
+        tracing.instant(f'server {state}', reason=reason)
+        event = ServerStatusEvent(state, reason)
+        logging.info(f"Server state: {state} ({reason})")
+        for cb in list(self._subscribers):
+            await self._invoke(cb, event)
+        is_up = state == 'running'
+        if is_up != self._last_state:
+            self._last_state = is_up
+            if self._connection_callback:
+                await self._invoke(self._connection_callback, is_up)
+
+    @staticmethod
+    async def _invoke(cb: Callable, *args) -> None:
+        try:
+            result = cb(*args)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception:
+            logging.exception("Server status callback failed")
+
+    async def _watch_process(self, process: Process) -> None:
+        """Turn child-process exit into a status event as soon as it happens."""
+        code = await process.wait()
+        if self.process is not process:
+            return
+        if self._startup_failure and not self._startup_failure.done():
+            # Let the log readers reach EOF first so a fatal message can give the more specific reason
+            if self._log_tasks:
+                await asyncio.wait(self._log_tasks, timeout=0.5)
+            detail = f'exited with code {code}' + (f': {self._last_output}' if self._last_output else '')
+            self._fail_startup('exited', detail)
+        if self._stopping:
+            await self._set_state('stopped', f'exited with code {code}')
+        else:
+            await self._set_state('crashed', f'exited unexpectedly with code {code}')
+
+    def _fail_startup(self, reason: str, detail: str) -> None:
+        if self._startup_failure and not self._startup_failure.done():
+            self._startup_failure.set_result(StartupFailure(reason, detail))
+
+    async def probe_http(self) -> Optional[int]:
+        """GET the server once, recording latency and failures; returns the HTTP status or None."""
+        import aiohttp
+        start = time.perf_counter()
+        try:
+            async with self._get_session().get(
+                    self.url, timeout=aiohttp.ClientTimeout(total=self.probe_timeout)) as response:
+                await response.read()
+                status = response.status
+        except asyncio.TimeoutError:
+            self.probe_metrics.record(None, 'timeout')
+            return None
+        except (aiohttp.ClientError, OSError):
+            self.probe_metrics.record(None, 'connect')
+            return None
+        self.probe_metrics.record(time.perf_counter() - start, 'http_5xx' if status >= 500 else None)
+        return status
+
+    async def monitor_port(self, interval: float = 15.0):
+        """Low-rate liveness probe; catches servers this manager did not spawn."""
         while True:
-            is_up = await self.check_port()
-            if is_up != self._last_state:
-                self._last_state = is_up
-                if self._connection_callback:
-                    cb = self._connection_callback
-                    if asyncio.iscoroutinefunction(cb):
-                        await cb(is_up)
-                    else:
-                        cb(is_up)
+            # A server that accepts connections but is too slow to answer HTTP is still up
+            is_up = await self.probe_http() is not None or await self.check_port()
+            if is_up and self.state != 'running':
+                await self._set_state('running', 'liveness probe')
+            elif not is_up and self.state in (None, 'running'):
+                await self._set_state('stopped', 'liveness probe')
             await asyncio.sleep(interval)
 
-    def start_monitoring(self, interval: float = 2.0):
+    def start_monitoring(self, interval: float = 15.0):
         if self._monitor_task is None or self._monitor_task.done():
             self._monitor_task = asyncio.create_task(self.monitor_port(interval))
 
+    @property
+    def server_pid(self) -> Optional[int]:
+        if self.process and self.process.returncode is None:
+            return self.process.pid
+        return self.detached_pid
+
+    async def sample_telemetry(self, interval: float = 5.0, idle_samples: int = 6):
+        """Sample the server's process tree from /proc and enforce the RSS limit."""
+        loop = asyncio.get_running_loop()
+        while True:
+            pid = self.server_pid
+            if pid:
+                sample = await loop.run_in_executor(None, sample_tree, pid, time.time())
+                if sample:
+                    self.telemetry.append(sample)
+                    self._check_rss_limit(sample.rss_bytes, idle_samples)
+            await asyncio.sleep(interval)
+
+    def _check_rss_limit(self, rss_bytes: int, idle_samples: int) -> None:
+        if not self.rss_limit_bytes or rss_bytes <= self.rss_limit_bytes or self.state != 'running':
+            return
+        cpu = self.telemetry.cpu_percent(idle_samples)
+        if cpu is None or cpu > self.idle_cpu_percent:
+            return  # busy (or not enough history); wait for an idle window so no request is cut off
+        reason = f'RSS {rss_bytes // (1024 * 1024)} MB over the {self.rss_limit_bytes // (1024 * 1024)} MB limit'
+        if self.supervisor and self.owns_server:
+            self.supervisor.schedule_restart(reason)
+        else:
+            logging.warning(f"Server {reason}; not restarting an unsupervised server")
+
+    def start_telemetry(self, interval: float = 5.0) -> None:
+        if not TELEMETRY_SUPPORTED:
+            logging.info("Process telemetry needs /proc; not available on this platform")
+            return
+        if self._telemetry_task is None or self._telemetry_task.done():
+            self._telemetry_task = asyncio.create_task(self.sample_telemetry(interval))
+
+    def _build_command(self) -> List[str]:
+        cmd = list(SERVER_COMMAND)
+        if self._port != DEFAULT_PORT:
+            cmd += ['--port', str(self._port)]
+        return cmd + self.extra_args
+
+    @tracing.traced('ServerManager.start_server')
     async def start_server(self, method: str = 'direct') -> bool:
         """
         Start the server using the given method.
         Supported methods: 'direct' (or 'piped' – which logs output).
         """
-        cmd = ['open-webui', 'serve']
+        cmd = self._build_command()
+        self.method = method
+        self.last_failure = None
+        started = time.monotonic()
+        if self.process is not None:
+            # A previous attempt must never keep running next to the new one
+            logging.warning(f"Reaping previous server process {self.process.pid} before starting again")
+            await self._discard_attempt()
+        self._ready_event = asyncio.Event()
+        self._startup_failure = asyncio.get_running_loop().create_future()
+        self._log_tasks = []
+        self._last_output = ''
+        self._stopping = False
 
         try:
-            if method == 'direct':
-                self.process = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    cwd=self.cwd
-                )
-            elif method == 'piped':
-                self.process = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    cwd=self.cwd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                if self.process.stdout:
-                    asyncio.create_task(self._log_stream(self.process.stdout, "STDOUT"))
-                if self.process.stderr:
-                    asyncio.create_task(self._log_stream(self.process.stderr, "STDERR"))
-            else:
-                raise ValueError(f"Invalid startup method: {method}")
+            with tracing.span('spawn', method=method, keep_warm=self.keep_warm):
+                if method not in ('direct', 'piped'):
+                    raise ValueError(f"Invalid startup method: {method}")
+                if self.keep_warm:
+                    await self._spawn_detached(cmd)
+                elif method == 'direct':
+                    self.process = await asyncio.create_subprocess_exec(
+                        *cmd,
+                        cwd=self.cwd,
+                        **self._spawn_kwargs()
+                    )
+                elif method == 'piped':
+                    self.process = await asyncio.create_subprocess_exec(
+                        *cmd,
+                        cwd=self.cwd,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE,
+                        **self._spawn_kwargs()
+                    )
+                    if self.process.stdout:
+                        self._log_tasks.append(asyncio.create_task(self._log_stream(self.process.stdout, "STDOUT")))
+                    if self.process.stderr:
+                        self._log_tasks.append(asyncio.create_task(self._log_stream(self.process.stderr, "STDERR")))
 
-            # Wait a short time for the process to launch
-            await asyncio.sleep(2)
-            if await wait_for_server('http://127.0.0.1:8080/'):
-                logging.info("Server is ready and accepting connections")
+            if self.resource_policy:
+                self.effective_resources = apply_policy(self.process.pid, self.resource_policy)
+            await self._set_state('starting', f'{method} launch')
+            asyncio.create_task(self._watch_process(self.process))
+            expected = self.history.expected_ready_time(method) if self.history else None
+            with tracing.span('wait_for_server', expected=expected):
+                readiness = await wait_for_server(self.url, timeout=self.ready_timeout,
+                                                  ready_event=self._ready_event, session=self._get_session(),
+                                                  failure=self._startup_failure, expected=expected)
+            self.last_readiness = readiness
+            if readiness:
+                await self._record_launch(method, readiness.elapsed)
+                await self._set_state('running', f'ready via {readiness.signal}')
+                logging.info(f"Server is ready and accepting connections after {readiness.elapsed:.2f}s "
+                             f"(signal: {readiness.signal}, probes: {readiness.attempts})")
+                if self.warmup_paths:
+                    # Runs alongside the window's first page load rather than delaying it
+                    self._warmup_task = asyncio.create_task(self.warm_up())
                 return True
+            self.last_failure = readiness.failure or StartupFailure(
+                'timeout', f'not ready within {self.ready_timeout:.0f}s')
+            logging.error(f"Server failed to start after {readiness.elapsed:.2f}s ({self.last_failure})")
+            await self._record_launch(method, readiness.elapsed, self.last_failure.reason)
+            await self._discard_attempt()
+            if self.last_failure.reason == 'timeout':
+                await self._set_state('stopped', 'not ready before timeout')
             else:
-                logging.error("Server did not become ready within the timeout period")
-                return False
+                await self._set_state('crashed', f'failed to start: {self.last_failure}')
+            return False
 
+        except FileNotFoundError as e:
+            self.last_failure = StartupFailure('not_found', f'{cmd[0]} is not installed or not on PATH ({e})')
         except Exception as e:
-            logging.error(f"Failed to start server: {e}")
+            self.last_failure = StartupFailure('spawn_error', str(e))
+        logging.error(f"Failed to start server: {self.last_failure}")
+        if method in ('direct', 'piped'):
+            await self._record_launch(method, time.monotonic() - started, self.last_failure.reason)
+        await self._discard_attempt()
+        return False
+
+    async def _record_launch(self, method: str, elapsed: float, failure: Optional[str] = None) -> None:
+        if self.history:
+            self.history.record(method, failure is None, elapsed, failure)
+            await asyncio.get_running_loop().run_in_executor(None, self.history.save)
+
+    @tracing.traced('ServerManager.warm_up')
+    async def warm_up(self) -> Dict[str, Any]:
+        """GET every warm-up path, a few at a time over the pooled session, timing each one."""
+        import aiohttp
+        semaphore = asyncio.Semaphore(self.warmup_concurrency)
+        session = self._get_session()
+        timeout = aiohttp.ClientTimeout(total=self.warmup_timeout)
+
+        async def fetch(path: str) -> Dict[str, Any]:
+            async with semaphore:
+                start = time.perf_counter()
+                result: Dict[str, Any] = {'path': path, 'status': None, 'error': None}
+                try:
+                    async with session.get(self.url.rstrip('/') + path, timeout=timeout) as response:
+                        await response.read()
+                        result['status'] = response.status
+                except asyncio.TimeoutError:
+                    result['error'] = 'timeout'
+                except (aiohttp.ClientError, OSError) as e:
+                    result['error'] = str(e) or type(e).__name__
+                except Exception as e:
+                    # e.g. the session was closed under us; warm-up must never fail as a whole
+                    result['error'] = f'{type(e).__name__}: {e}'
+                result['latency'] = time.perf_counter() - start
+                return result
+
+        start = time.perf_counter()
+        endpoints = await asyncio.gather(*(fetch(path) for path in self.warmup_paths))
+        self.last_warmup = {'finished_at': time.time(), 'elapsed': time.perf_counter() - start,
+                            'endpoints': endpoints}
+        logging.info(f"Server warm-up took {self.last_warmup['elapsed']:.2f}s: " + ', '.join(
+            f"{r['path']} {r['status'] or r['error']} {r['latency'] * 1000:.0f}ms" for r in endpoints))
+        return self.last_warmup
+
+    async def _discard_attempt(self) -> None:
+        """Reap a failed or superseded start attempt, including a detached one's lock file."""
+        process, self.process = self.process, None
+        if self.detached_pid:
+            remove_lock(self.lock_path)
+            self.detached_pid = None
+        if process:
+            await self._terminate(process)
+
+    def _spawn_kwargs(self) -> Dict[str, Any]:
+        """Start the child as leader of its own process group so stop_server can signal its workers too."""
+        kwargs = spawn_kwargs(self.resource_policy)
+        if sys.platform == 'win32':
+            kwargs['creationflags'] = kwargs.get('creationflags', 0) | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs['start_new_session'] = True
+        return kwargs
+
+    async def _spawn_detached(self, cmd: list) -> None:
+        """Spawn the server in its own session so it survives the app, and record it in the lock file."""
+        DETACHED_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        kwargs = self._spawn_kwargs()
+        if sys.platform == 'win32':
+            kwargs['creationflags'] |= subprocess.DETACHED_PROCESS
+        # Pipes would die with the app, so a detached server logs to its own file
+        with open(DETACHED_LOG_PATH, 'ab') as log:
+            self.process = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=self.cwd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                **kwargs
+            )
+        self.detached_pid = self.process.pid
+        write_lock(ServerLock(pid=self.process.pid, cmdline=cmd, url=self.url, clients=[os.getpid()]), self.lock_path)
+        spawn_reaper(self.idle_timeout, self.lock_path)
+        logging.info(f"Started detached server (PID {self.process.pid}); idle timeout {self.idle_timeout:.0f}s")
+
+    @tracing.traced('ServerManager.reattach')
+    async def reattach(self, timeout: float = 15) -> bool:
+        """Reattach to a detached server recorded in the lock file, if it is still valid."""
+        lock = read_lock(self.lock_path)
+        if lock is None:
+            return False
+        if not pid_alive(lock.pid) or not cmdline_matches(lock.pid, SERVER_COMMAND):
+            logging.info(f"Removing stale server lock for PID {lock.pid}")
+            remove_lock(self.lock_path)
             return False
+        # The server may still be booting for another launch, so give it a short grace period
+        if not await wait_for_server(lock.url, timeout=timeout, interval=1, session=self._get_session()):
+            logging.warning(f"Detached server {lock.pid} is not responding; stopping it")
+            await asyncio.get_running_loop().run_in_executor(None, terminate_server, lock.pid)
+            remove_lock(self.lock_path)
+            return False
+        attach_client(os.getpid(), self.lock_path)
+        self.detached_pid = lock.pid
+        await self._set_state('running', 'reattached')
+        logging.info(f"Reattached to detached server (PID {lock.pid}) at {lock.url}")
+        return True
+
+    def release(self) -> None:
+        """Detach this app from a keep-warm server, leaving it running for the next launch."""
+        if self.detached_pid:
+            detach_client(os.getpid(), self.lock_path)
+            logging.info(f"Released detached server (PID {self.detached_pid})")
 
     async def _log_stream(self, stream: asyncio.StreamReader, prefix: str) -> None:
         """Asynchronously log output from the given stream."""
         while True:
             line = await stream.readline()
             if line:
-                logging.info(f"[Server {prefix}] {line.decode().strip()}")
+                if self.log_buffer is not None:
+                    self.log_buffer.append(prefix, line.rstrip(b'\r\n'))
+                if self.access_log:
+                    self.access_log.feed(line)
+                if self._ready_event and not self._ready_event.is_set():
+                    if READY_LINE_PATTERN.search(line):
+                        self._ready_event.set()
+                    self._check_startup_output(line)
+                logging.info(f"[Server {prefix}] {line.decode(errors='replace').strip()}")
             else:
                 break
 
+    def _check_startup_output(self, line: bytes) -> None:
+        """Fail the pending start as soon as the server logs an error it cannot boot past."""
+        text = line.strip()
+        if text:
+            self._last_output = text.decode(errors='replace')
+        for pattern, reason in STARTUP_ERROR_PATTERNS:
+            if pattern.search(text):
+                self._fail_startup(reason, self._last_output)
+                return
+
     async def check_port(self, timeout: float = 1.0) -> bool:
         """Check if the server port is open and accepting connections"""
         try:
@@ -114,12 +642,38 @@ class ServerManager:
         except (ConnectionRefusedError, asyncio.TimeoutError):
             return False
 
+    @tracing.traced('ServerManager.stop_server')
     async def stop_server(self) -> None:
+        self._stopping = True
+        if self._warmup_task:
+            self._warmup_task.cancel()
+            self._warmup_task = None
+        if self.detached_pid:
+            if self.process is None:
+                # Reattached server: not our child, so stop it by PID
+                await asyncio.get_running_loop().run_in_executor(None, terminate_server, self.detached_pid,
+                                                                 self.stop_timeout)
+                logging.info("Detached server terminated")
+            remove_lock(self.lock_path)
+            self.detached_pid = None
         if self.process:
-            self.process.terminate()
+            await self._terminate(self.process)
+            self.process = None
+        if self.state is not None:
+            await self._set_state('stopped', 'stop requested')
+
+    @tracing.traced('ServerManager.terminate')
+    async def _terminate(self, process: Process) -> None:
+        """SIGTERM the server's process group, SIGKILL it after stop_timeout, and sweep leftover workers."""
+        start = time.perf_counter()
+        if process.returncode is None and signal_group(process.pid):
             try:
-                await asyncio.wait_for(self.process.wait(), timeout=5)
-                logging.info("Server terminated successfully")
+                await asyncio.wait_for(process.wait(), timeout=self.stop_timeout)
             except asyncio.TimeoutError:
-                logging.error("Server did not terminate in time")
-            self.process = None
+                logging.warning(f"Server did not exit within {self.stop_timeout:.1f}s; killing its process group")
+                signal_group(process.pid, force=True)
+                await process.wait()
+        # Workers that ignored SIGTERM or outlived the leader would otherwise keep the port
+        if sys.platform != 'win32' and signal_group(process.pid, force=True):
+            logging.warning("Killed server workers left behind after the main process exited")
+        logging.info(f"Server stopped in {time.perf_counter() - start:.2f}s (exit code {process.returncode})")
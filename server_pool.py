@@ -0,0 +1,240 @@
+"""Pool mode: several open-webui instances behind a local load-balancing proxy.
+
+ServerPool is a drop-in ServerManager: the UI sees one server on the public port
+while the pool spawns members on auto-assigned ports, health-checks them, and
+drains and restarts unhealthy ones behind the proxy.
+"""
+import asyncio
+import logging
+import socket
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from server_manager import DEFAULT_PORT, ServerManager, ServerStatusEvent
+
+if TYPE_CHECKING:
+    from aiohttp import web
+    from proxy import ReverseProxy
+
+# Paths whose requests must keep hitting the same instance (socket.io polling + upgrade)
+STICKY_PREFIXES = ('/ws/',)
+
+
+def free_port(host: str = '127.0.0.1') -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class PoolMember:
+    def __init__(self, index: int, manager: ServerManager) -> None:
+        self.index = index
+        self.manager = manager
+        self.url = manager.url.rstrip('/')
+        self.active = 0
+        self.healthy = False
+        self.draining = False
+        self.failures = 0
+        self.restarts = 0
+
+    @property
+    def routable(self) -> bool:
+        return self.healthy and not self.draining
+
+
+class ServerPool(ServerManager):
+    def __init__(self, size: int, bind_host: str = '0.0.0.0', port: int = DEFAULT_PORT,
+                 health_interval: float = 5.0, failure_threshold: int = 3, drain_timeout: float = 30.0,
+                 sticky_ttl: float = 3600.0, **kwargs) -> None:
+        if kwargs.pop('keep_warm', False):
+            logging.warning("keep_warm is not supported in pool mode; ignoring it")
+        super().__init__(port=port, **kwargs)
+        self.size = size
+        self.bind_host = bind_host
+        self.health_interval = health_interval
+        self.failure_threshold = failure_threshold
+        self.drain_timeout = drain_timeout
+        self.sticky_ttl = sticky_ttl
+        self.members: List[PoolMember] = []
+        self.method = 'piped'
+        self._proxy: Optional['ReverseProxy'] = None
+        # Client -> (member, last use), oldest use first so expired entries are dropped from the front
+        self._sticky: 'OrderedDict[str, Tuple[PoolMember, float]]' = OrderedDict()
+        self._recycling: Dict[int, asyncio.Task] = {}
+
+    def _new_member(self, index: int) -> PoolMember:
+        manager = ServerManager(
+            cwd=self.cwd,
+            port=free_port(),
+            ready_timeout=self.ready_timeout,
+            probe_timeout=self.probe_timeout,
+            resource_policy=self.resource_policy,
+            stop_timeout=self.stop_timeout,
+            warmup_paths=self.warmup_paths,
+            warmup_concurrency=self.warmup_concurrency,
+            warmup_timeout=self.warmup_timeout,
+            extra_args=['--host', '127.0.0.1'],
+        )
+        # All members write into the pool's log buffer and probe metrics, so the controls bar
+        # shows every instance
+        manager.log_buffer = self.log_buffer
+        manager.probe_metrics = self.probe_metrics
+        manager.access_log = self.access_log
+        member = PoolMember(index, manager)
+        manager.subscribe(lambda event: self._on_member_event(member, event))
+        return member
+
+    async def start_server(self, method: str = 'piped') -> bool:
+        """Start every member concurrently, then the proxy on the public port."""
+        self.method = method
+        self._stopping = False
+        await self._set_state('starting', f'starting pool of {self.size}')
+        self.members = [self._new_member(i) for i in range(self.size)]
+        results = await asyncio.gather(*(m.manager.start_server(method) for m in self.members))
+        for member, ready in zip(self.members, results):
+            member.healthy = ready
+        if not any(results):
+            logging.error("No pool member became ready")
+            await self._stop_members()
+            await self._set_state('stopped', 'no pool member became ready')
+            return False
+        for member in self.members:
+            if not member.healthy:
+                self._schedule_recycle(member, 'failed to start')
+
+        from proxy import ReverseProxy
+        self._proxy = ReverseProxy(self.pick_member, host=self.bind_host, port=self._port)
+        await self._proxy.start()
+        logging.info(f"Pool ready: {sum(results)}/{self.size} members on ports "
+                     f"{', '.join(str(m.manager._port) for m in self.members)}")
+        await self._set_state('running', f'{sum(results)}/{self.size} members healthy')
+        self.start_monitoring()
+        return True
+
+    def pick_member(self, request: 'web.Request') -> Optional[PoolMember]:
+        """Least-connections routing, sticky per client for websocket/socket.io traffic."""
+        candidates = [m for m in self.members if m.routable]
+        if not candidates:
+            return None
+        key = self._sticky_key(request)
+        now = time.monotonic()
+        if key:
+            self._expire_sticky(now)
+            pinned = self._sticky.get(key)
+            if pinned and pinned[0].routable:
+                self._pin(key, pinned[0], now)
+                return pinned[0]
+        member = min(candidates, key=lambda m: m.active)
+        if key:
+            self._pin(key, member, now)
+        return member
+
+    def _pin(self, key: str, member: PoolMember, now: float) -> None:
+        self._sticky[key] = (member, now)
+        self._sticky.move_to_end(key)
+
+    def _expire_sticky(self, now: float) -> None:
+        """Forget clients not seen for sticky_ttl, so the map stays bounded on a long-running pool."""
+        while self._sticky:
+            key, (_, last_used) = next(iter(self._sticky.items()))
+            if now - last_used < self.sticky_ttl:
+                break
+            del self._sticky[key]
+
+    @staticmethod
+    def _sticky_key(request: 'web.Request') -> Optional[str]:
+        if not request.path.startswith(STICKY_PREFIXES):
+            return None
+        return f"{request.remote}|{request.cookies.get('token', '')}"
+
+    @property
+    def owns_server(self) -> bool:
+        return bool(self.members)
+
+    async def _on_member_event(self, member: PoolMember, event: ServerStatusEvent) -> None:
+        # Until the proxy is up, start_server() itself decides what to do with failed members
+        if self._proxy is None:
+            return
+        if event.state == 'crashed' and not self._stopping:
+            member.healthy = False
+            self._schedule_recycle(member, event.reason)
+        await self._update_pool_state()
+
+    async def _update_pool_state(self) -> None:
+        if self._stopping or self._proxy is None:
+            return
+        healthy = sum(m.routable for m in self.members)
+        if healthy:
+            await self._set_state('running', f'{healthy}/{self.size} members healthy')
+        else:
+            await self._set_state('starting', 'all members restarting')
+
+    async def monitor_port(self, interval: float = 5.0):
+        """Health-check every member over HTTP; recycle members that keep failing."""
+        while True:
+            await asyncio.sleep(interval)
+            for member in self.members:
+                if member.index in self._recycling:
+                    continue
+                if await member.manager.probe_http() == 200:
+                    member.failures = 0
+                    if not member.healthy:
+                        member.healthy = True
+                        await self._update_pool_state()
+                    continue
+                member.failures += 1
+                if member.failures >= self.failure_threshold:
+                    member.healthy = False
+                    self._schedule_recycle(member, f'{member.failures} failed health checks')
+                    await self._update_pool_state()
+
+    def start_monitoring(self, interval: Optional[float] = None):
+        if self._proxy is not None:
+            super().start_monitoring(interval or self.health_interval)
+
+    def _schedule_recycle(self, member: PoolMember, reason: str) -> None:
+        if member.index not in self._recycling:
+            logging.warning(f"Pool member {member.index} unhealthy ({reason}); draining and restarting")
+            task = asyncio.ensure_future(self._recycle(member))
+            self._recycling[member.index] = task
+            task.add_done_callback(lambda _: self._recycling.pop(member.index, None))
+
+    async def _recycle(self, member: PoolMember) -> None:
+        """Stop routing to a member, let in-flight requests finish, then restart it."""
+        member.draining = True
+        self._sticky = OrderedDict((k, v) for k, v in self._sticky.items() if v[0] is not member)
+        await self._update_pool_state()
+        deadline = time.monotonic() + self.drain_timeout
+        while member.active and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        await member.manager.stop_server()
+        member.restarts += 1
+        member.healthy = await member.manager.start_server(self.method)
+        member.failures = 0
+        member.draining = False
+        if not member.healthy:
+            logging.error(f"Pool member {member.index} failed to restart")
+        await self._update_pool_state()
+
+    async def _stop_members(self) -> None:
+        await asyncio.gather(*(m.manager.stop_server() for m in self.members), return_exceptions=True)
+        await asyncio.gather(*(m.manager.close() for m in self.members), return_exceptions=True)
+
+    async def stop_server(self) -> None:
+        self._stopping = True
+        if self._monitor_task:
+            self._monitor_task.cancel()
+        for task in list(self._recycling.values()):
+            task.cancel()
+        if self._proxy:
+            await self._proxy.stop()
+            self._proxy = None
+        await self._stop_members()
+        self.members = []
+        if self.state is not None:
+            await self._set_state('stopped', 'stop requested')
+
+    def get_pool_status(self) -> List[dict]:
+        return [{'index': m.index, 'port': m.manager._port, 'healthy': m.healthy, 'draining': m.draining,
+                 'active': m.active, 'restarts': m.restarts} for m in self.members]
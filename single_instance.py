@@ -0,0 +1,105 @@
+"""Keep the desktop app to one instance per user.
+
+The first launch takes an exclusive lock on ``~/.webui/instance.lock`` and
+listens on a Unix domain socket next to it. A second launch finds the lock
+taken, sends the running instance a one-line JSON request (bring the window
+forward, optionally open a URL) and exits. It does this before importing
+pydantic, aiohttp or pywebview. The lock belongs to the process, so it is freed
+when the app exits for any reason and a leftover socket file is never mistaken
+for a live instance. Platforms without AF_UNIX or fcntl skip the check.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+INSTANCE_DIR = Path.home() / '.webui'
+SOCKET_PATH = INSTANCE_DIR / 'instance.sock'
+LOCK_PATH = INSTANCE_DIR / 'instance.lock'
+SINGLE_INSTANCE_SUPPORTED = hasattr(socket, 'AF_UNIX') and fcntl is not None
+
+
+class InstanceLock:
+    def __init__(self, socket_path: Path = SOCKET_PATH, lock_path: Path = LOCK_PATH) -> None:
+        self.socket_path = socket_path
+        self.lock_path = lock_path
+        self.sock: Optional[socket.socket] = None
+        self._lock_fd: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def acquire(self) -> bool:
+        """Become the running instance; False if another process already is."""
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        # Listen straight away: a second launch can connect while we are still importing,
+        # and its request waits in the backlog until serve() starts answering
+        self.socket_path.unlink(missing_ok=True)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        self.sock.listen(8)
+        return True
+
+    async def serve(self, handler: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
+        """Answer requests from later launches with handler(request) on the running loop."""
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            try:
+                request = json.loads(await asyncio.wait_for(reader.readline(), timeout=5))
+                logging.info(f"Request from another launch: {request}")
+                reply = handler(request)
+            except Exception as e:
+                logging.warning(f"Could not handle request from another launch: {e!r}")
+                reply = {'ok': False, 'error': repr(e)}
+            writer.write(json.dumps(reply).encode() + b'\n')
+            try:
+                await writer.drain()
+            finally:
+                writer.close()
+
+        self._server = await asyncio.start_unix_server(handle, sock=self.sock)
+
+    async def stop(self) -> None:
+        """Stop answering; the lock itself is kept until release()."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def release(self) -> None:
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+            self.socket_path.unlink(missing_ok=True)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+
+def notify_running_instance(request: Dict[str, Any], socket_path: Path = SOCKET_PATH,
+                            timeout: float = 10.0) -> Optional[Dict[str, Any]]:
+    """Send request to the running instance; returns its reply, or None if it did not answer."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            # A generous timeout: the running instance may itself still be starting up
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps(request).encode() + b'\n')
+            with sock.makefile('rb') as replies:
+                return json.loads(replies.readline())
+    except (OSError, ValueError) as e:
+        logging.error(f"Running instance did not answer on {socket_path}: {e}")
+        return None
@@ -0,0 +1,96 @@
+"""Per-launch startup history, kept across runs to tune the next launch.
+
+Every start attempt is appended to a small JSON file: the method used, whether it
+became ready, how long that took and, for failures, the StartupFailure reason.
+Later launches use it to try first the method that last worked, push methods that
+keep failing to the back, probe densely around the usual ready time instead of on
+a fixed backoff, and warn when a boot is much slower than its moving average.
+"""
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+HISTORY_PATH = Path.home() / '.webui' / 'startup_history.json'
+
+
+@dataclass
+class LaunchRecord:
+    timestamp: float
+    method: str
+    ready: bool
+    elapsed: float  # seconds to ready, or to the failure
+    failure: Optional[str] = None  # StartupFailure.reason
+    regression: bool = False
+
+
+class StartupHistory:
+    def __init__(self, path: Optional[Path] = HISTORY_PATH, max_records: int = 50, window: int = 10,
+                 dead_after: int = 3, regression_factor: float = 1.5, min_samples: int = 3) -> None:
+        self.path = path
+        self.max_records = max_records
+        # Launches averaged for the expected ready time, and consecutive failures that mark a method dead
+        self.window = window
+        self.dead_after = dead_after
+        self.regression_factor = regression_factor
+        self.min_samples = min_samples
+        self.records: List[LaunchRecord] = []
+
+    @classmethod
+    def load(cls, path: Path = HISTORY_PATH, **kwargs) -> 'StartupHistory':
+        """Read the history from path; a missing or unreadable file starts an empty history."""
+        history = cls(path, **kwargs)
+        try:
+            raw = json.loads(path.read_text(encoding='utf-8'))
+            history.records = [LaunchRecord(**entry) for entry in raw.get('launches', [])][-history.max_records:]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            logging.warning(f"Ignoring unreadable startup history {path}: {e}")
+        return history
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps({'launches': [asdict(r) for r in self.records]}, indent=1), encoding='utf-8')
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write startup history {self.path}: {e}")
+
+    def _recent(self, method: str) -> List[LaunchRecord]:
+        return [r for r in self.records if r.method == method]
+
+    def expected_ready_time(self, method: str) -> Optional[float]:
+        """Moving average of the last successful boots with method, once there are enough of them."""
+        ready = [r.elapsed for r in self._recent(method) if r.ready][-self.window:]
+        if len(ready) < self.min_samples:
+            return None
+        return sum(ready) / len(ready)
+
+    def is_dead(self, method: str) -> bool:
+        """True when the last dead_after attempts with method all failed."""
+        recent = self._recent(method)[-self.dead_after:]
+        return len(recent) == self.dead_after and not any(r.ready for r in recent)
+
+    def method_order(self, methods: Sequence[str]) -> List[str]:
+        """methods with the one that last worked first and the ones that keep failing last."""
+        last_ready = next((r.method for r in reversed(self.records) if r.ready), None)
+        return sorted(methods, key=lambda m: (self.is_dead(m), m != last_ready, list(methods).index(m)))
+
+    def record(self, method: str, ready: bool, elapsed: float, failure: Optional[str] = None) -> LaunchRecord:
+        """Append one start attempt, flagging a ready time well above the moving average."""
+        expected = self.expected_ready_time(method)
+        entry = LaunchRecord(time.time(), method, ready, elapsed, failure)
+        if ready and expected is not None and elapsed > expected * self.regression_factor:
+            entry.regression = True
+            logging.warning(f"Server took {elapsed:.1f}s to become ready with method {method}, "
+                            f"{elapsed / expected:.1f}x its recent average of {expected:.1f}s")
+        self.records.append(entry)
+        del self.records[:-self.max_records]
+        return entry
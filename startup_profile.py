@@ -0,0 +1,109 @@
+"""Startup profiling for ``main.py --profile-startup``.
+
+Records the cost of every module imported while the profiler is installed (inclusive
+and self time) plus the wall time of named startup phases, then prints the top
+offenders and writes everything to a JSON file for comparison across commits.
+"""
+import builtins
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import tracing
+
+PROFILE_PATH = Path.home() / '.webui' / 'startup_profile.json'
+
+
+class StartupProfiler:
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.imports: Dict[str, Dict[str, float]] = {}
+        self.phases: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._original_import = None
+        self._thread_id = threading.get_ident()
+        self._child_time: List[float] = []
+
+    def install(self) -> None:
+        """Start timing imports made from the current thread."""
+        if not self.enabled or self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        original = self._original_import
+        if threading.get_ident() != self._thread_id or name in sys.modules:
+            return original(name, *args, **kwargs)
+        loaded_before = len(sys.modules)
+        self._child_time.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._child_time.pop()
+            if self._child_time:
+                self._child_time[-1] += elapsed
+            # Only count imports that actually loaded something
+            if len(sys.modules) > loaded_before:
+                entry = self.imports.setdefault(name, {'inclusive': 0.0, 'self': 0.0})
+                entry['inclusive'] += elapsed
+                entry['self'] += elapsed - children
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record the wall time of a named startup phase (and trace it when tracing is on)."""
+        with tracing.span(name):
+            if not self.enabled:
+                yield
+                return
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                end = time.perf_counter()
+                self.phases.append({'name': name, 'start': start - self._origin, 'duration': end - start})
+
+    def to_dict(self, top: int = 15) -> Dict[str, Any]:
+        ranked = sorted(self.imports.items(), key=lambda item: item[1]['self'], reverse=True)
+        return {
+            'total': time.perf_counter() - self._origin,
+            'phases': self.phases,
+            'top_imports': [{'module': name, **times} for name, times in ranked[:top]],
+            'imports': self.imports,
+        }
+
+    def report(self, top: int = 15) -> str:
+        data = self.to_dict(top)
+        lines = [f"Startup profile ({data['total'] * 1000:.1f} ms total)", "Phases:"]
+        lines += [f"  {p['name']:<28} {p['duration'] * 1000:9.1f} ms (at {p['start'] * 1000:.1f} ms)"
+                  for p in data['phases']]
+        lines.append(f"Top {top} imports by self time:")
+        lines += [f"  {i['module']:<28} {i['self'] * 1000:9.1f} ms self {i['inclusive'] * 1000:9.1f} ms incl"
+                  for i in data['top_imports']]
+        return '\n'.join(lines)
+
+    def finish(self, path: Optional[Path] = PROFILE_PATH, top: int = 15) -> None:
+        """Stop timing imports, print the top offenders and write the profile to path."""
+        if not self.enabled:
+            return
+        self.uninstall()
+        self.enabled = False
+        print(self.report(top))
+        if path:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(self.to_dict(top), indent=2))
+                logging.info(f"Startup profile written to {path}")
+            except OSError as e:
+                logging.error(f"Error writing startup profile: {e}")
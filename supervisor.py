@@ -0,0 +1,146 @@
+"""Automatic restart of a crashed or hung open-webui child.
+
+The supervisor listens to a ServerManager's status events and restarts the
+server when it exits unexpectedly after having been ready. While the server is
+running it also probes it over HTTP and treats several consecutive slow or
+failed probes as a hang. Restarts back off exponentially, and too many restarts
+in a short window trip a crash-loop breaker that hands control back to the user.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, Optional
+
+if TYPE_CHECKING:
+    from server_manager import ServerManager, ServerStatusEvent
+
+
+class Supervisor:
+    def __init__(self, manager: 'ServerManager', backoff_initial: float = 1.0, backoff_max: float = 60.0,
+                 max_restarts: int = 5, restart_window: float = 300.0, hang_interval: float = 5.0,
+                 hang_threshold: float = 10.0, hang_probes: int = 3) -> None:
+        self.manager = manager
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        # Crash-loop breaker: more than max_restarts within restart_window seconds disables auto-restart
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        # A hang is hang_probes consecutive probes slower than hang_threshold (or failing outright)
+        self.hang_interval = hang_interval
+        self.hang_threshold = hang_threshold
+        self.hang_probes = hang_probes
+        self.restarts = 0
+        self.tripped = False
+        self.last_recovery: Optional[float] = None
+        self._recoveries: Deque[float] = deque(maxlen=50)
+        self._restart_times: Deque[float] = deque()
+        self._restart_task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._slow_probes = 0
+        # Only a server that has been ready is restarted; failures during start are the starter's to handle
+        self._armed = False
+        manager.subscribe(self._on_event)
+
+    @property
+    def restarting(self) -> bool:
+        return self._restart_task is not None and not self._restart_task.done()
+
+    def stats(self) -> Dict:
+        recoveries = list(self._recoveries)
+        return {
+            'restarts': self.restarts,
+            'restarting': self.restarting,
+            'crash_loop': self.tripped,
+            'last_recovery_seconds': self.last_recovery,
+            'mean_recovery_seconds': sum(recoveries) / len(recoveries) if recoveries else None,
+        }
+
+    def _on_event(self, event: 'ServerStatusEvent') -> None:
+        if self.restarting:
+            return  # our own restart drives these transitions
+        if event.state == 'running':
+            # A manual start after a crash loop re-arms the supervisor
+            self.tripped = False
+            self._armed = self.manager.owns_server
+            self._start_watching()
+        elif event.state in ('crashed', 'stopped') and self._armed and not self.manager._stopping:
+            # 'stopped' without a stop request means the liveness probe lost a child that is still ours
+            self.schedule_restart(event.reason if event.state == 'crashed' else 'stopped answering')
+        else:
+            self._armed = False
+
+    def schedule_restart(self, reason: str) -> None:
+        if self.tripped or self.restarting:
+            return
+        self._restart_task = asyncio.ensure_future(self._restart(reason, time.monotonic()))
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.backoff_initial * 2 ** (attempt - 1), self.backoff_max)
+
+    def _allow_restart(self) -> bool:
+        now = time.monotonic()
+        while self._restart_times and now - self._restart_times[0] > self.restart_window:
+            self._restart_times.popleft()
+        if len(self._restart_times) >= self.max_restarts:
+            return False
+        self._restart_times.append(now)
+        return True
+
+    async def _restart(self, reason: str, failed_at: float) -> None:
+        """Restart until the server is ready again, backing off between attempts."""
+        attempt = 0
+        while True:
+            if not self._allow_restart():
+                self.tripped = True
+                logging.error(f"Server restarted {self.max_restarts} times within {self.restart_window:.0f}s; "
+                              "auto-restart disabled until the server is started manually")
+                # Usually already 'crashed'; published anyway so the UI and headless mode learn it is final
+                await self.manager._set_state('crashed', 'crash loop; auto-restart disabled', force=True)
+                return
+            attempt += 1
+            delay = self._backoff(attempt)
+            logging.warning(f"Server {reason}; restarting in {delay:.1f}s (attempt {attempt})")
+            await self.manager._set_state('starting', f'auto-restart in {delay:.0f}s after: {reason}')
+            await asyncio.sleep(delay)
+            if self.manager._stopping:
+                return  # stopped by the user while we were waiting
+            await self.manager.stop_server()
+            self.restarts += 1
+            if await self.manager.start_server(self.manager.method):
+                self.last_recovery = time.monotonic() - failed_at
+                self._recoveries.append(self.last_recovery)
+                logging.info(f"Server recovered in {self.last_recovery:.1f}s after {attempt} restart(s)")
+                self._armed = True
+                self._start_watching()
+                return
+            reason = 'restart attempt failed'
+
+    def _start_watching(self) -> None:
+        self._slow_probes = 0
+        if self.manager.owns_server and (self._watch_task is None or self._watch_task.done()):
+            self._watch_task = asyncio.ensure_future(self._watch_hangs())
+
+    async def _watch_hangs(self) -> None:
+        """Probe the running server; restart it when it stops answering in time."""
+        while self.manager.state in ('running', 'starting') and self.manager.owns_server:
+            await asyncio.sleep(self.hang_interval)
+            if self.restarting or self.manager.state != 'running':
+                continue
+            start = time.perf_counter()
+            status = await self.manager.probe_http()
+            if status is not None and time.perf_counter() - start < self.hang_threshold:
+                self._slow_probes = 0
+                continue
+            self._slow_probes += 1
+            if self._slow_probes >= self.hang_probes:
+                self._slow_probes = 0
+                self.schedule_restart(f'hung ({self.hang_probes} probes failed or slower than '
+                                      f'{self.hang_threshold:.0f}s)')
+                return
+
+    def stop(self) -> None:
+        for task in (self._restart_task, self._watch_task):
+            if task:
+                task.cancel()
+        self._restart_task = self._watch_task = None
@@ -0,0 +1,72 @@
+import json
+import pytest
+from access_log import OTHER_ROUTE, AccessLogStats, SnapshotWriter, route_template
+
+
+def test_route_template() -> None:
+    assert route_template('/api/v1/chats/3f2a9c1b-1234-4d5e-8f00-1234567890ab?page=2') == '/api/v1/chats/{id}'
+    assert route_template('/api/v1/files/42/content') == '/api/v1/files/{id}/content'
+    assert route_template('/api/chat/completions') == '/api/chat/completions'
+    assert route_template('/_app/immutable/chunks/index.BpQ1x_8Z.js') == '/_app/*'
+    assert route_template('') == '/'
+
+
+def test_feed_aggregates_per_route() -> None:
+    stats = AccessLogStats()
+    assert not stats.feed(b'INFO:     Application startup complete.')
+    assert stats.feed(b'INFO:     127.0.0.1:50000 - "GET /api/v1/chats/123 HTTP/1.1" 200 OK')
+    assert stats.feed(b'INFO:     127.0.0.1:50001 - "GET /api/v1/chats/456 HTTP/1.1" 404 Not Found 12.5ms')
+    assert stats.feed(b'\x1b[32mINFO\x1b[0m:     127.0.0.1:50002 - "POST /api/chat/completions HTTP/1.1" '
+                      b'500 Internal Server Error 2.5s\n')
+    snapshot = stats.snapshot()
+    assert snapshot['requests'] == 3
+    chats, completions = snapshot['routes']
+    assert (chats['method'], chats['route'], chats['count']) == ('GET', '/api/v1/chats/{id}', 2)
+    assert chats['status']['2xx'] == 1 and chats['status']['4xx'] == 1
+    assert chats['timed'] == 1
+    assert chats['mean'] == pytest.approx(0.0125)
+    assert completions['status']['5xx'] == 1
+    assert 1.0 < completions['p50'] <= 2.5
+
+
+def test_route_count_is_bounded() -> None:
+    stats = AccessLogStats(max_routes=2)
+    for name in ('a', 'b', 'c', 'd'):
+        stats.feed(f'- "GET /api/{name} HTTP/1.1" 200 OK'.encode())
+    routes = {route['route']: route['count'] for route in stats.snapshot()['routes']}
+    assert routes == {'/api/a': 1, '/api/b': 1, OTHER_ROUTE: 2}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_writer(tmp_path) -> None:
+    stats = AccessLogStats()
+    stats.feed(b'- "GET / HTTP/1.1" 200 OK')
+    writer = SnapshotWriter(stats.snapshot, tmp_path / 'access.json', interval=60)
+    await writer.start()
+    await writer.stop()
+    assert json.loads((tmp_path / 'access.json').read_text())['routes'][0]['route'] == '/'
+
+
+@pytest.mark.asyncio
+async def test_piped_server_access_lines_are_parsed(tmp_path, unused_tcp_port: int) -> None:
+    import asyncio
+    import aiohttp
+    from benchmarks.fake_open_webui import fake_server_env
+    from server_manager import ServerManager
+    with fake_server_env(tmp_path):
+        manager = ServerManager(port=unused_tcp_port, ready_timeout=10, parse_access_log=True)
+        try:
+            assert await manager.start_server(method='piped')
+            async with aiohttp.ClientSession() as session:
+                for chat in (1, 2, 3):
+                    async with session.get(f'{manager.url}api/v1/chats/{chat}') as response:
+                        assert response.status == 200
+            for _ in range(100):
+                routes = {r['route']: r['count'] for r in manager.access_log.snapshot()['routes']}
+                if routes.get('/api/v1/chats/{id}') == 3:
+                    break
+                await asyncio.sleep(0.02)
+            assert routes['/api/v1/chats/{id}'] == 3
+        finally:
+            await manager.stop_server()
+            await manager.close()
@@ -0,0 +1,106 @@
+import os
+import aiohttp
+import pytest
+from aiohttp import web
+from asset_cache import AssetCache, CacheEntry, CachingFrontend, is_immutable, is_static_path
+
+
+def test_static_and_immutable_paths() -> None:
+    assert is_static_path('/_app/immutable/entry/start.js')
+    assert is_static_path('/favicon.png')
+    assert not is_static_path('/api/v1/chats')
+    assert is_immutable('/_app/immutable/chunks/index.js')
+    assert is_immutable('/assets/index-BpQ1x_8Z.css')
+    assert is_immutable('/logo.png', 'public, max-age=31536000, immutable')
+    assert not is_immutable('/static/logo.png')
+    assert is_immutable('/assets/index.3f2a9c1b.js')
+    # Long words and version numbers are not content hashes
+    assert not is_immutable('/static/custom-background.png')
+    assert not is_immutable('/assets/fonts/Inter-Variable.ttf')
+    assert not is_immutable('/assets/fonts/Inter-Variable2024.ttf')
+    assert not is_immutable('/static/splash-dark.png')
+    assert not is_immutable('/static/favicon-96x96.png')
+    assert not is_immutable('/assets/deadbeefcafe.js')
+
+
+@pytest.mark.asyncio
+async def test_memory_lru_evicts_oldest() -> None:
+    cache = AssetCache(memory_bytes=10, cache_dir=None)
+    await cache.put('a', CacheEntry(200, {}, b'12345', False))
+    await cache.put('b', CacheEntry(200, {}, b'12345', False))
+    assert await cache.get('a') is not None  # a becomes most recently used
+    await cache.put('c', CacheEntry(200, {}, b'12345', False))
+    assert await cache.get('b') is None
+    assert await cache.get('a') is not None
+    assert cache.counters['evicted'] == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_round_trip(tmp_path) -> None:
+    entry = CacheEntry(200, {'Content-Type': 'text/css', 'ETag': '"v1"'}, b'body {}', True)
+    await AssetCache(cache_dir=tmp_path).put('/a.css|gzip', entry)
+    cache = AssetCache(cache_dir=tmp_path)
+    assert await cache.get('/a.css|gzip') == entry
+    assert cache.counters['disk_hits'] == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_usage_is_tracked_without_rescanning(tmp_path, monkeypatch) -> None:
+    (tmp_path / 'leftover.body').write_bytes(b'x' * 30)
+    os.utime(tmp_path / 'leftover.body', (0, 0))
+    cache = AssetCache(disk_bytes=100, cache_dir=tmp_path)
+    scans = []
+    scan_disk = cache._scan_disk
+    monkeypatch.setattr(cache, '_scan_disk', lambda: scans.append(1) or scan_disk())
+    for name in 'abcd':
+        await cache.put(name, CacheEntry(200, {}, b'y' * 15, True))
+    await cache.put('a', CacheEntry(200, {}, b'y' * 20, True))
+    # One scan for the files left by an earlier run; rewriting 'a' replaces its size
+    assert len(scans) == 1
+    assert cache._disk_used == 30 + 15 * 3 + 20
+    await cache.put('e', CacheEntry(200, {}, b'y' * 15, True))
+    # Over the limit: the oldest body goes and usage drops to the trim target
+    assert len(scans) == 2
+    assert not (tmp_path / 'leftover.body').exists()
+    assert cache._disk_used == sum(p.stat().st_size for p in tmp_path.glob('*.body')) <= 90
+
+
+@pytest.mark.asyncio
+async def test_frontend_serves_and_revalidates(tmp_path, unused_tcp_port_factory) -> None:
+    calls = []
+
+    async def handler(request: web.Request) -> web.Response:
+        calls.append(request.path)
+        if request.path == '/static/app.css' and request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304, headers={'ETag': '"v1"'})
+        headers = {'ETag': '"v1"'} if request.path == '/static/app.css' else {}
+        return web.Response(text=f'body of {request.path}', headers=headers)
+
+    app = web.Application()
+    app.router.add_get('/{path:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    upstream_port = unused_tcp_port_factory()
+    await web.TCPSite(runner, '127.0.0.1', upstream_port).start()
+    cache = AssetCache(cache_dir=tmp_path)
+    frontend = CachingFrontend(f'http://127.0.0.1:{upstream_port}/', unused_tcp_port_factory(), cache)
+    await frontend.start()
+    try:
+        base = frontend.url_for(f'http://127.0.0.1:{upstream_port}/')
+        async with aiohttp.ClientSession() as session:
+            for _ in range(2):
+                async with session.get(f'{base}_app/immutable/start.js') as response:
+                    assert await response.text() == 'body of /_app/immutable/start.js'
+                async with session.get(f'{base}static/app.css') as response:
+                    assert await response.text() == 'body of /static/app.css'
+            async with session.get(f'{base}api/config') as response:
+                assert response.status == 200
+        # The immutable bundle is fetched once; the stylesheet is revalidated on the second load
+        assert calls == ['/_app/immutable/start.js', '/static/app.css', '/static/app.css', '/api/config']
+        stats = cache.stats()
+        assert stats['revalidated'] == 1
+        assert stats['bypassed'] == 1
+        assert stats['misses'] == 2
+    finally:
+        await frontend.stop()
+        await runner.cleanup()
@@ -1,6 +1,8 @@
 import json
 import tempfile
+import pytest
 from pathlib import Path
+from pydantic import SecretStr
 from config import AppConfig, load_config, save_config, CONFIG_PATH
 
 def test_default_config() -> None:
@@ -29,4 +31,108 @@ def test_save_and_load_config(tmp_path: Path) -> None:
         save_success = save_config(config_loaded)
         assert save_success
     finally:
-        config.CONFIG_PATH = original_config_path
\ No newline at end of file
+        config.CONFIG_PATH = original_config_path
+
+def test_password_roundtrip_is_lazy(tmp_path: Path, monkeypatch) -> None:
+    import config
+    from config import EncryptedSecretStr
+    monkeypatch.setattr(config, 'KEY_PATH', tmp_path / 'key')
+    stored = AppConfig(username='me', password='s3cret').to_json()
+    assert 's3cret' not in stored
+
+    loaded = AppConfig.from_json(stored)
+    assert isinstance(loaded.password, EncryptedSecretStr)
+    assert loaded.password._plain is None
+    # Saving again reuses the stored token instead of re-encrypting
+    assert json.loads(loaded.to_json())['password'] == json.loads(stored)['password']
+    assert loaded.password.get_secret_value() == 's3cret'
+
+
+def test_invalid_start_url() -> None:
+    import pytest
+    with pytest.raises(ValueError):
+        AppConfig(start_url='not a url')
+
+
+def test_save_is_skipped_when_clean_and_atomic(tmp_path: Path, monkeypatch) -> None:
+    import config
+    path = tmp_path / 'config.json'
+    monkeypatch.setattr(config, 'CONFIG_PATH', path)
+    cfg = AppConfig()
+    assert save_config(cfg)
+    assert path.exists()
+    assert not (tmp_path / 'config.json.tmp').exists()
+
+    path.write_text('{"window_title": "edited elsewhere"}')
+    assert save_config(cfg)
+    assert path.read_text() == '{"window_title": "edited elsewhere"}'
+
+    cfg.window_x = 40
+    assert cfg.dirty_fields == {'window_x'}
+    assert save_config(cfg)
+    assert json.loads(path.read_text())['window_x'] == 40
+    assert not cfg.is_dirty
+
+
+def test_assigning_same_value_is_not_dirty() -> None:
+    cfg = AppConfig()
+    cfg.window_width = cfg.window_width
+    assert not cfg.is_dirty
+
+def test_server_resource_fields_validated() -> None:
+    from pydantic import ValidationError
+    config = AppConfig(server_nice=10, server_ionice_class='idle', server_cpu_affinity=[0, 1])
+    assert config.server_cpu_affinity == [0, 1]
+    for bad in ({'server_nice': 25}, {'server_ionice_level': 8}, {'server_ionice_class': 'fast'},
+                {'server_cpu_affinity': []}):
+        with pytest.raises(ValidationError):
+            AppConfig(**bad)
+
+def test_warmup_fields_validated() -> None:
+    from pydantic import ValidationError
+    assert AppConfig(warmup_endpoints=[]).warmup_endpoints == []
+    for bad in ({'warmup_endpoints': ['api/config']}, {'warmup_concurrency': 0}):
+        with pytest.raises(ValidationError):
+            AppConfig(**bad)
+
+
+def test_change_during_save_stays_dirty(tmp_path: Path, monkeypatch) -> None:
+    import config
+    path = tmp_path / 'config.json'
+    monkeypatch.setattr(config, 'CONFIG_PATH', path)
+    cfg = AppConfig()
+    cfg.window_x = 10
+    to_json = AppConfig.to_json
+
+    def move_while_serializing(self: AppConfig) -> str:
+        data = to_json(self)
+        self.window_y = 20
+        return data
+
+    monkeypatch.setattr(AppConfig, 'to_json', move_while_serializing)
+    assert save_config(cfg)
+    assert cfg.dirty_fields == {'window_y'}
+    monkeypatch.setattr(AppConfig, 'to_json', to_json)
+    assert save_config(cfg)
+    assert json.loads(path.read_text())['window_y'] == 20
+
+
+def test_failed_save_keeps_fields_dirty(tmp_path: Path, monkeypatch) -> None:
+    import config
+    monkeypatch.setattr(config, 'CONFIG_PATH', tmp_path / 'missing' / 'config.json')
+    cfg = AppConfig()
+    cfg.window_x = 10
+    assert not save_config(cfg)
+    assert cfg.dirty_fields == {'window_x'}
+
+
+def test_assigning_password_does_not_decrypt(tmp_path: Path, monkeypatch) -> None:
+    import config
+    monkeypatch.setattr(config, 'KEY_PATH', tmp_path / 'key')
+    loaded = AppConfig.from_json(AppConfig(password='s3cret').to_json())
+    stored = loaded.password
+    loaded.password = stored
+    assert not loaded.is_dirty
+    loaded.password = SecretStr('other')
+    assert loaded.dirty_fields == {'password'}
+    assert stored._plain is None
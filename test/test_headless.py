@@ -0,0 +1,205 @@
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+import pytest
+from sd_notify import notify, watchdog_interval
+
+ROOT = Path(__file__).resolve().parent.parent
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='needs AF_UNIX')
+
+
+@pytest.fixture
+def notify_socket(monkeypatch):
+    # Unix socket paths are limited to about 100 bytes, which pytest's tmp_path can exceed
+    with tempfile.TemporaryDirectory(prefix='webui-') as directory:
+        path = os.path.join(directory, 'notify.sock')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.bind(path)
+            sock.setblocking(False)
+            monkeypatch.setenv('NOTIFY_SOCKET', path)
+            yield sock
+
+
+def _received(sock: socket.socket) -> list:
+    messages = []
+    while True:
+        try:
+            messages.append(sock.recv(4096).decode())
+        except BlockingIOError:
+            return messages
+
+
+def test_notify_sends_one_datagram(notify_socket: socket.socket) -> None:
+    assert notify('READY=1', 'STATUS=up')
+    assert _received(notify_socket) == ['READY=1\nSTATUS=up']
+
+
+def test_notify_never_blocks(notify_socket: socket.socket) -> None:
+    # Nobody reads the socket: once its queue is full, messages are dropped rather than blocking
+    results = [notify(f'STATUS={i}') for i in range(100)]
+    assert results[0] and not results[-1]
+
+
+def test_notify_without_socket_is_a_no_op(monkeypatch) -> None:
+    monkeypatch.delenv('NOTIFY_SOCKET', raising=False)
+    assert not notify('READY=1')
+    assert not notify('READY=1', socket_path='/nonexistent/notify.sock')
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='abstract sockets are Linux-only')
+def test_notify_abstract_socket() -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.bind(f'\0webui-test-{os.getpid()}')
+        assert notify('STOPPING=1', socket_path=f'@webui-test-{os.getpid()}')
+        assert sock.recv(64) == b'STOPPING=1'
+
+
+def test_watchdog_interval(monkeypatch) -> None:
+    monkeypatch.delenv('WATCHDOG_USEC', raising=False)
+    assert watchdog_interval() is None
+    monkeypatch.setenv('WATCHDOG_USEC', '4000000')
+    monkeypatch.setenv('WATCHDOG_PID', str(os.getpid()))
+    assert watchdog_interval() == 2.0
+    monkeypatch.setenv('WATCHDOG_PID', str(os.getpid() + 1))
+    assert watchdog_interval() is None
+
+
+@pytest.mark.asyncio
+async def test_run_headless_notifies_and_stops_on_sigterm(notify_socket, tmp_path, unused_tcp_port: int,
+                                                          monkeypatch) -> None:
+    from benchmarks.fake_open_webui import fake_server_env
+    from config import AppConfig
+    from main import run_headless
+    from server_manager import ServerManager
+    monkeypatch.setenv('WATCHDOG_USEC', '100000')
+    monkeypatch.delenv('WATCHDOG_PID', raising=False)
+    messages = []
+
+    async def terminate_once_ready() -> None:
+        while not any('READY=1' in m for m in messages):
+            await asyncio.sleep(0.02)
+            messages.extend(_received(notify_socket))
+        await asyncio.sleep(0.2)  # let a few watchdog pings through
+        messages.extend(_received(notify_socket))
+        assert 'WATCHDOG=1' in messages
+
+        # A server that stops answering health probes gets no more pings
+        async def hung() -> None:
+            return None
+
+        monkeypatch.setattr(manager, 'probe_http', hung)
+        await asyncio.sleep(0.1)
+        _received(notify_socket)
+        await asyncio.sleep(0.2)
+        assert 'WATCHDOG=1' not in _received(notify_socket)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    with fake_server_env(tmp_path):
+        manager = ServerManager(port=unused_tcp_port, ready_timeout=10)
+        killer = asyncio.ensure_future(terminate_once_ready())
+        assert await asyncio.wait_for(run_headless(manager, AppConfig(warmup_endpoints=[])), timeout=20) == 0
+        await killer
+    messages.extend(_received(notify_socket))
+    assert manager.process is None
+    ready = next(m for m in messages if 'READY=1' in m)
+    assert f'MAINPID={os.getpid()}' in ready
+    assert messages[-1].startswith('STOPPING=1')
+
+
+@pytest.mark.asyncio
+async def test_run_headless_outlives_a_failed_start_method(notify_socket, tmp_path, unused_tcp_port: int) -> None:
+    from benchmarks.fake_open_webui import fake_server_env
+    from config import AppConfig
+    from main import run_headless
+    from server_manager import ServerManager
+    manager = ServerManager(port=unused_tcp_port, ready_timeout=10)
+    start_server = manager.start_server
+    methods = []
+
+    async def first_method_crashes(method: str = 'direct') -> bool:
+        methods.append(method)
+        if len(methods) == 1:
+            await manager._set_state('crashed', 'failed to start: exited with code 1')
+            return False
+        return await start_server(method)
+
+    async def terminate_once_ready() -> None:
+        while manager.state != 'running':
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.1)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    manager.start_server = first_method_crashes
+    with fake_server_env(tmp_path):
+        killer = asyncio.ensure_future(terminate_once_ready())
+        assert await asyncio.wait_for(run_headless(manager, AppConfig(warmup_endpoints=[])), timeout=20) == 0
+        await killer
+    assert methods == ['piped', 'direct']
+    assert any('READY=1' in m for m in _received(notify_socket))
+
+
+@pytest.mark.asyncio
+async def test_run_headless_fails_when_server_cannot_start(notify_socket, monkeypatch, unused_tcp_port: int) -> None:
+    from config import AppConfig
+    from main import run_headless
+    from server_manager import ServerManager
+    monkeypatch.setattr('server_manager.SERVER_COMMAND', ['open-webui-not-installed-anywhere', 'serve'])
+    manager = ServerManager(port=unused_tcp_port)
+    assert await asyncio.wait_for(run_headless(manager, AppConfig()), timeout=10) == 1
+    messages = _received(notify_socket)
+    assert not any('READY=1' in m for m in messages)
+    assert messages[-1].startswith('STOPPING=1')
+
+
+@pytest.mark.asyncio
+async def test_run_headless_exits_when_crash_loop_trips(notify_socket, monkeypatch, unused_tcp_port: int) -> None:
+    from config import AppConfig
+    from main import run_headless
+    from server_manager import ServerManager
+    # Reports ready on stderr, then crashes shortly after, every time
+    script = ("import sys, time; print('INFO:     Uvicorn running on http://127.0.0.1', file=sys.stderr, "
+              "flush=True); time.sleep(0.2); sys.exit(1)")
+    monkeypatch.setattr('server_manager.SERVER_COMMAND', [sys.executable, '-c', script])
+    manager = ServerManager(port=unused_tcp_port, ready_timeout=10, supervise=True)
+    manager.supervisor.backoff_initial = 0.01
+    manager.supervisor.max_restarts = 2
+    messages = []
+
+    async def read_notifications() -> None:
+        while True:
+            messages.extend(_received(notify_socket))
+            await asyncio.sleep(0.01)
+
+    reader = asyncio.ensure_future(read_notifications())
+    try:
+        assert await asyncio.wait_for(run_headless(manager, AppConfig(warmup_endpoints=[])), timeout=15) == 1
+    finally:
+        reader.cancel()
+    assert manager.supervisor.tripped
+    messages.extend(_received(notify_socket))
+    assert any('READY=1' in m for m in messages)
+    assert any('crash loop' in m for m in messages)
+    assert messages[-1].startswith('STOPPING=1')
+
+
+def test_headless_entry_point_skips_gui(notify_socket, tmp_path) -> None:
+    with socket.socket() as probe:
+        if probe.connect_ex(('127.0.0.1', 8080)) == 0:
+            pytest.skip('something is already listening on port 8080')
+    env = dict(os.environ, HOME=str(tmp_path), PATH=os.path.dirname(sys.executable))
+    code = (
+        'import runpy, sys; sys.argv = ["main.py", "--headless"]\n'
+        'try:\n    runpy.run_path("main.py", run_name="__main__")\n'
+        'except SystemExit as e:\n'
+        '    print(e.code, sorted(m for m in ("webview", "ui_manager") if m in sys.modules))'
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True,
+                            timeout=60)
+    assert result.stdout.strip().splitlines()[-1] == '1 []'
+    assert _received(notify_socket)[-1].startswith('STOPPING=1')
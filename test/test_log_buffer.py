@@ -0,0 +1,45 @@
+import pytest
+from log_buffer import LogRingBuffer
+
+
+def test_since_returns_only_new_lines() -> None:
+    buffer = LogRingBuffer(max_lines=10, max_bytes=1024)
+    buffer.append('STDOUT', b'first')
+    buffer.append('STDERR', b'second')
+    result = buffer.since(0)
+    assert [line['text'] for line in result['lines']] == ['first', 'second']
+    assert result['lines'][1]['stream'] == 'STDERR'
+    buffer.append('STDOUT', b'third')
+    result = buffer.since(result['next'])
+    assert [line['text'] for line in result['lines']] == ['third']
+    assert result['next'] == 3
+
+
+def test_evicts_by_line_count() -> None:
+    buffer = LogRingBuffer(max_lines=3, max_bytes=1024)
+    for i in range(10):
+        buffer.append('STDOUT', f'line {i}'.encode())
+    result = buffer.since(0)
+    assert [line['text'] for line in result['lines']] == ['line 7', 'line 8', 'line 9']
+    assert result['skipped'] == 7
+    assert len(buffer) == 3
+
+
+def test_evicts_by_bytes_and_wraps() -> None:
+    buffer = LogRingBuffer(max_lines=100, max_bytes=32)
+    for i in range(20):
+        buffer.append('STDOUT', f'line-{i:02d}'.encode())
+    texts = [line['text'] for line in buffer.since(0)['lines']]
+    # 7-byte lines in a 32-byte store: only the last four fit, including one that wraps
+    assert texts == ['line-16', 'line-17', 'line-18', 'line-19']
+
+
+def test_truncates_long_lines() -> None:
+    buffer = LogRingBuffer(max_lines=4, max_bytes=64, max_line_bytes=8)
+    buffer.append('STDOUT', b'x' * 100)
+    assert buffer.since(0)['lines'][0]['text'] == 'x' * 8
+
+
+def test_rejects_invalid_sizes() -> None:
+    with pytest.raises(ValueError):
+        LogRingBuffer(max_lines=0)
@@ -0,0 +1,46 @@
+import logging
+import queue
+from pathlib import Path
+from log_pipeline import BatchQueueListener, BatchingRotatingFileHandler, DroppingQueueHandler
+
+
+def _record(level: int, msg: str) -> logging.LogRecord:
+    return logging.makeLogRecord({'levelno': level, 'levelname': logging.getLevelName(level), 'msg': msg})
+
+
+def test_full_queue_drops_instead_of_blocking() -> None:
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1), block_timeout=0.01)
+    handler.handle(_record(logging.INFO, 'first'))
+    handler.handle(_record(logging.INFO, 'second'))
+    handler.handle(_record(logging.ERROR, 'third'))
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 2
+
+
+def test_listener_writes_batches_and_reports_drops(tmp_path: Path) -> None:
+    log_file = tmp_path / 'webui.log'
+    file_handler = BatchingRotatingFileHandler(log_file, flush_interval=60, flush_records=1000)
+    file_handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+    q: queue.Queue = queue.Queue(maxsize=10)
+    queue_handler = DroppingQueueHandler(q)
+    queue_handler.dropped = 3
+    listener = BatchQueueListener(q, file_handler, queue_handler=queue_handler)
+    listener.start()
+    for i in range(5):
+        queue_handler.handle(_record(logging.INFO, f'line {i}'))
+    listener.stop()
+    file_handler.close()
+    lines = log_file.read_text().splitlines()
+    assert lines[0] == 'WARNING Logging queue full; dropped 3 record(s)'
+    assert lines[1:] == [f'INFO line {i}' for i in range(5)]
+
+
+def test_rotates_by_size(tmp_path: Path) -> None:
+    log_file = tmp_path / 'webui.log'
+    handler = BatchingRotatingFileHandler(log_file, max_bytes=100, backup_count=2)
+    for i in range(20):
+        handler.handle(_record(logging.INFO, f'line {i:02d} ' + 'x' * 20))
+    handler.close()
+    assert (tmp_path / 'webui.log.1').exists()
+    assert not (tmp_path / 'webui.log.3').exists()
+    assert log_file.stat().st_size <= 100
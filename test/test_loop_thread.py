@@ -0,0 +1,64 @@
+import asyncio
+import concurrent.futures
+import threading
+import pytest
+from loop_thread import LoopThread
+
+
+@pytest.fixture
+def loop_thread():
+    thread = LoopThread().start()
+    yield thread
+    thread.stop()
+
+
+def test_run_executes_on_loop_thread(loop_thread) -> None:
+    async def where() -> str:
+        await asyncio.sleep(0)
+        return threading.current_thread().name
+
+    assert loop_thread.run(where(), timeout=5) == 'server-loop'
+
+
+def test_timeout_cancels_coroutine(loop_thread) -> None:
+    cancelled = threading.Event()
+
+    async def slow() -> None:
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        loop_thread.run(slow(), timeout=0.05)
+    assert cancelled.wait(5)
+
+
+def test_run_from_loop_thread_is_rejected(loop_thread) -> None:
+    async def nested() -> None:
+        coro = asyncio.sleep(0)
+        try:
+            loop_thread.run(coro)
+        finally:
+            coro.close()
+
+    with pytest.raises(RuntimeError):
+        loop_thread.run(nested(), timeout=5)
+
+
+def test_stop_cancels_background_tasks() -> None:
+    thread = LoopThread().start()
+    cancelled = threading.Event()
+
+    async def monitor() -> None:
+        try:
+            await asyncio.sleep(30)
+        finally:
+            cancelled.set()
+
+    thread.submit(monitor())
+    thread.stop()
+    assert cancelled.is_set()
+    assert not thread.running
+    assert thread.loop.is_closed()
@@ -0,0 +1,59 @@
+import pytest
+from probe_metrics import MetricsExporter, ProbeMetrics
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_percentiles_interpolate_within_buckets() -> None:
+    metrics = ProbeMetrics(bounds=(0.1, 0.2, 0.4), clock=Clock())
+    for _ in range(90):
+        metrics.record(0.05)
+    for _ in range(10):
+        metrics.record(0.3)
+    snapshot = metrics.snapshot()
+    assert snapshot['samples'] == 100
+    assert snapshot['p50'] == pytest.approx(0.1 * 50 / 90)
+    assert 0.2 < snapshot['p95'] <= 0.4
+    assert snapshot['last_latency'] == 0.3
+
+
+def test_window_forgets_old_slices() -> None:
+    clock = Clock()
+    metrics = ProbeMetrics(window_seconds=60, slices=6, clock=clock)
+    metrics.record(5.0)
+    metrics.record(None, 'timeout')
+    clock.now = 30
+    metrics.record(0.01)
+    assert metrics.snapshot()['samples'] == 2
+    clock.now = 65
+    snapshot = metrics.snapshot()
+    assert snapshot['samples'] == 1
+    assert snapshot['errors']['timeout'] == 0
+    clock.now = 1000
+    assert metrics.snapshot()['p50'] is None
+
+
+def test_unknown_error_kind_rejected() -> None:
+    with pytest.raises(ValueError):
+        ProbeMetrics().record(None, 'dns')
+
+
+def test_prometheus_text_and_file(tmp_path) -> None:
+    metrics = ProbeMetrics(bounds=(0.1, 1.0), clock=Clock())
+    metrics.record(0.05)
+    metrics.record(2.0, 'http_5xx')
+    text = metrics.to_prometheus()
+    assert 'webui_probe_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'webui_probe_latency_seconds_bucket{le="+Inf"} 2' in text
+    assert 'webui_probe_latency_seconds_count 2' in text
+    assert 'webui_probe_errors_total{kind="http_5xx"} 1' in text
+    assert 'webui_probe_rolling_latency_seconds{quantile="0.5"}' in text
+    path = tmp_path / 'metrics' / 'webui.prom'
+    MetricsExporter(metrics, path=path).write_file()
+    assert path.read_text() == text
@@ -0,0 +1,80 @@
+import os
+import pytest
+from proc_telemetry import (PAGE_SIZE, TELEMETRY_SUPPORTED, ProcSample, TelemetrySeries, process_tree,
+                            sample_tree)
+
+
+def _fake_proc(root, processes) -> None:
+    """processes: {pid: (ppid, utime_ticks, threads, rss_pages, fds)}"""
+    for pid, (ppid, utime, threads, rss, fds) in processes.items():
+        fields = ['S', ppid] + [0] * 9 + [utime, 0] + [0] * 4 + [threads, 0, 0, 0, rss]
+        directory = root / str(pid)
+        (directory / 'fd').mkdir(parents=True)
+        (directory / 'stat').write_text(f"{pid} (open webui) {' '.join(map(str, fields))}\n")
+        for fd in range(fds):
+            (directory / 'fd' / str(fd)).touch()
+
+
+def test_sample_sums_process_tree(tmp_path) -> None:
+    _fake_proc(tmp_path, {
+        10: (1, 100, 4, 1000, 3),
+        11: (10, 50, 2, 500, 2),
+        12: (11, 0, 1, 10, 1),
+        20: (1, 999, 9, 9999, 9),  # unrelated
+    })
+    assert sorted(process_tree(10, tmp_path)) == [10, 11, 12]
+    sample = sample_tree(10, 123.0, tmp_path)
+    assert sample.processes == 3
+    assert sample.threads == 7
+    assert sample.fds == 6
+    assert sample.rss_bytes == 1510 * PAGE_SIZE
+    assert sample.cpu_seconds == pytest.approx(150 / os.sysconf('SC_CLK_TCK'))
+    assert sample_tree(99, 0.0, tmp_path) is None
+
+
+@pytest.mark.skipif(not TELEMETRY_SUPPORTED, reason='needs /proc')
+def test_sample_own_process() -> None:
+    sample = sample_tree(os.getpid(), 0.0)
+    assert sample.rss_bytes > 0
+    assert sample.threads >= 1
+    assert sample.fds >= 3
+
+
+def test_series_wraps_and_computes_cpu() -> None:
+    series = TelemetrySeries(capacity=3)
+    assert series.cpu_percent() is None
+    for t in range(5):
+        series.append(ProcSample(float(t), 100 * t, 0.5 * t, 1, 1, 1))
+    assert len(series) == 3
+    assert [s.timestamp for s in series.samples()] == [2.0, 3.0, 4.0]
+    assert series.cpu_percent() == pytest.approx(50.0)
+    assert series.cpu_percent(window=2) == pytest.approx(50.0)
+    summary = series.to_dict(limit=2)
+    assert summary['latest']['rss_bytes'] == 400
+    assert summary['peak_rss_bytes'] == 400
+    assert len(summary['samples']) == 2
+
+
+def test_rss_limit_restarts_only_when_idle() -> None:
+    from server_manager import ServerManager
+
+    class Supervisor:
+        reasons = []
+
+        def schedule_restart(self, reason: str) -> None:
+            self.reasons.append(reason)
+
+    manager = ServerManager(rss_limit_bytes=100 * 1024 * 1024, idle_cpu_percent=5)
+    manager.supervisor = Supervisor()
+    manager.process = object()
+    manager.state = 'running'
+    # Busy: 50% CPU over the window
+    for t in range(3):
+        manager.telemetry.append(ProcSample(float(t), 200 * 1024 * 1024, 0.5 * t, 1, 1, 1))
+    manager._check_rss_limit(200 * 1024 * 1024, idle_samples=2)
+    assert manager.supervisor.reasons == []
+    # Idle: CPU time stops growing
+    for t in range(3, 6):
+        manager.telemetry.append(ProcSample(float(t), 200 * 1024 * 1024, 1.0, 1, 1, 1))
+    manager._check_rss_limit(200 * 1024 * 1024, idle_samples=2)
+    assert manager.supervisor.reasons == ['RSS 200 MB over the 100 MB limit']
@@ -0,0 +1,71 @@
+import asyncio
+import aiohttp
+import pytest
+from aiohttp import web
+from proxy import ReverseProxy
+
+
+class Backend:
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.active = 0
+
+
+async def _start_backend(name: str, port: int):
+    async def index(request: web.Request) -> web.Response:
+        body = await request.read()
+        return web.Response(text=f'{name}:{request.method}:{request.path_qs}:{body.decode()}',
+                            headers={'X-Backend': name})
+
+    async def ws(request: web.Request) -> web.WebSocketResponse:
+        socket_ = web.WebSocketResponse()
+        await socket_.prepare(request)
+        async for message in socket_:
+            await socket_.send_str(f'{name}:{message.data}')
+        return socket_
+
+    app = web.Application()
+    app.router.add_get('/ws/echo', ws)
+    app.router.add_route('*', '/{path:.*}', index)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    return runner, Backend(f'http://127.0.0.1:{port}')
+
+
+@pytest.mark.asyncio
+async def test_proxies_http_and_websocket(unused_tcp_port_factory) -> None:
+    runner, backend = await _start_backend('a', unused_tcp_port_factory())
+    proxy = ReverseProxy(lambda request: backend, port=unused_tcp_port_factory())
+    await proxy.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            base = f'http://127.0.0.1:{proxy.port}'
+            async with session.post(f'{base}/api/chat?x=1', data=b'hello') as response:
+                assert response.status == 200
+                assert response.headers['X-Backend'] == 'a'
+                assert await response.text() == 'a:POST:/api/chat?x=1:hello'
+            async with session.ws_connect(f'{base}/ws/echo') as ws:
+                assert backend.active == 1
+                await ws.send_str('ping')
+                assert (await ws.receive()).data == 'a:ping'
+        for _ in range(50):
+            if not backend.active:
+                break
+            await asyncio.sleep(0.01)
+        assert backend.active == 0
+    finally:
+        await proxy.stop()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_returns_503_without_backend(unused_tcp_port: int) -> None:
+    proxy = ReverseProxy(lambda request: None, port=unused_tcp_port)
+    await proxy.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f'http://127.0.0.1:{proxy.port}/') as response:
+                assert response.status == 503
+    finally:
+        await proxy.stop()
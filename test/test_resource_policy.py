@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+import pytest
+from resource_policy import ResourcePolicy, apply_policy, read_effective
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith('linux'), reason='needs Linux scheduling APIs')
+
+
+def test_policy_requested_values() -> None:
+    assert not ResourcePolicy()
+    policy = ResourcePolicy(nice=10, ionice_class='best-effort', cpu_affinity=[3, 1, 1])
+    assert policy
+    assert policy.requested == {'nice': 10, 'ionice': 'best-effort:4', 'cpu_affinity': [1, 3]}
+    with pytest.raises(ValueError):
+        ResourcePolicy(ionice_class='fast')
+
+
+@linux_only
+def test_apply_policy_to_child() -> None:
+    cpu = min(os.sched_getaffinity(0))
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        policy = ResourcePolicy(nice=os.getpriority(os.PRIO_PROCESS, 0) + 5, ionice_class='idle',
+                                cpu_affinity=[cpu], memory_limit_bytes=8 * 1024 ** 3, max_open_files=256)
+        effective = apply_policy(child.pid, policy)
+        assert effective == read_effective(child.pid)
+        for name, wanted in policy.requested.items():
+            assert effective[name] == wanted
+    finally:
+        child.kill()
+        child.wait()
+
+
+@linux_only
+def test_unprivileged_failures_are_reported(caplog) -> None:
+    if os.geteuid() == 0:
+        pytest.skip('root may raise priority')
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        effective = apply_policy(child.pid, ResourcePolicy(nice=-20))
+        assert effective['nice'] != -20
+        assert 'Could not apply server nice=-20' in caplog.text
+    finally:
+        child.kill()
+        child.wait()
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+import pytest
+from server_lock import (ServerLock, attach_client, cmdline_matches, detach_client, pid_alive, read_lock,
+                         run_reaper, write_lock)
+
+
+def test_lock_roundtrip(tmp_path: Path) -> None:
+    path = tmp_path / 'server.lock'
+    assert read_lock(path) is None
+    write_lock(ServerLock(pid=123, cmdline=['open-webui', 'serve'], url='http://127.0.0.1:8080/'), path)
+    lock = read_lock(path)
+    assert lock.pid == 123
+    assert lock.cmdline == ['open-webui', 'serve']
+
+
+def test_attach_and_detach_client(tmp_path: Path) -> None:
+    path = tmp_path / 'server.lock'
+    write_lock(ServerLock(pid=os.getpid(), cmdline=[], url='http://127.0.0.1:8080/'), path)
+    attach_client(os.getpid(), path)
+    assert read_lock(path).clients == [os.getpid()]
+    detach_client(os.getpid(), path)
+    lock = read_lock(path)
+    assert lock.clients == []
+    assert lock.idle_since is not None
+
+
+def test_concurrent_attaches_are_not_lost(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / 'server.lock'
+    monkeypatch.setattr('server_lock.pid_alive', lambda pid: True)
+    write_lock(ServerLock(pid=os.getpid(), cmdline=[], url='http://127.0.0.1:8080/'), path)
+    threads = [threading.Thread(target=attach_client, args=(1000 + i, path)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(read_lock(path).clients) == list(range(1000, 1020))
+
+
+def test_pid_and_cmdline_checks() -> None:
+    assert pid_alive(os.getpid())
+    assert not pid_alive(0)
+    assert cmdline_matches(os.getpid(), ['python'])
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='uses POSIX process groups')
+def test_reaper_stops_idle_server(tmp_path: Path) -> None:
+    path = tmp_path / 'server.lock'
+    server = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'], start_new_session=True)
+    # Reap the child as soon as it exits so pid_alive() doesn't see a zombie
+    threading.Thread(target=server.wait, daemon=True).start()
+    try:
+        write_lock(ServerLock(pid=server.pid, cmdline=[], url='http://127.0.0.1:8080/',
+                              idle_since=time.time() - 10), path)
+        run_reaper(idle_timeout=1, path=path, poll_interval=0.05)
+        assert server.wait(timeout=5) is not None
+        assert read_lock(path) is None
+    finally:
+        if server.poll() is None:
+            server.kill()
@@ -1,6 +1,7 @@
 import asyncio
+import sys
 import pytest
-from server_manager import ServerManager
+from server_manager import ServerManager, StartupFailure, wait_for_server
 
 @pytest.mark.asyncio
 async def test_server_manager_stop_without_start() -> None:
@@ -14,4 +15,400 @@ async def test_invalid_start_method() -> None:
     result = await manager.start_server(method='invalid')
     # Since the invalid method will raise a ValueError that is caught internally,
     # the start_server returns False
-    assert result is False
\ No newline at end of file
+    assert result is False
+
+@pytest.mark.asyncio
+async def test_wait_for_server_http_signal(unused_tcp_port: int) -> None:
+    from aiohttp import web
+
+    async def index(request: web.Request) -> web.Response:
+        return web.Response(text='ok')
+
+    app = web.Application()
+    app.router.add_get('/', index)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', unused_tcp_port)
+    await site.start()
+    try:
+        result = await wait_for_server(f'http://127.0.0.1:{unused_tcp_port}/', timeout=5)
+        assert result
+        assert result.signal == 'http'
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_wait_for_server_probes_densely_around_expected_time(unused_tcp_port: int) -> None:
+    from aiohttp import web
+
+    async def index(request: web.Request) -> web.Response:
+        return web.Response(text='ok')
+
+    async def serve_later() -> web.AppRunner:
+        await asyncio.sleep(1.0)
+        app = web.Application()
+        app.router.add_get('/', index)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', unused_tcp_port).start()
+        return runner
+
+    server = asyncio.ensure_future(serve_later())
+    try:
+        # Plain backoff would probe at ~0.75s and ~1.55s; the expected time fills the gap
+        result = await wait_for_server(f'http://127.0.0.1:{unused_tcp_port}/', timeout=5, jitter=0, expected=1.0)
+        assert result.signal == 'http'
+        assert result.elapsed < 1.3
+    finally:
+        await (await server).cleanup()
+
+
+@pytest.mark.asyncio
+async def test_wait_for_server_stdout_signal(unused_tcp_port: int) -> None:
+    manager = ServerManager()
+    manager._ready_event = asyncio.Event()
+    reader = asyncio.StreamReader()
+    reader.feed_data(b'INFO:     Uvicorn running on http://0.0.0.0:8080 (Press CTRL+C to quit)\n')
+    reader.feed_eof()
+    await manager._log_stream(reader, "STDERR")
+    result = await wait_for_server(f'http://127.0.0.1:{unused_tcp_port}/', timeout=5,
+                                   ready_event=manager._ready_event)
+    assert result.ready
+    assert result.signal == 'stdout'
+
+
+@pytest.mark.asyncio
+async def test_wait_for_server_timeout(unused_tcp_port: int) -> None:
+    result = await wait_for_server(f'http://127.0.0.1:{unused_tcp_port}/', timeout=0.3, interval=0.1)
+    assert not result
+    assert result.signal is None
+    assert result.attempts > 1
+
+
+@pytest.mark.asyncio
+async def test_wait_for_server_stops_on_failure(unused_tcp_port: int) -> None:
+    failure = asyncio.get_running_loop().create_future()
+    asyncio.get_running_loop().call_later(0.1, failure.set_result, StartupFailure('exited', 'exited with code 1'))
+    result = await wait_for_server(f'http://127.0.0.1:{unused_tcp_port}/', timeout=30, interval=5, failure=failure)
+    assert not result
+    assert result.failure.reason == 'exited'
+    assert result.elapsed < 1
+
+
+@pytest.mark.asyncio
+async def test_reattach_removes_stale_lock(tmp_path) -> None:
+    from server_lock import ServerLock, read_lock, write_lock
+    lock_path = tmp_path / 'server.lock'
+    write_lock(ServerLock(pid=2 ** 22 + 1, cmdline=['open-webui', 'serve'], url='http://127.0.0.1:1/'), lock_path)
+    manager = ServerManager(keep_warm=True, lock_path=lock_path)
+    assert await manager.reattach() is False
+    assert read_lock(lock_path) is None
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_process_exit_pushes_crashed_event() -> None:
+    import sys
+    manager = ServerManager()
+    events = []
+    manager.subscribe(events.append)
+    manager.process = await asyncio.create_subprocess_exec(sys.executable, '-c', 'raise SystemExit(3)')
+    await manager._set_state('starting', 'test launch')
+    await manager._watch_process(manager.process)
+    assert [event.state for event in events] == ['starting', 'crashed']
+    assert 'code 3' in events[-1].reason
+
+
+@pytest.mark.asyncio
+async def test_connection_callback_follows_state() -> None:
+    manager = ServerManager()
+    calls = []
+    manager.set_connection_callback(calls.append)
+    await manager._set_state('running', 'test')
+    await manager._set_state('running', 'duplicate is ignored')
+    await manager._set_state('stopped', 'test')
+    assert calls == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_start_and_stop_fake_server(tmp_path, unused_tcp_port: int) -> None:
+    from benchmarks.fake_open_webui import fake_server_env
+    with fake_server_env(tmp_path):
+        manager = ServerManager(port=unused_tcp_port, ready_timeout=10)
+        assert await manager.start_server(method='piped')
+        assert manager.last_readiness.signal in ('stdout', 'http')
+        assert manager.state == 'running'
+        await manager.stop_server()
+        assert manager.process is None
+        assert manager.state == 'stopped'
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_stop_after_crash_on_start(tmp_path, unused_tcp_port: int) -> None:
+    from benchmarks.fake_open_webui import fake_server_env
+    with fake_server_env(tmp_path, crash=1):
+        manager = ServerManager(port=unused_tcp_port, ready_timeout=1)
+        assert await manager.start_server(method='direct') is False
+        await manager.stop_server()
+        assert manager.process is None
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_crash_on_start_fails_fast_with_reason(tmp_path, unused_tcp_port: int) -> None:
+    from benchmarks.fake_open_webui import fake_server_env
+    with fake_server_env(tmp_path, crash=3):
+        manager = ServerManager(port=unused_tcp_port, ready_timeout=30)
+        assert await manager.start_server(method='piped') is False
+        assert manager.last_readiness.elapsed < 5
+        assert manager.last_failure.reason == 'exited'
+        assert 'code 3' in manager.last_failure.detail
+        assert 'crashed on start' in manager.last_failure.detail
+        assert not manager.last_failure.permanent
+        assert manager.process is None
+        assert manager.state == 'crashed'
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_launches_are_recorded_in_history(tmp_path, unused_tcp_port: int) -> None:
+    from benchmarks.fake_open_webui import fake_server_env
+    from startup_history import StartupHistory
+    history = StartupHistory(tmp_path / 'history.json')
+    with fake_server_env(tmp_path / 'bin', crash=1):
+        manager = ServerManager(port=unused_tcp_port, ready_timeout=10, history=history)
+        assert not await manager.start_server(method='direct')
+    with fake_server_env(tmp_path / 'bin'):
+        assert await manager.start_server(method='piped')
+        await manager.stop_server()
+        await manager.close()
+    launches = StartupHistory.load(tmp_path / 'history.json').records
+    assert [(r.method, r.ready, r.failure) for r in launches] == [('direct', False, 'exited'), ('piped', True, None)]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_is_bounded_and_timed(unused_tcp_port: int) -> None:
+    from aiohttp import web
+    active = peak = 0
+
+    async def handler(request: web.Request) -> web.Response:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        try:
+            await asyncio.sleep(1.0 if request.path == '/slow' else 0.05)
+        finally:
+            active -= 1
+        return web.Response(text='ok', status=404 if request.path == '/missing' else 200)
+
+    app = web.Application()
+    app.router.add_get('/{tail:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', unused_tcp_port).start()
+    paths = ['/api/config', '/api/models?x=1', '/missing', '/slow', '/a', '/b']
+    manager = ServerManager(port=unused_tcp_port, warmup_paths=paths, warmup_concurrency=2, warmup_timeout=0.3)
+    try:
+        result = await manager.warm_up()
+    finally:
+        await manager.close()
+        await runner.cleanup()
+    endpoints = {r['path']: r for r in result['endpoints']}
+    assert [r['path'] for r in result['endpoints']] == paths
+    assert endpoints['/api/config']['status'] == 200
+    assert endpoints['/api/models?x=1']['status'] == 200
+    assert endpoints['/missing']['status'] == 404
+    assert endpoints['/slow']['status'] is None
+    assert endpoints['/slow']['error'] == 'timeout'
+    assert 0.3 <= endpoints['/slow']['latency'] < 1.0
+    assert peak == 2
+    assert manager.last_warmup is result
+
+
+@pytest.mark.asyncio
+async def test_warm_up_survives_session_close_and_close_cancels_it(unused_tcp_port: int) -> None:
+    from aiohttp import web
+
+    async def handler(request: web.Request) -> web.Response:
+        await asyncio.sleep(0.2)
+        return web.Response(text='ok')
+
+    app = web.Application()
+    app.router.add_get('/{tail:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', unused_tcp_port).start()
+    manager = ServerManager(port=unused_tcp_port, warmup_paths=['/a', '/b'], warmup_concurrency=1)
+    try:
+        warm_up = asyncio.ensure_future(manager.warm_up())
+        await asyncio.sleep(0.1)
+        await manager._get_session().close()
+        endpoints = (await warm_up)['endpoints']
+        assert all(r['status'] is None and r['error'] for r in endpoints)
+        assert 'Session is closed' in endpoints[1]['error']
+
+        manager._warmup_task = asyncio.ensure_future(manager.warm_up())
+        task = manager._warmup_task
+        await asyncio.sleep(0.1)
+        await manager.close()
+        await asyncio.gather(task, return_exceptions=True)
+        assert task.cancelled()
+    finally:
+        await manager.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_runs_after_start(tmp_path, unused_tcp_port: int) -> None:
+    from benchmarks.fake_open_webui import fake_server_env
+    with fake_server_env(tmp_path):
+        manager = ServerManager(port=unused_tcp_port, ready_timeout=10, warmup_paths=['/api/config'])
+        assert await manager.start_server(method='direct')
+        await manager._warmup_task
+        assert manager.last_warmup['endpoints'][0]['status'] == 200
+        await manager.stop_server()
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_missing_command_is_a_permanent_failure(monkeypatch) -> None:
+    monkeypatch.setattr('server_manager.SERVER_COMMAND', ['open-webui-not-installed-anywhere', 'serve'])
+    manager = ServerManager(ready_timeout=30)
+    assert await manager.start_server(method='direct') is False
+    assert manager.last_failure.reason == 'not_found'
+    assert manager.last_failure.permanent
+    assert manager.process is None
+
+
+@pytest.mark.asyncio
+async def test_fatal_output_fails_start_and_reaps_child(monkeypatch, unused_tcp_port: int) -> None:
+    script = ("import sys, time; print('ModuleNotFoundError: No module named open_webui', file=sys.stderr, "
+              "flush=True); time.sleep(60)")
+    monkeypatch.setattr('server_manager.SERVER_COMMAND', [sys.executable, '-c', script])
+    manager = ServerManager(port=unused_tcp_port, ready_timeout=30, stop_timeout=1)
+    assert await manager.start_server(method='piped') is False
+    assert manager.last_failure.reason == 'import_error'
+    assert manager.last_readiness.elapsed < 5
+    assert manager.process is None
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_start_reaps_previous_attempt(unused_tcp_port: int) -> None:
+    manager = ServerManager(port=unused_tcp_port, ready_timeout=0.5, stop_timeout=1)
+    previous = await asyncio.create_subprocess_exec(sys.executable, '-c', 'import time; time.sleep(60)',
+                                                    **manager._spawn_kwargs())
+    manager.process = previous
+    assert await manager.start_server(method='invalid') is False
+    assert previous.returncode is not None
+    assert manager.process is None
+
+
+@pytest.mark.asyncio
+async def test_probe_http_records_latency_and_errors(unused_tcp_port: int) -> None:
+    from aiohttp import web
+
+    async def index(request: web.Request) -> web.Response:
+        return web.Response(status=503)
+
+    manager = ServerManager(port=unused_tcp_port)
+    assert await manager.probe_http() is None
+    app = web.Application()
+    app.router.add_get('/', index)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', unused_tcp_port).start()
+    try:
+        assert await manager.probe_http() == 503
+    finally:
+        await runner.cleanup()
+        await manager.close()
+    snapshot = manager.probe_metrics.snapshot()
+    assert snapshot['samples'] == 1
+    assert snapshot['errors'] == {'timeout': 0, 'connect': 1, 'http_5xx': 1}
+
+
+WORKER_IGNORING_SIGTERM = '''
+import os, signal, time
+signal.signal(signal.SIGTERM, signal.SIG_IGN)
+worker = os.fork()
+if worker == 0:
+    time.sleep(60)
+    os._exit(0)
+print(worker, flush=True)
+time.sleep(60)
+'''
+
+
+def _gone(pid: int) -> bool:
+    """True once pid has exited (a zombie awaiting its new parent counts as exited)."""
+    try:
+        with open(f'/proc/{pid}/stat') as stat:
+            return stat.read().rsplit(')', 1)[1].split()[0] == 'Z'
+    except FileNotFoundError:
+        return True
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='uses fork and /proc')
+async def test_stop_escalates_to_sigkill_for_whole_group() -> None:
+    import time
+    manager = ServerManager(stop_timeout=0.5)
+    manager.process = await asyncio.create_subprocess_exec(
+        sys.executable, '-c', WORKER_IGNORING_SIGTERM, stdout=asyncio.subprocess.PIPE, **manager._spawn_kwargs())
+    leader = manager.process
+    worker = int(await leader.stdout.readline())
+    start = time.perf_counter()
+    await manager.stop_server()
+    assert time.perf_counter() - start < 3
+    assert leader.returncode == -9
+    for _ in range(50):
+        if _gone(worker):
+            break
+        await asyncio.sleep(0.02)
+    assert _gone(worker)
+    assert manager.process is None
+
+
+@pytest.mark.asyncio
+async def test_default_boot_captures_server_output(tmp_path, unused_tcp_port: int) -> None:
+    from benchmarks.fake_open_webui import fake_server_env
+    from config import AppConfig
+    from main import boot_server
+    from startup_profile import StartupProfiler
+    with fake_server_env(tmp_path):
+        manager = ServerManager(port=unused_tcp_port, ready_timeout=10)
+        assert await boot_server(manager, AppConfig(), StartupProfiler(enabled=False))
+        assert manager.method == 'piped'
+        assert len(manager.log_buffer) > 0
+        manager._monitor_task.cancel()
+        await manager.stop_server()
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_history_does_not_override_piped_when_output_is_needed(tmp_path, unused_tcp_port: int) -> None:
+    from benchmarks.fake_open_webui import fake_server_env
+    from config import AppConfig
+    from main import boot_server
+    from startup_history import StartupHistory
+    from startup_profile import StartupProfiler
+    history = StartupHistory(None)
+    history.record('direct', True, 1.0)
+    assert history.method_order(['piped', 'direct']) == ['direct', 'piped']
+    with fake_server_env(tmp_path):
+        manager = ServerManager(port=unused_tcp_port, ready_timeout=10, history=history)
+        assert await boot_server(manager, AppConfig(), StartupProfiler(enabled=False))
+        assert manager.method == 'piped'
+        manager._monitor_task.cancel()
+        await manager.stop_server()
+        await manager.close()
+
+
+def test_output_capture_can_be_turned_off() -> None:
+    assert ServerManager().captures_output
+    manager = ServerManager(log_buffer_lines=0)
+    assert manager.log_buffer is None
+    assert not manager.captures_output
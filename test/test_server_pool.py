@@ -0,0 +1,79 @@
+import asyncio
+import types
+import aiohttp
+import pytest
+from server_pool import PoolMember, ServerPool, free_port
+
+
+def _request(path: str, remote: str = '10.0.0.1'):
+    return types.SimpleNamespace(path=path, remote=remote, cookies={})
+
+
+def _member(index: int, active: int = 0) -> PoolMember:
+    manager = types.SimpleNamespace(url=f'http://127.0.0.1:{9000 + index}/')
+    member = PoolMember(index, manager)
+    member.healthy = True
+    member.active = active
+    return member
+
+
+def test_least_connections_and_sticky_websockets() -> None:
+    pool = ServerPool(2)
+    busy, idle = _member(0, active=5), _member(1, active=1)
+    pool.members = [busy, idle]
+    assert pool.pick_member(_request('/api/models')) is idle
+
+    first = pool.pick_member(_request('/ws/socket.io/?EIO=4'))
+    assert first is idle
+    idle.active = 10
+    # Same client keeps its socket.io instance even though it is now the busier one
+    assert pool.pick_member(_request('/ws/socket.io/?EIO=4&sid=x')) is idle
+    assert pool.pick_member(_request('/ws/socket.io/', remote='10.0.0.2')) is busy
+
+    idle.draining = True
+    assert pool.pick_member(_request('/ws/socket.io/')) is busy
+
+
+def test_sticky_clients_expire(monkeypatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr('server_pool.time.monotonic', lambda: now)
+    pool = ServerPool(2, sticky_ttl=60)
+    pool.members = [_member(0), _member(1)]
+    for client in range(100):
+        pool.pick_member(_request('/ws/socket.io/', remote=f'10.0.1.{client}'))
+    assert len(pool._sticky) == 100
+    now += 30
+    pool.pick_member(_request('/ws/socket.io/', remote='10.0.1.7'))
+    now += 40
+    pool.pick_member(_request('/ws/socket.io/', remote='10.0.2.1'))
+    # Only the client seen within the last minute is still pinned, plus the new one
+    assert list(pool._sticky) == ['10.0.1.7|', '10.0.2.1|']
+
+
+@pytest.mark.asyncio
+async def test_pool_serves_through_proxy_and_replaces_crashed_member(tmp_path) -> None:
+    from benchmarks.fake_open_webui import fake_server_env
+    with fake_server_env(tmp_path):
+        pool = ServerPool(2, bind_host='127.0.0.1', port=free_port(), ready_timeout=10, health_interval=0.1)
+        try:
+            assert await pool.start_server('piped')
+            assert pool.state == 'running'
+            async with aiohttp.ClientSession() as session:
+                async with session.get(pool.url) as response:
+                    assert response.status == 200
+
+                victim = pool.members[0]
+                victim.manager.process.kill()
+                for _ in range(100):
+                    if victim.restarts and victim.healthy:
+                        break
+                    await asyncio.sleep(0.05)
+                assert victim.restarts == 1
+                assert victim.healthy
+                assert pool.state == 'running'
+                async with session.get(pool.url) as response:
+                    assert response.status == 200
+        finally:
+            await pool.stop_server()
+            await pool.close()
+        assert pool.state == 'stopped'
@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+import pytest
+from loop_thread import LoopThread
+from single_instance import SINGLE_INSTANCE_SUPPORTED, InstanceLock, notify_running_instance
+
+ROOT = Path(__file__).resolve().parent.parent
+
+pytestmark = pytest.mark.skipif(not SINGLE_INSTANCE_SUPPORTED, reason='needs AF_UNIX and fcntl')
+
+
+@pytest.fixture
+def short_dir():
+    # Unix socket paths are limited to about 100 bytes, which pytest's tmp_path can exceed
+    import tempfile
+    with tempfile.TemporaryDirectory(prefix='webui-') as directory:
+        yield Path(directory)
+
+
+def test_second_lock_is_refused_until_released(short_dir: Path) -> None:
+    first = InstanceLock(short_dir / 'instance.sock', short_dir / 'instance.lock')
+    second = InstanceLock(short_dir / 'instance.sock', short_dir / 'instance.lock')
+    assert first.acquire()
+    try:
+        assert not second.acquire()
+    finally:
+        first.release()
+    assert not (short_dir / 'instance.sock').exists()
+    assert second.acquire()
+    second.release()
+
+
+def test_stale_socket_file_is_replaced(short_dir: Path) -> None:
+    (short_dir / 'instance.sock').write_text('left behind by a crash')
+    lock = InstanceLock(short_dir / 'instance.sock', short_dir / 'instance.lock')
+    assert lock.acquire()
+    lock.release()
+
+
+def test_request_is_handed_to_running_instance(short_dir: Path) -> None:
+    requests = []
+    lock = InstanceLock(short_dir / 'instance.sock', short_dir / 'instance.lock')
+    assert lock.acquire()
+    loop_thread = LoopThread().start()
+    try:
+        loop_thread.run(lock.serve(lambda request: requests.append(request) or {'ok': True}), timeout=5)
+        reply = notify_running_instance({'command': 'focus', 'url': 'http://127.0.0.1:8080/c/1'},
+                                        short_dir / 'instance.sock', timeout=5)
+        assert reply == {'ok': True}
+        assert requests == [{'command': 'focus', 'url': 'http://127.0.0.1:8080/c/1'}]
+        loop_thread.run(lock.stop(), timeout=5)
+    finally:
+        loop_thread.stop()
+        lock.release()
+
+
+def test_no_answer_returns_none(short_dir: Path) -> None:
+    assert notify_running_instance({'command': 'focus'}, short_dir / 'missing.sock', timeout=1) is None
+
+
+def test_second_launch_exits_before_heavy_imports(short_dir: Path) -> None:
+    home = short_dir / 'home'
+    env = dict(os.environ, HOME=str(home))
+    primary = (
+        'import sys; from loop_thread import LoopThread; from single_instance import InstanceLock; '
+        'lock = InstanceLock(); assert lock.acquire(); t = LoopThread().start(); '
+        't.run(lock.serve(lambda r: {"ok": True}), 5); print("ready", flush=True); sys.stdin.read()'
+    )
+    second = (
+        'import runpy, sys; sys.argv = ["main.py", "--url", "http://127.0.0.1:8080/"]\n'
+        'try:\n    runpy.run_path("main.py", run_name="__main__")\n'
+        'except SystemExit as e:\n'
+        '    print(e.code, sorted(m for m in ("webview", "aiohttp", "pydantic") if m in sys.modules))'
+    )
+    with subprocess.Popen([sys.executable, '-c', primary], cwd=ROOT, env=env, stdin=subprocess.PIPE,
+                          stdout=subprocess.PIPE, text=True) as running:
+        try:
+            assert running.stdout.readline().strip() == 'ready'
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, '-c', second], cwd=ROOT, env=env, capture_output=True,
+                                    text=True, timeout=30)
+            elapsed = time.perf_counter() - start
+        finally:
+            running.stdin.close()
+    assert result.stdout.strip() == '0 []'
+    assert elapsed < 10
@@ -0,0 +1,59 @@
+import json
+from startup_history import StartupHistory
+
+
+def test_round_trip_and_bounded(tmp_path) -> None:
+    path = tmp_path / 'history.json'
+    history = StartupHistory(path, max_records=3)
+    for elapsed in (1.0, 2.0, 3.0, 4.0):
+        history.record('direct', True, elapsed)
+    history.record('piped', False, 0.1, 'exited')
+    history.save()
+    loaded = StartupHistory.load(path, max_records=3)
+    assert [(r.method, r.elapsed, r.failure) for r in loaded.records] == [
+        ('direct', 3.0, None), ('direct', 4.0, None), ('piped', 0.1, 'exited')]
+
+
+def test_unreadable_file_starts_empty(tmp_path) -> None:
+    path = tmp_path / 'history.json'
+    path.write_text('{not json')
+    assert StartupHistory.load(path).records == []
+    assert StartupHistory.load(tmp_path / 'missing.json').records == []
+
+
+def test_expected_ready_time_is_a_moving_average() -> None:
+    history = StartupHistory(None, window=3, min_samples=2)
+    history.record('direct', True, 10.0)
+    assert history.expected_ready_time('direct') is None
+    for elapsed in (2.0, 4.0, 6.0):
+        history.record('direct', True, elapsed)
+    history.record('direct', False, 0.2, 'exited')
+    assert history.expected_ready_time('direct') == 4.0
+    assert history.expected_ready_time('piped') is None
+
+
+def test_slow_boot_is_flagged_as_regression() -> None:
+    history = StartupHistory(None, min_samples=3, regression_factor=1.5)
+    for _ in range(3):
+        assert not history.record('direct', True, 2.0).regression
+    assert not history.record('direct', True, 2.9).regression
+    assert history.record('direct', True, 5.0).regression
+
+
+def test_method_order_prefers_last_success_and_demotes_dead_methods() -> None:
+    history = StartupHistory(None, dead_after=2)
+    assert history.method_order(['direct', 'piped']) == ['direct', 'piped']
+    history.record('piped', True, 3.0)
+    assert history.method_order(['direct', 'piped']) == ['piped', 'direct']
+    history.record('piped', False, 0.1, 'exited')
+    history.record('piped', False, 0.1, 'exited')
+    assert history.is_dead('piped')
+    assert history.method_order(['piped', 'direct']) == ['direct', 'piped']
+
+
+def test_save_writes_json(tmp_path) -> None:
+    path = tmp_path / 'sub' / 'history.json'
+    history = StartupHistory(path)
+    history.record('direct', False, 0.0, 'not_found')
+    history.save()
+    assert json.loads(path.read_text())['launches'][0]['failure'] == 'not_found'
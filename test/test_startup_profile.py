@@ -0,0 +1,44 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from startup_profile import StartupProfiler
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_records_imports_and_phases(tmp_path: Path, monkeypatch) -> None:
+    (tmp_path / 'profiled_leaf.py').write_text('import time\ntime.sleep(0.02)\n')
+    (tmp_path / 'profiled_root.py').write_text('import profiled_leaf\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    profiler = StartupProfiler()
+    profiler.install()
+    try:
+        with profiler.phase('import'):
+            import profiled_root  # noqa: F401
+    finally:
+        profiler.uninstall()
+    assert profiler.imports['profiled_leaf']['self'] >= 0.02
+    assert profiler.imports['profiled_root']['self'] < profiler.imports['profiled_root']['inclusive']
+    assert profiler.phases[0]['name'] == 'import'
+
+    out = tmp_path / 'profile.json'
+    profiler.finish(out, top=1)
+    data = json.loads(out.read_text())
+    assert data['top_imports'][0]['module'] == 'profiled_leaf'
+
+
+def test_disabled_profiler_is_inert() -> None:
+    profiler = StartupProfiler(enabled=False)
+    profiler.install()
+    with profiler.phase('noop'):
+        pass
+    assert profiler.phases == []
+    assert profiler._original_import is None
+
+
+def test_heavy_imports_are_deferred() -> None:
+    code = ('import sys, config, server_manager, ui_manager; '
+            'print(sorted(m for m in ("webview", "aiohttp", "cryptography") if m in sys.modules))')
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
@@ -0,0 +1,134 @@
+import asyncio
+import pytest
+from server_manager import ServerManager, ServerStatusEvent
+from supervisor import Supervisor
+
+
+class FakeManager:
+    """Just enough of ServerManager for the supervisor: state, events, start/stop and probes."""
+
+    def __init__(self, start_results=(), probe_status=200) -> None:
+        self.state = None
+        self.method = 'piped'
+        self.owns_server = True
+        self._stopping = False
+        self._subscribers = []
+        self.start_results = list(start_results)
+        self.probe_status = probe_status
+        self.starts = 0
+
+    def subscribe(self, callback) -> None:
+        self._subscribers.append(callback)
+
+    async def _set_state(self, state: str, reason: str, force: bool = False) -> None:
+        self.state = state
+        for callback in self._subscribers:
+            callback(ServerStatusEvent(state, reason))
+
+    async def stop_server(self) -> None:
+        self._stopping = True
+
+    async def start_server(self, method: str) -> bool:
+        self._stopping = False
+        self.starts += 1
+        ready = self.start_results.pop(0) if self.start_results else True
+        await self._set_state('running' if ready else 'stopped', 'test')
+        return ready
+
+    async def probe_http(self):
+        return self.probe_status
+
+
+async def _wait_for(predicate, timeout: float = 5.0) -> None:
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_crash_after_ready_restarts_with_backoff() -> None:
+    manager = FakeManager(start_results=[False, True])
+    supervisor = Supervisor(manager, backoff_initial=0.01, hang_interval=60)
+    await manager._set_state('running', 'test')
+    await manager._set_state('crashed', 'exited unexpectedly with code 1')
+    await _wait_for(lambda: supervisor.restarts == 2 and not supervisor.restarting)
+    assert manager.state == 'running'
+    assert supervisor.stats()['last_recovery_seconds'] >= 0.01 + 0.02
+    supervisor.stop()
+
+
+@pytest.mark.asyncio
+async def test_crash_during_start_is_not_restarted() -> None:
+    manager = FakeManager()
+    supervisor = Supervisor(manager, backoff_initial=0.01)
+    await manager._set_state('starting', 'direct launch')
+    await manager._set_state('crashed', 'exited unexpectedly with code 1')
+    await asyncio.sleep(0.05)
+    assert manager.starts == 0
+    supervisor.stop()
+
+
+@pytest.mark.asyncio
+async def test_crash_loop_trips_breaker() -> None:
+    manager = FakeManager(start_results=[False] * 3)
+    supervisor = Supervisor(manager, backoff_initial=0.001, max_restarts=3)
+    await manager._set_state('running', 'test')
+    await manager._set_state('crashed', 'exited unexpectedly with code 1')
+    await _wait_for(lambda: supervisor.tripped)
+    assert manager.starts == 3
+    assert manager.state == 'crashed'
+    # A manual start re-arms the supervisor
+    await manager.start_server('piped')
+    assert not supervisor.tripped
+    supervisor.stop()
+
+
+@pytest.mark.asyncio
+async def test_hang_detection_restarts_server() -> None:
+    manager = FakeManager(probe_status=None)
+    supervisor = Supervisor(manager, backoff_initial=0.01, hang_interval=0.01, hang_probes=2)
+    await manager._set_state('running', 'test')
+    await _wait_for(lambda: supervisor.restarts == 1)
+    supervisor.stop()
+
+
+@pytest.mark.asyncio
+async def test_supervised_fake_server_recovers_from_kill(tmp_path, unused_tcp_port: int) -> None:
+    from benchmarks.fake_open_webui import fake_server_env
+    with fake_server_env(tmp_path):
+        manager = ServerManager(port=unused_tcp_port, ready_timeout=10, supervise=True)
+        manager.supervisor.backoff_initial = 0.01
+        try:
+            assert await manager.start_server(method='piped')
+            first = manager.process
+            first.kill()
+            await _wait_for(lambda: manager.supervisor.restarts == 1 and manager.state == 'running', timeout=10)
+            assert manager.process is not first
+        finally:
+            await manager.stop_server()
+            await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_crash_loop_is_published_to_subscribers(monkeypatch, unused_tcp_port: int) -> None:
+    import sys
+    # Reports ready on stderr, then crashes shortly after
+    script = ("import sys, time; print('INFO:     Uvicorn running on http://127.0.0.1', file=sys.stderr, "
+              "flush=True); time.sleep(0.2); sys.exit(1)")
+    monkeypatch.setattr('server_manager.SERVER_COMMAND', [sys.executable, '-c', script])
+    manager = ServerManager(port=unused_tcp_port, ready_timeout=10, supervise=True)
+    manager.supervisor.backoff_initial = 0.01
+    manager.supervisor.max_restarts = 2
+    events = []
+    manager.subscribe(events.append)
+    try:
+        assert await manager.start_server(method='piped')
+        await _wait_for(lambda: manager.supervisor.tripped and not manager.supervisor.restarting, timeout=10)
+        assert manager.supervisor.restarts == 2
+        assert (events[-1].state, events[-1].reason) == ('crashed', 'crash loop; auto-restart disabled')
+        assert events[-2].state == 'crashed'
+    finally:
+        await manager.stop_server()
+        await manager.close()
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import pytest
+import tracing
+
+
+@pytest.fixture
+def tracer():
+    active = tracing.enable()
+    try:
+        yield active
+    finally:
+        tracing.disable()
+
+
+def _spans(tracer: tracing.Tracer) -> dict:
+    return {e['name']: e for e in tracer.events if e['ph'] == 'X'}
+
+
+def test_disabled_tracing_is_inert() -> None:
+    assert tracing.disable() is None
+    assert tracing.span('a') is tracing.span('b')
+    with tracing.span('nothing'):
+        tracing.instant('nothing either')
+
+
+def test_nested_spans_and_errors(tracer: tracing.Tracer) -> None:
+    with tracing.span('outer', attempt=1):
+        with tracing.span('inner'):
+            pass
+        tracing.instant('mark')
+    with pytest.raises(ValueError):
+        with tracing.span('failing'):
+            raise ValueError('boom')
+    spans = _spans(tracer)
+    outer, inner = spans['outer'], spans['inner']
+    assert outer['args'] == {'attempt': 1}
+    assert outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+    assert outer['tid'] == inner['tid']
+    assert spans['failing']['args'] == {'error': 'ValueError'}
+    assert any(e['ph'] == 'i' and e['name'] == 'mark' for e in tracer.events)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tasks_get_their_own_tracks(tracer: tracing.Tracer) -> None:
+    @tracing.traced('work')
+    async def work(delay: float) -> float:
+        await asyncio.sleep(delay)
+        return delay
+
+    @tracing.traced('sync work')
+    def sync_work() -> int:
+        return 1
+
+    assert await asyncio.gather(work(0.02), work(0.01)) == [0.02, 0.01]
+    assert sync_work() == 1
+    tracks = {e['tid'] for e in tracer.events if e['name'] == 'work'}
+    assert len(tracks) == 2
+    names = {e['tid']: e['args']['name'] for e in tracer.to_dict()['traceEvents'] if e['name'] == 'thread_name'}
+    assert all(':' in names[tid] for tid in tracks)
+
+
+def test_write_and_event_cap(tmp_path) -> None:
+    tracer = tracing.Tracer(max_events=2)
+    for name in ('a', 'b', 'c'):
+        with tracer.span(name):
+            pass
+    tracer.write(tmp_path / 'trace.json')
+    data = json.loads((tmp_path / 'trace.json').read_text())
+    assert [e['name'] for e in data['traceEvents'] if e['ph'] == 'X'] == ['a', 'b']
+    assert data['otherData']['dropped_events'] == 1
+    assert data['displayTimeUnit'] == 'ms'
+
+
+@pytest.mark.asyncio
+async def test_server_lifecycle_is_traced(tracer: tracing.Tracer, tmp_path, unused_tcp_port: int) -> None:
+    from benchmarks.fake_open_webui import fake_server_env
+    from server_manager import ServerManager
+    with fake_server_env(tmp_path):
+        manager = ServerManager(port=unused_tcp_port, ready_timeout=10)
+        assert await manager.start_server(method='direct')
+        await manager.stop_server()
+        await manager.close()
+    spans = _spans(tracer)
+    for name in ('ServerManager.start_server', 'spawn', 'wait_for_server', 'ServerManager.stop_server',
+                 'ServerManager.terminate'):
+        assert name in spans
+    assert spans['spawn']['args']['method'] == 'direct'
+    start = spans['ServerManager.start_server']
+    assert start['ts'] <= spans['wait_for_server']['ts'] <= start['ts'] + start['dur']
+    assert {'server starting', 'server running', 'server stopped'} <= {e['name'] for e in tracer.events}
@@ -0,0 +1,183 @@
+import asyncio
+import sys
+import types
+import pytest
+from config import AppConfig
+from server_manager import ServerManager
+from ui_manager import UIManager
+
+
+class FakeEvent:
+    def __init__(self) -> None:
+        self.handlers = []
+
+    def __iadd__(self, handler):
+        self.handlers.append(handler)
+        return self
+
+
+class FakeWindow:
+    def __init__(self, **kwargs) -> None:
+        self.kwargs = kwargs
+        self.loaded = []
+        self.scripts = []
+        self.events = types.SimpleNamespace(resized=FakeEvent(), moved=FakeEvent(), loaded=FakeEvent())
+
+    def load_url(self, url: str) -> None:
+        self.loaded.append(url)
+
+    def load_html(self, html: str) -> None:
+        self.loaded.append(html)
+
+    def evaluate_js(self, script: str) -> None:
+        self.scripts.append(script)
+
+    def destroy(self) -> None:
+        self.destroyed = True
+
+    def restore(self) -> None:
+        self.shown = True
+
+    def show(self) -> None:
+        self.shown = True
+
+
+@pytest.fixture
+def fake_webview(monkeypatch):
+    module = types.ModuleType('webview')
+    module.create_window = lambda **kwargs: FakeWindow(**kwargs)
+    monkeypatch.setitem(sys.modules, 'webview', module)
+    return module
+
+
+@pytest.mark.asyncio
+async def test_window_opens_on_splash_and_switches_when_ready(fake_webview) -> None:
+    manager = ServerManager()
+    ui = UIManager(AppConfig(), manager)
+    ui.create_window()
+    assert ui.window.kwargs['url'] is None
+    assert 'Starting Open WebUI' in ui.window.kwargs['html']
+
+    await manager._set_state('running', 'test')
+    ui._ui_executor.shutdown(wait=True)
+    assert ui.window.loaded == ['http://127.0.0.1:8080/']
+    assert any('onServerStatus' in script for script in ui.window.scripts)
+
+
+@pytest.mark.asyncio
+async def test_window_skips_splash_when_server_is_up(fake_webview) -> None:
+    manager = ServerManager()
+    ui = UIManager(AppConfig(), manager)
+    await manager._set_state('running', 'test')
+    ui.create_window()
+    assert ui.window.kwargs['url'] == 'http://127.0.0.1:8080/'
+
+
+def test_geometry_changes_are_saved_once_after_they_settle(fake_webview, tmp_path, monkeypatch) -> None:
+    import json
+    import time
+    import config
+    monkeypatch.setattr(config, 'CONFIG_PATH', tmp_path / 'config.json')
+    saves = []
+
+    def save_config(cfg: AppConfig) -> bool:
+        saves.append((cfg.window_width, cfg.window_height, cfg.window_x, cfg.window_y))
+        return config.save_config(cfg)
+
+    monkeypatch.setattr('ui_manager.save_config', save_config)
+    ui = UIManager(AppConfig(), ServerManager(), save_delay=0.2)
+    ui.create_window()
+    resized, moved = ui.window.events.resized.handlers[0], ui.window.events.moved.handlers[0]
+    for step in range(5):
+        resized(800 + step, 600 + step)
+        moved(10 + step, 20 + step)
+        time.sleep(0.02)
+    time.sleep(0.5)
+    assert saves == [(804, 604, 14, 24)]
+    saved = json.loads((tmp_path / 'config.json').read_text())
+    assert (saved['window_width'], saved['window_x']) == (804, 14)
+
+    # Events that report the geometry the config already has are not saved again
+    resized(804, 604)
+    moved(14, 24)
+    time.sleep(0.5)
+    assert len(saves) == 1
+
+
+@pytest.mark.asyncio
+async def test_controls_page_stays_reachable_after_the_switch(fake_webview) -> None:
+    manager = ServerManager()
+    ui = UIManager(AppConfig(), manager)
+    await manager._set_state('running', 'test')
+    ui.create_window()
+    on_loaded = ui.window.events.loaded.handlers[0]
+    on_loaded()
+    assert 'showControls' in ui.window.scripts[-1]
+
+    ui._js_api['showControls']()
+    ui._ui_executor.submit(lambda: None).result()
+    assert 'Starting Open WebUI' in ui.window.loaded[-1]
+    scripts = len(ui.window.scripts)
+    on_loaded()
+    assert len(ui.window.scripts) == scripts  # the controls page has its own buttons
+
+    ui._js_api['openPage']()
+    ui._ui_executor.shutdown(wait=True)
+    assert ui.window.loaded[-1] == 'http://127.0.0.1:8080/'
+
+
+def test_shutdown_app_defers_server_stop_to_main(fake_webview) -> None:
+    ui = UIManager(AppConfig(), ServerManager())
+    ui.create_window()
+    ui.shutdown_app()
+    assert ui.shutdown_requested
+    assert ui.window.destroyed
+
+
+def test_focus_window_for_second_launch(fake_webview) -> None:
+    ui = UIManager(AppConfig(), ServerManager())
+    assert not ui.focus_window()
+    ui.create_window()
+    assert ui.focus_window('http://127.0.0.1:8080/c/42')
+    ui._ui_executor.shutdown(wait=True)
+    assert ui.window.shown
+    assert ui.window.loaded == ['http://127.0.0.1:8080/c/42']
+
+
+def test_js_api_start_and_stop_run_on_server_loop() -> None:
+    import threading
+    from loop_thread import LoopThread
+
+    class Manager(ServerManager):
+        async def start_server(self, method: str = 'direct') -> bool:
+            self.started_on = threading.current_thread().name
+            return True
+
+    loop_thread = LoopThread().start()
+    try:
+        manager = Manager()
+        ui = UIManager(AppConfig(), manager, loop_thread=loop_thread)
+        # pywebview calls the API from its own threads, not the loop thread
+        assert ui._js_api['startServer']() is True
+        assert manager.started_on == 'server-loop'
+        assert ui._js_api['stopServer']() is True
+    finally:
+        loop_thread.stop()
+
+
+def test_js_api_start_times_out_and_cancels() -> None:
+    from loop_thread import LoopThread
+
+    class Manager(ServerManager):
+        async def start_server(self, method: str = 'direct') -> bool:
+            await asyncio.sleep(30)
+            return True
+
+    loop_thread = LoopThread().start()
+    try:
+        manager = Manager(ready_timeout=0)
+        ui = UIManager(AppConfig(), manager, loop_thread=loop_thread)
+        ui.api_timeout_margin = 0.1
+        assert ui.start_server() is False
+    finally:
+        loop_thread.stop()
@@ -0,0 +1,165 @@
+"""Span tracing of the app's lifecycle, exported as Chrome trace-event JSON.
+
+``main.py --trace FILE`` turns tracing on. Spans from main, ServerManager and
+UIManager (config load, each start attempt, the readiness wait, window creation,
+the GUI loop, shutdown) are then written to FILE when the app exits. The file
+opens in Perfetto (https://ui.perfetto.dev) or chrome://tracing.
+
+Spans use the monotonic perf_counter clock and nest by time on their track.
+Each thread gets a track, and so does each asyncio task, because tasks on one
+loop interleave. When tracing is off, span() returns a shared no-op context
+manager, so instrumented code pays one global lookup.
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+_NO_SPAN = nullcontext()
+
+
+class Tracer:
+    def __init__(self, max_events: int = 100_000) -> None:
+        self.max_events = max_events
+        self.events: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self.started_at = time.time()
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        # Track ids per thread or asyncio task, with the names shown in the viewer; weak keys so a
+        # finished task's id is never mistaken for a new one
+        self._tracks: 'weakref.WeakKeyDictionary[Any, int]' = weakref.WeakKeyDictionary()
+        self._track_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _now(self) -> float:
+        """Microseconds since the tracer was created."""
+        return (time.perf_counter_ns() - self._origin) / 1000
+
+    def _track(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:  # no running loop in this thread
+            task = None
+        owner: Any = task if task is not None else threading.current_thread()
+        track = self._tracks.get(owner)
+        if track is None:
+            with self._lock:
+                track = self._tracks.setdefault(owner, len(self._track_names) + 1)
+                if task is not None:
+                    self._track_names[track] = f'{threading.current_thread().name}: {task.get_name()}'
+                else:
+                    self._track_names[track] = owner.name
+        return track
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        event['pid'] = self._pid
+        self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        track = self._track()
+        start = self._now()
+        try:
+            yield
+        except BaseException as e:
+            args['error'] = type(e).__name__
+            raise
+        finally:
+            self._emit({'name': name, 'cat': 'webui', 'ph': 'X', 'ts': start, 'dur': self._now() - start,
+                        'tid': track, 'args': args})
+
+    def instant(self, name: str, **args: Any) -> None:
+        self._emit({'name': name, 'cat': 'webui', 'ph': 'i', 's': 't', 'ts': self._now(), 'tid': self._track(),
+                    'args': args})
+
+    def to_dict(self) -> Dict[str, Any]:
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'args': {'name': 'webui'}}]
+        metadata += [{'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': track, 'args': {'name': name}}
+                     for track, name in self._track_names.items()]
+        return {
+            'traceEvents': metadata + self.events,
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'started_at': self.started_at,
+                'host': platform.node(),
+                'platform': platform.platform(),
+                'python': sys.version.split()[0],
+                'dropped_events': self.dropped,
+            },
+        }
+
+    def write(self, path: Path) -> None:
+        tmp = path.with_name(path.name + '.tmp')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(self.to_dict()), encoding='utf-8')
+            os.replace(tmp, path)
+            logging.info(f"Trace with {len(self.events)} events written to {path}")
+        except OSError as e:
+            logging.error(f"Error writing trace: {e}")
+
+
+_tracer: Optional[Tracer] = None
+
+
+def enable(max_events: int = 100_000) -> Tracer:
+    global _tracer
+    _tracer = Tracer(max_events)
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """Stop tracing and return the tracer that was active, if any."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def span(name: str, **args: Any) -> ContextManager[None]:
+    """A span around a with-block, or a no-op when tracing is off."""
+    if _tracer is None:
+        return _NO_SPAN
+    return _tracer.span(name, **args)
+
+
+def instant(name: str, **args: Any) -> None:
+    """Mark a point in time, such as a server state change."""
+    if _tracer is not None:
+        _tracer.instant(name, **args)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorate a function or coroutine function to run inside a span."""
+    def decorate(func: F) -> F:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if _tracer is None:
+                    return await func(*args, **kwargs)
+                with _tracer.span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorate
@@ -1,78 +1,272 @@
+import concurrent.futures
+import json
 import logging
-import webview
-from typing import Optional
-from config import AppConfig
-from server_manager import ServerManager
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+import tracing
+from config import AppConfig, save_config
+from loop_thread import LoopThread
+from server_manager import ServerManager, ServerStatusEvent
+
+if TYPE_CHECKING:
+    from asset_cache import AssetCache
+
+# controls.html doubles as the splash page shown while the server boots
+SPLASH_PATH = Path(__file__).resolve().parent / 'controls.html'
+# Injected into every page the window loads, so the controls page stays reachable after the switch
+CONTROLS_HOTKEY = 'Ctrl+Shift+K'
+CONTROLS_HOTKEY_JS = '''
+if (!window.__webuiControlsHotkey) {
+    window.__webuiControlsHotkey = true;
+    document.addEventListener('keydown', function (e) {
+        if (e.ctrlKey && e.shiftKey && (e.key === 'K' || e.key === 'k') && window.pywebview) {
+            e.preventDefault();
+            window.pywebview.api.showControls();
+        }
+    }, true);
+}
+'''
 
 class UIManager:
-    def __init__(self, config: AppConfig, server_manager: Optional[ServerManager] = None) -> None:
+    def __init__(self, config: AppConfig, server_manager: Optional[ServerManager] = None,
+                 save_delay: float = 0.5, page_url: Optional[str] = None,
+                 asset_cache: Optional['AssetCache'] = None, loop_thread: Optional[LoopThread] = None) -> None:
         self.config = config
         self.window = None
         self.server_manager = server_manager
+        # JS API calls arrive on pywebview's threads; server work is handed to the loop that owns the manager
+        self.loop_thread = loop_thread
+        # Slack on top of the server's own start/stop timeouts before a JS API call gives up
+        self.api_timeout_margin = 10.0
+        # The URL the window loads; differs from start_url when a caching front end sits in between
+        self.page_url = page_url or str(config.start_url)
+        self.asset_cache = asset_cache
+        # Window geometry changes are coalesced into one save after save_delay seconds of quiet
+        self.save_delay = save_delay
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_timer_lock = threading.Lock()
         self._js_api = {
             'startServer': self.start_server,
             'stopServer': self.stop_server,
             'reloadPage': self.reload_page,
             'getServerStatus': self.get_server_status,
+            'getServerState': self.get_server_state,
+            'getLogs': self.get_logs,
+            'getCacheStats': self.get_cache_stats,
+            'getProbeMetrics': self.get_probe_metrics,
+            'getSupervisorStats': self.get_supervisor_stats,
+            'getTelemetry': self.get_telemetry,
+            'getAccessStats': self.get_access_stats,
+            'getWarmup': self.get_warmup,
+            'showControls': self.show_controls,
+            'openPage': self.open_page,
             'shutdownApp': self.shutdown_app  # New method for graceful shutdown
         }
         self._server_running = False
+        self._showing_splash = False
+        # Set by the Shutdown button: stop the server on exit even in keep-warm mode
+        self.shutdown_requested = False
+        # Window calls can block until the GUI is up, so they run here rather than on the server's loop
+        self._ui_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ui-push')
         if self.server_manager:
             self.server_manager.set_connection_callback(self._on_server_status_change)
+            self.server_manager.subscribe(self._push_server_event)
 
     async def _on_server_status_change(self, is_up: bool):
         if is_up and not self._server_running:
             self._server_running = True
             if self.window:
-                self.window.evaluate_js('window.location.reload()')
+                if self._showing_splash:
+                    self._ui_executor.submit(self._show_start_url)
+                else:
+                    self._ui_executor.submit(self.reload_page)
         elif not is_up:
             self._server_running = False
 
+    def _show_start_url(self) -> None:
+        """Leave the splash page for the real UI as soon as the server is ready."""
+        logging.info(f"Server ready; loading {self.page_url}")
+        tracing.instant('load start url', url=self.page_url)
+        self._showing_splash = False
+        self.window.load_url(self.page_url)
+
+    def _push_server_event(self, event: ServerStatusEvent) -> None:
+        """Push a state change into the page instead of waiting for it to poll."""
+        if self.window:
+            payload = json.dumps(event.to_dict())
+            self._ui_executor.submit(self.window.evaluate_js,
+                                     f'window.onServerStatus && window.onServerStatus({payload})')
+
     def get_server_status(self) -> bool:
         return self._server_running
 
+    def get_server_state(self) -> Optional[str]:
+        return self.server_manager.state if self.server_manager else None
+
+    def get_logs(self, since_seq: int = 0) -> dict:
+        """Return server output lines newer than since_seq for the log panel."""
+        if self.server_manager and self.server_manager.log_buffer is not None:
+            return self.server_manager.log_buffer.since(int(since_seq))
+        return {'lines': [], 'next': 0, 'skipped': 0}
+
+    def get_probe_metrics(self) -> Optional[dict]:
+        """Rolling p50/p95/p99 latency and error counts of the server's health probes."""
+        return self.server_manager.probe_metrics.snapshot() if self.server_manager else None
+
+    def get_telemetry(self, limit: int = 120) -> Optional[dict]:
+        """Latest and recent CPU/memory samples of the server's process tree."""
+        return self.server_manager.telemetry.to_dict(int(limit)) if self.server_manager else None
+
+    def get_access_stats(self) -> Optional[dict]:
+        """Per-route request counts, status classes and response times from the access log."""
+        if self.server_manager and self.server_manager.access_log:
+            return self.server_manager.access_log.snapshot()
+        return None
+
+    def get_warmup(self) -> Optional[dict]:
+        """Per-endpoint latency of the last post-boot warm-up."""
+        return self.server_manager.last_warmup if self.server_manager else None
+
+    def get_supervisor_stats(self) -> Optional[dict]:
+        """Automatic restart counts and recovery times, if the server is supervised."""
+        if self.server_manager and self.server_manager.supervisor:
+            return self.server_manager.supervisor.stats()
+        return None
+
+    def get_cache_stats(self) -> Optional[dict]:
+        return self.asset_cache.stats() if self.asset_cache else None
+
+    @tracing.traced('UIManager.create_window')
     def create_window(self) -> None:
-        # Convert HttpUrl to string for webview
-        start_url = str(self.config.start_url)
-        logging.info(f"Creating window with URL: {start_url}")
+        # pywebview pulls in the whole GUI toolkit, so it is imported only when a window is needed
+        with tracing.span('import webview'):
+            import webview
+        # Open on the splash page unless the server is already up; the switch happens on readiness
+        start_url = self.page_url
+        self._showing_splash = not self._server_running
+        if self._showing_splash:
+            logging.info(f"Creating window on splash page; will load {start_url} once the server is ready")
+        else:
+            logging.info(f"Creating window with URL: {start_url}")
         self.window = webview.create_window(
             title=self.config.window_title,
-            url=start_url,
+            url=None if self._showing_splash else start_url,
+            html=SPLASH_PATH.read_text(encoding='utf-8') if self._showing_splash else '',
             width=self.config.window_width,
             height=self.config.window_height,
+            x=self.config.window_x,
+            y=self.config.window_y,
             js_api=self._js_api,
             resizable=True,
             easy_drag=False
         )
-        # Start port monitoring
-        if self.server_manager:
-            self.server_manager.start_monitoring()
+        events = self.window.events
+        events.resized += self._on_resized
+        if hasattr(events, 'loaded'):
+            events.loaded += self._on_loaded
+        if hasattr(events, 'moved'):
+            events.moved += self._on_moved
+        if self._showing_splash and self._server_running:
+            # The server came up while the window was being created
+            self._ui_executor.submit(self._show_start_url)
 
-    async def start_server(self) -> bool:
-        if self.server_manager:
-            return await self.server_manager.start_server()
-        return False
+    def _on_loaded(self) -> None:
+        if not self._showing_splash:
+            self.window.evaluate_js(CONTROLS_HOTKEY_JS)
 
-    async def stop_server(self) -> bool:
-        if self.server_manager:
-            await self.server_manager.stop_server()
-            return True
-        return False
+    def show_controls(self) -> None:
+        """Go back to the controls page (logs, latency, resources) from the Open WebUI page."""
+        if self.window:
+            self._ui_executor.submit(self._show_controls)
+
+    def _show_controls(self) -> None:
+        self._showing_splash = True
+        self.window.load_html(SPLASH_PATH.read_text(encoding='utf-8'))
+
+    def open_page(self) -> None:
+        """Leave the controls page for Open WebUI."""
+        if self.window:
+            self._ui_executor.submit(self._show_start_url)
+
+    def _on_resized(self, width: int, height: int) -> None:
+        self.config.window_width = int(width)
+        self.config.window_height = int(height)
+        self._schedule_save()
+
+    def _on_moved(self, x: int, y: int) -> None:
+        self.config.window_x = int(x)
+        self.config.window_y = int(y)
+        self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        """Debounce config saves: restart the timer on every geometry event."""
+        if not self.config.is_dirty:
+            return
+        with self._save_timer_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.save_delay, save_config, args=(self.config,))
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _run_on_loop(self, coro, timeout: float, action: str):
+        """Run a ServerManager coroutine on the server loop from a JS API thread."""
+        try:
+            return self.loop_thread.run(coro, timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            logging.error(f"{action} did not finish within {timeout:.0f}s; cancelled")
+        except concurrent.futures.CancelledError:
+            logging.info(f"{action} was cancelled")
+        except Exception as e:
+            logging.error(f"{action} failed: {e}")
+        return None
+
+    def start_server(self) -> bool:
+        if not (self.server_manager and self.loop_thread):
+            return False
+        timeout = self.server_manager.ready_timeout + self.api_timeout_margin
+        return bool(self._run_on_loop(self.server_manager.start_server(self.server_manager.method), timeout,
+                                      'Starting the server'))
+
+    def stop_server(self) -> bool:
+        if not (self.server_manager and self.loop_thread):
+            return False
+        timeout = self.server_manager.stop_timeout + self.api_timeout_margin
+        self._run_on_loop(self.server_manager.stop_server(), timeout, 'Stopping the server')
+        return self.server_manager.process is None
 
     def reload_page(self) -> None:
         if self.window:
             self.window.evaluate_js('window.location.reload()')
 
+    def focus_window(self, url: Optional[str] = None) -> bool:
+        """Bring the window to the front for a second launch of the app, optionally loading url."""
+        if not self.window:
+            return False
+        self._ui_executor.submit(self._focus, url)
+        return True
+
+    def _focus(self, url: Optional[str]) -> None:
+        try:
+            self.window.restore()
+            self.window.show()
+        except Exception as e:
+            logging.warning(f"Could not bring the window to the front: {e}")
+        if url:
+            self._showing_splash = False
+            self.window.load_url(url)
+
     def shutdown_app(self) -> None:
-        """Gracefully shutdown the app: stop server and close window."""
-        if self.server_manager:
-            # Stop the server synchronously (fire and forget)
-            import asyncio
-            asyncio.create_task(self.server_manager.stop_server())
+        """Close the window and have main() stop the server once the GUI loop returns."""
+        self.shutdown_requested = True
         if self.window:
             self.window.destroy()
 
     def run_window(self) -> None:
         if self.window is None:
             self.create_window()
-        webview.start()
+        import webview
+        with tracing.span('webview.start'):
+            webview.start()
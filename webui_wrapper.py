@@ -10,6 +10,7 @@ import socket
 from pathlib import Path
 from win32com.client import Dispatch
 import logging
+from logging.handlers import RotatingFileHandler
 import webview
 
 # Set up logging
@@ -18,7 +19,7 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(),
-        logging.FileHandler('webui_wrapper.log')
+        RotatingFileHandler('webui_wrapper.log', maxBytes=1024 * 1024, backupCount=3)
     ]
 )
 
@@ -210,8 +211,7 @@ class WebUIWrapper:
             atexit.register(self.cleanup)
             atexit.register(self.stop_server)
 
-            # Wait for server to be ready and verify it's running
-            time.sleep(60)  # Increased wait time for server initialization
+            # start_server() only returns True once the port accepts connections
             try:
                 # Verify server is running by checking if port is open
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)